@@ -2,40 +2,60 @@ import asyncio
 import json
 import importlib
 from collections import defaultdict
+from typing import Dict
+from typing import Optional
 from typing import Union
 
 from eth_utils.address import to_checksum_address
 from web3 import Web3
 
-from snapshotter.settings.config import projects_config
+from snapshotter.settings.config import get_preloaders
+from snapshotter.settings.config import get_projects_config
+from snapshotter.settings.config import cache_projects_and_preloaders
+from snapshotter.settings.config import read_projects_and_preloaders
 from snapshotter.settings.config import settings
-from snapshotter.settings.config import preloaders
+from snapshotter.utils.circuit_breaker import ANCHOR_RPC
+from snapshotter.utils.circuit_breaker import guard_rpc_helper
+from snapshotter.utils.circuit_breaker import SOURCE_RPC
+from snapshotter.utils.config_watcher import ConfigWatcher
+from snapshotter.utils.config_watcher import module_files
+from snapshotter.utils.config_watcher import reload_modules
 from snapshotter.utils.data_utils import get_source_chain_epoch_size
 from snapshotter.utils.data_utils import get_source_chain_id
 from snapshotter.utils.default_logger import logger
 from snapshotter.utils.file_utils import read_json_file
+from snapshotter.utils.markets import configured_markets
+from snapshotter.utils.metrics import PRELOADER_DURATION
+from snapshotter.utils.metrics import stage_timer
+from snapshotter.utils.metrics import timed
 from snapshotter.utils.models.data_models import DailyTaskCompletedEvent
 from snapshotter.utils.models.data_models import DayStartedEvent
 from snapshotter.utils.models.data_models import EpochReleasedEvent
 from snapshotter.utils.models.data_models import PreloaderResult
 from snapshotter.utils.models.data_models import SnapshotFinalizedEvent
+from snapshotter.utils.models.data_models import SnapshotterStates
 from snapshotter.utils.models.data_models import SnapshottersUpdatedEvent
 from snapshotter.utils.models.message_models import EpochBase
 from snapshotter.utils.models.message_models import SnapshotProcessMessage
+from snapshotter.utils.models.settings_model import MarketConfig
+from snapshotter.utils.multicall import aggregated_web3_call
+from snapshotter.utils.slots import latest_selection
 from rpc_helper.rpc import RpcHelper
 from snapshotter.utils.snapshot_worker import SnapshotAsyncWorker
+from snapshotter.utils.startup_profiler import profiled
+from snapshotter.utils.startup_profiler import startup_profiler
+from snapshotter.utils.utility_functions import close_quietly
 
 
 class ProcessorDistributor:
     _anchor_rpc_helper: RpcHelper
 
-    def __init__(self):
+    def __init__(self, market: Optional[MarketConfig] = None):
         """
         Initialize the ProcessorDistributor object.
 
         Args:
-            name (str): The name of the ProcessorDistributor.
-            **kwargs: Additional keyword arguments.
+            market (MarketConfig, optional): Data market the distributor processes epochs of. Defaults to settings.data_market
 
         Attributes:
             _rpc_helper: The RPC helper object.
@@ -45,63 +65,252 @@ class ProcessorDistributor:
             _upcoming_project_changes (defaultdict): Dictionary of upcoming project changes.
             _project_type_config_mapping (dict): Dictionary mapping project types to their configurations.
         """
+        self.market = market or configured_markets()[0]
         self._rpc_helper = None
+        self._owns_rpc_helpers = True
         self._source_chain_id = None
         self._projects_list = None
         self._initialized = False
         self._upcoming_project_changes = defaultdict(list)
-        self._project_type_config_mapping = dict()
+        self._project_type_config_mapping, self._all_preload_tasks = self._build_project_mappings(
+            get_projects_config(self.market.projects_config_path),
+        )
         self._preloader_compute_mapping = dict()
-        self._all_preload_tasks = set()
-        for project_config in projects_config:
-            self._project_type_config_mapping[project_config.project_type] = project_config
-            for preload_task in project_config.preload_tasks:
-                self._all_preload_tasks.add(preload_task)
+        self._config_watcher = ConfigWatcher()
 
         self._snapshotter_enabled = True
-        self.snapshot_worker = SnapshotAsyncWorker()
+        self._accepting_epochs = True
+        # set once draining starts, ending the release wait of epochs that will not be processed anyway
+        self._draining = asyncio.Event()
+        self._in_flight_tasks = set()
+        self.snapshot_worker = SnapshotAsyncWorker(self.market)
+
+    @property
+    def in_flight_tasks(self) -> set:
+        """
+        Preload, snapshot build and submission tasks spawned by the distributor, and background tasks of its
+        worker such as the outbox replay, that have not finished yet.
+        """
+        return self._in_flight_tasks | self.snapshot_worker.in_flight_tasks
 
-    async def _init_rpc_helper(self):
+    @property
+    def rpc_helper(self) -> RpcHelper:
         """
-        Initializes the RpcHelper instance if it is not already initialized.
+        Source chain RPC helper, available once the distributor is initialized.
         """
-        if not self._rpc_helper:
-            self._rpc_helper = RpcHelper(rpc_settings=settings.rpc)
-            self._anchor_rpc_helper = RpcHelper(rpc_settings=settings.powerloom_chain_rpc)
-            await self._anchor_rpc_helper.init()
-            await self._rpc_helper.init()
+        return self._rpc_helper
 
-    async def _init_preloader_compute_mapping(self):
+    def _spawn(self, coro) -> asyncio.Task:
         """
-        Initializes the preloader compute mapping by importing the preloader module and class and
-        adding it to the mapping dictionary.
+        Schedules a coroutine as a task and tracks it until completion so that shutdown can drain it.
         """
-        if self._preloader_compute_mapping:
+        task = asyncio.ensure_future(coro)
+        self._in_flight_tasks.add(task)
+        task.add_done_callback(self._in_flight_tasks.discard)
+        return task
+
+    def stop_accepting_epochs(self):
+        """
+        Stops processing newly released epochs. Work already in flight is not affected, epochs still in
+        their release wait are dropped right away.
+        """
+        self._accepting_epochs = False
+        self._draining.set()
+
+    async def close(self):
+        """
+        Flushes pending state and closes all connection pools held by the distributor and its worker.
+        """
+        await self.snapshot_worker.close()
+        if self._rpc_helper and self._owns_rpc_helpers:
+            await close_quietly(self._rpc_helper)
+            await close_quietly(self._anchor_rpc_helper)
+
+    async def _init_rpc_helper(self, rpc_helper=None, anchor_rpc_helper=None):
+        """
+        Initializes the RpcHelper instances if they are not already initialized.
+
+        Args:
+            rpc_helper (optional): Initialized source chain RpcHelper to share instead of creating one
+            anchor_rpc_helper (optional): Initialized anchor chain RpcHelper to share instead of creating one
+        """
+        if self._rpc_helper:
             return
+        if rpc_helper is not None and anchor_rpc_helper is not None:
+            self._owns_rpc_helpers = False
+            self._rpc_helper = rpc_helper
+            self._anchor_rpc_helper = anchor_rpc_helper
+        else:
+            self._rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.rpc), SOURCE_RPC)
+            self._anchor_rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.powerloom_chain_rpc), ANCHOR_RPC)
+            await asyncio.gather(self._anchor_rpc_helper.init(), self._rpc_helper.init())
 
+    @staticmethod
+    def _build_project_mappings(projects_config):
+        """
+        Maps project types to their configs and collects the preload tasks required by any project.
+        """
+        project_type_config_mapping = dict()
+        all_preload_tasks = set()
+        for project_config in projects_config:
+            project_type_config_mapping[project_config.project_type] = project_config
+            for preload_task in project_config.preload_tasks:
+                all_preload_tasks.add(preload_task)
+        return project_type_config_mapping, all_preload_tasks
+
+    def _build_preloader_compute_mapping(self, preloaders, all_preload_tasks):
+        """
+        Imports the preloader module and class of every required preload task.
+        """
+        preloader_compute_mapping = dict()
         for preloader in preloaders:
-            if preloader.task_type in self._all_preload_tasks:
+            if preloader.task_type in all_preload_tasks:
                 preloader_module = importlib.import_module(preloader.module)
                 self._logger.debug('Imported preloader module: {}', preloader_module)
                 preloader_class = getattr(preloader_module, preloader.class_name)
-                self._preloader_compute_mapping[preloader.task_type] = preloader_class
+                preloader_compute_mapping[preloader.task_type] = preloader_class
                 self._logger.debug(
                     'Imported preloader class {} against preloader module {} for task type {}',
                     preloader_class,
                     preloader_module,
                     preloader.task_type,
                 )
+        return preloader_compute_mapping
 
-    async def init(self):
+    async def _init_preloader_compute_mapping(self):
+        """
+        Initializes the preloader compute mapping by importing the preloader module and class and
+        adding it to the mapping dictionary.
+        """
+        if self._preloader_compute_mapping:
+            return
+
+        self._preloader_compute_mapping = self._build_preloader_compute_mapping(
+            get_preloaders(self.market.preloaders_config_path), self._all_preload_tasks,
+        )
+
+    def _watch_config(self):
+        """
+        Takes the current projects and preloaders configs and the source of their compute packages as the reload baseline.
+        """
+        entry_modules = [preloader.module for preloader in get_preloaders(self.market.preloaders_config_path)] + [
+            project_config.processor.module
+            for project_config in get_projects_config(self.market.projects_config_path)
+        ]
+        self._config_watcher.watch([
+            self.market.projects_config_path,
+            self.market.preloaders_config_path,
+            *module_files(entry_modules),
+        ])
+        self._watched_entry_modules = entry_modules
+
+    async def _reload_config_if_changed(self):
+        """
+        Reloads the projects and preloaders configs, and re-imports changed processor and preloader modules,
+        if any watched file changed since the last check.
+
+        All mappings are rebuilt first and then swapped together without yielding to the event loop, so an
+        epoch never runs with a mix of old and new processors. Connections held by the distributor and the
+        worker are kept. If anything fails to load, the current configs and mappings stay in place and the
+        watched files keep their baseline, so the reload is retried on the next check.
+        """
+        changed_files = self._config_watcher.changed_files()
+        if not changed_files:
+            return
+        self._logger.info('Watched config files changed, reloading: {}', sorted(changed_files))
+        try:
+            projects_config, preloaders_config = read_projects_and_preloaders(
+                self.market.projects_config_path, self.market.preloaders_config_path,
+            )
+            reloaded_modules = reload_modules(self._watched_entry_modules, changed_files)
+            project_type_config_mapping, all_preload_tasks = self._build_project_mappings(projects_config)
+            preloader_compute_mapping = self._build_preloader_compute_mapping(
+                preloaders_config.preloaders, all_preload_tasks,
+            )
+            project_calculation_mapping = self.snapshot_worker.build_project_calculation_mapping(projects_config)
+        except Exception as e:
+            self._logger.opt(exception=True).error(
+                'Config reload failed, keeping the current projects and preloaders: {}', e,
+            )
+        else:
+            previous_project_types = set(self._project_type_config_mapping)
+            cache_projects_and_preloaders(
+                projects_config, preloaders_config, self.market.projects_config_path, self.market.preloaders_config_path,
+            )
+            self._project_type_config_mapping = project_type_config_mapping
+            self._all_preload_tasks = all_preload_tasks
+            self._preloader_compute_mapping = preloader_compute_mapping
+            self.snapshot_worker.swap_project_calculation_mapping(projects_config, project_calculation_mapping)
+            self._logger.info(
+                'Reloaded projects and preloaders config | reloaded modules: {} | added project types: {} | removed project types: {}',
+                reloaded_modules,
+                sorted(set(project_type_config_mapping) - previous_project_types),
+                sorted(previous_project_types - set(project_type_config_mapping)),
+            )
+            self._watch_config()
+
+    async def _init_protocol_state(self):
+        """
+        Reads the source chain block time, epoch size and current day from the protocol state contract.
+        """
+        # issued together so that the aggregation layer packs them into a single multicall
+        data_market = Web3.to_checksum_address(self.market.data_market)
+        source_block_time, epoch_size, current_day = await asyncio.gather(
+            *[
+                aggregated_web3_call(
+                    self._anchor_rpc_helper,
+                    [(fn_name, [data_market])],
+                    contract_addr=self._protocol_state_contract.address,
+                    abi=self._protocol_state_contract.abi,
+                )
+                for fn_name in ('SOURCE_CHAIN_BLOCK_TIME', 'EPOCH_SIZE', 'dayCounter')
+            ],
+            return_exceptions=True,
+        )
+        if isinstance(source_block_time, Exception):
+            self._logger.error(
+                'Exception in querying protocol state for source chain block time: {}',
+                source_block_time,
+            )
+        else:
+            self._source_chain_block_time = source_block_time[0] / 10 ** 4
+            self._logger.debug('Set source chain block time to {}', self._source_chain_block_time)
+
+        if isinstance(epoch_size, Exception):
+            self._logger.error(
+                'Exception in querying protocol state for epoch size: {}',
+                epoch_size,
+            )
+        else:
+            self._epoch_size = epoch_size[0]
+
+        if isinstance(current_day, Exception):
+            self._logger.info("{} {}".format(self._protocol_state_contract, self.market.data_market))
+            self._logger.error(
+                'Exception in querying protocol state for user task status for day {}',
+                current_day,
+            )
+        else:
+            self._current_day = current_day[0]
+
+    async def init(self, rpc_helper=None, anchor_rpc_helper=None):
         """
         Initializes the worker by initializing the RPC helper, loading project metadata.
+
+        Once the RPC helpers are up, protocol state reads, project metadata, preloader imports and
+        the snapshot worker are initialized concurrently; the worker reuses the distributor's RPC helpers.
+
+        Args:
+            rpc_helper (optional): Initialized source chain RpcHelper to share instead of creating one
+            anchor_rpc_helper (optional): Initialized anchor chain RpcHelper to share instead of creating one
         """
         if not self._initialized:
 
             self._logger = logger.bind(
-                module='ProcessDistributor',
+                module='ProcessDistributor' if not settings.markets else f'ProcessDistributor-{self.market.data_market}',
             )
-            await self._init_rpc_helper()
+            with startup_profiler.step('distributor.rpc_helpers'):
+                await self._init_rpc_helper(rpc_helper, anchor_rpc_helper)
 
             protocol_abi = read_json_file(settings.protocol_state.abi, self._logger)
             self._logger.info('Protocol state address: {}', settings.protocol_state.address)
@@ -111,40 +320,21 @@ class ProcessorDistributor:
                 ),
                 abi=protocol_abi,
             )
-            try:
-                source_block_time = await self._protocol_state_contract.functions.SOURCE_CHAIN_BLOCK_TIME(Web3.to_checksum_address(settings.data_market)).call()
-            except Exception as e:
-                self._logger.error(
-                    'Exception in querying protocol state for source chain block time: {}',
-                    e,
-                )
-            else:
-                self._source_chain_block_time = source_block_time / 10 ** 4
-                self._logger.debug('Set source chain block time to {}', self._source_chain_block_time)
 
-            try:
-                epoch_size = await self._protocol_state_contract.functions.EPOCH_SIZE(Web3.to_checksum_address(settings.data_market)).call()
-            except Exception as e:
-                self._logger.error(
-                    'Exception in querying protocol state for epoch size: {}',
-                    e,
-                )
-            else:
-                self._epoch_size = epoch_size
-
-            try:
-                self._current_day = await self._protocol_state_contract.functions.dayCounter(Web3.to_checksum_address(settings.data_market)).call()
-
-            except Exception as e:
-                self._logger.info("{} {}".format(self._protocol_state_contract, settings.data_market))
-                self._logger.error(
-                    'Exception in querying protocol state for user task status for day {}',
-                    e,
-                )
-
-            await self._load_projects_metadata()
-            await self._init_preloader_compute_mapping()
-            await self.snapshot_worker.init_worker()
+            await asyncio.gather(
+                profiled('distributor.protocol_state', self._init_protocol_state()),
+                profiled('distributor.projects_metadata', self._load_projects_metadata()),
+                profiled('distributor.preloaders', self._init_preloader_compute_mapping()),
+                profiled(
+                    'worker.init',
+                    self.snapshot_worker.init_worker(
+                        rpc_helper=self._rpc_helper,
+                        anchor_rpc_helper=self._anchor_rpc_helper,
+                    ),
+                ),
+            )
+            if settings.config_reload.enabled:
+                self._watch_config()
 
             self._initialized = True
 
@@ -162,16 +352,17 @@ class ProcessorDistributor:
                 ),
                 abi=abi_dict,
             )
-            self._source_chain_epoch_size = await get_source_chain_epoch_size(
-                rpc_helper=self._anchor_rpc_helper,
-                state_contract_obj=protocol_state_contract,
-                data_market=Web3.to_checksum_address(settings.data_market),
-            )
-
-            self._source_chain_id = await get_source_chain_id(
-                rpc_helper=self._anchor_rpc_helper,
-                state_contract_obj=protocol_state_contract,
-                data_market=Web3.to_checksum_address(settings.data_market),
+            self._source_chain_epoch_size, self._source_chain_id = await asyncio.gather(
+                get_source_chain_epoch_size(
+                    rpc_helper=self._anchor_rpc_helper,
+                    state_contract_obj=protocol_state_contract,
+                    data_market=Web3.to_checksum_address(self.market.data_market),
+                ),
+                get_source_chain_id(
+                    rpc_helper=self._anchor_rpc_helper,
+                    state_contract_obj=protocol_state_contract,
+                    data_market=Web3.to_checksum_address(self.market.data_market),
+                ),
             )
 
     async def _epoch_release_processor(self, message: EpochReleasedEvent):
@@ -191,14 +382,31 @@ class ProcessorDistributor:
 
         if settings.only_simulate_submissions:
             epoch.epochId = 0
+        else:
+            # start the deadline budget that bounds retries for this epoch's submissions
+            self.snapshot_worker.epoch_deadlines.register(epoch.epochId, released_at=message.timestamp)
+        timeline = self.snapshot_worker.timeline
+        timeline.record(
+            epoch.epochId,
+            SnapshotterStates.EPOCH_RELEASED,
+            extra={'begin': epoch.begin, 'end': epoch.end, 'day': epoch.day, 'releasedAt': message.timestamp},
+            epoch_end=epoch.end,
+        )
+
+        if settings.config_reload.enabled:
+            await self._reload_config_if_changed()
+        # a reload at a later epoch boundary replaces these while this epoch's preloaders are running
+        all_preload_tasks = self._all_preload_tasks
+        preloader_compute_mapping = self._preloader_compute_mapping
+        project_type_config_mapping = self._project_type_config_mapping
 
         preloader_tasks = {}
         preloader_results_dict = {}
         failed_preloaders = set()
 
         # Use the pre-computed set of all preload tasks
-        for preloader_task in self._all_preload_tasks:
-            preloader_class = self._preloader_compute_mapping[preloader_task]
+        for preloader_task in all_preload_tasks:
+            preloader_class = preloader_compute_mapping[preloader_task]
             preloader_obj = preloader_class()
             preloader_compute_kwargs = dict(
                 epoch=epoch,
@@ -210,7 +418,16 @@ class ProcessorDistributor:
                 epoch.epochId,
             )
             preloader_tasks[preloader_task] = asyncio.create_task(
-                preloader_obj.compute(**preloader_compute_kwargs)
+                timed(
+                    timeline.track(
+                        epoch.epochId,
+                        SnapshotterStates.PRELOAD,
+                        preloader_task,
+                        preloader_obj.compute(**preloader_compute_kwargs),
+                    ),
+                    PRELOADER_DURATION,
+                    preloader=preloader_task,
+                ),
             )
 
         await asyncio.gather(
@@ -237,7 +454,7 @@ class ProcessorDistributor:
                 failed_preloaders.add(preloader_task)
 
         # Distribute results to each project based on its requirements
-        for project_type, project_config in self._project_type_config_mapping.items():
+        for project_type, project_config in project_type_config_mapping.items():
             # Check if all required preloaders for this project succeeded
             project_required_preloaders = set(project_config.preload_tasks)
             project_failed_preloaders = failed_preloaders.intersection(project_required_preloaders)
@@ -248,10 +465,10 @@ class ProcessorDistributor:
                     if task in preloader_results_dict
                 }
                 
-                asyncio.ensure_future(
+                self._spawn(
                     self._distribute_callbacks_snapshotting(
                         project_type, epoch, project_preloader_results,
-                    )
+                    ),
                 )
             else:
                 self._logger.warning(
@@ -261,8 +478,12 @@ class ProcessorDistributor:
                     project_failed_preloaders
                 )
 
+                error = Exception(f'Failed preloaders for {project_type}: {project_failed_preloaders}')
+                timeline.record(epoch.epochId, SnapshotterStates.SNAPSHOT_BUILD, project_type, error=error)
+                for slot in self.snapshot_worker.slots:
+                    self.snapshot_worker.record_attempt(slot, epoch.epochId, project_type, dict(), error=error)
                 await self.snapshot_worker.handle_missed_snapshot(
-                    error=Exception(f'Failed preloaders for {project_type}: {project_failed_preloaders}'),
+                    error=error,
                     epoch_id=epoch.epochId,
                     project_id=project_type
                 )
@@ -293,7 +514,7 @@ class ProcessorDistributor:
             day=epoch.day,
         )
 
-        asyncio.ensure_future(
+        self._spawn(
             self.snapshot_worker.process_task(process_unit, project_type, preloader_results),
         )
 
@@ -318,8 +539,19 @@ class ProcessorDistributor:
             None
         """
         if type_ == 'EpochReleased':
-            # sleep for 20 seconds to allow for BDS processing to be completed
-            await asyncio.sleep(20)
+            if not self._accepting_epochs:
+                self._logger.info('Shutting down, not processing released epoch {}', event.epochId)
+                return
+            # wait 20 seconds to allow for BDS processing to be completed, unless draining starts meanwhile
+            with stage_timer('release_wait', ''):
+                try:
+                    await asyncio.wait_for(self._draining.wait(), 20)
+                except asyncio.TimeoutError:
+                    pass
+            # draining started during the wait, leaving no time to process the epoch
+            if not self._accepting_epochs:
+                self._logger.info('Shutting down, dropping released epoch {} after the release wait', event.epochId)
+                return
 
             return await self._epoch_release_processor(event)
 
@@ -337,3 +569,94 @@ class ProcessorDistributor:
                 ),
                 type_,
             )
+
+
+class MarketRouter:
+    """
+    Fans events out to one ProcessorDistributor per data market served by the node (see snapshotter.utils.markets).
+
+    Events released by a market go to the distributor of that market; events without a market, such as the
+    simulation epoch, go to every distributor. The distributors share one pair of RPC helpers, so their
+    protocol state reads are batched and cached together.
+
+    Attributes:
+        distributors (Dict[str, ProcessorDistributor]): Distributors keyed by lowercased data market address
+    """
+
+    def __init__(self):
+        self.distributors: Dict[str, ProcessorDistributor] = {
+            market.data_market.lower(): ProcessorDistributor(market) for market in configured_markets()
+        }
+        self._rpc_helper = None
+        self._anchor_rpc_helper = None
+        self._logger = logger.bind(module='MarketRouter')
+
+    @property
+    def in_flight_tasks(self) -> set:
+        """
+        Tasks spawned by any of the distributors that have not finished yet.
+        """
+        return set().union(*[distributor.in_flight_tasks for distributor in self.distributors.values()])
+
+    @property
+    def rpc_helper(self) -> RpcHelper:
+        """
+        Source chain RPC helper shared by the distributors, available once initialized.
+        """
+        return self._rpc_helper
+
+    def stop_accepting_epochs(self):
+        for distributor in self.distributors.values():
+            distributor.stop_accepting_epochs()
+
+    async def init(self):
+        """
+        Initializes the shared RPC helpers and then every distributor concurrently.
+        """
+        with startup_profiler.step('distributor.rpc_helpers'):
+            self._rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.rpc), SOURCE_RPC)
+            self._anchor_rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.powerloom_chain_rpc), ANCHOR_RPC)
+            await asyncio.gather(self._anchor_rpc_helper.init(), self._rpc_helper.init())
+        await asyncio.gather(*[
+            distributor.init(rpc_helper=self._rpc_helper, anchor_rpc_helper=self._anchor_rpc_helper)
+            for distributor in self.distributors.values()
+        ])
+
+    def readiness_probes(self):
+        """
+        Probes of the dependencies the snapshot workers of all markets submit through, keyed by dependency name.
+        """
+        probes = dict()
+        for distributor in self.distributors.values():
+            probes.update(distributor.snapshot_worker.readiness_probes())
+        return probes
+
+    def last_selection(self):
+        """
+        Most recent slot selection reported in any market.
+        """
+        return latest_selection([
+            slot for distributor in self.distributors.values() for slot in distributor.snapshot_worker.slots
+        ])
+
+    async def close(self):
+        await asyncio.gather(*[distributor.close() for distributor in self.distributors.values()])
+        if self._rpc_helper:
+            await close_quietly(self._rpc_helper)
+            await close_quietly(self._anchor_rpc_helper)
+
+    async def process_event(self, type_: str, event):
+        """
+        Process an event with the distributor of the market that emitted it, or with every distributor.
+        """
+        data_market = getattr(event, 'dataMarket', None)
+        if not data_market:
+            await asyncio.gather(*[
+                distributor.process_event(type_, event) for distributor in self.distributors.values()
+            ])
+            return
+        distributor = self.distributors.get(data_market.lower())
+        if distributor is None:
+            self._logger.warning('Skipping {} event of data market {} not served by this node', type_, data_market)
+            return
+        await distributor.process_event(type_, event)
@@ -1,33 +1,140 @@
+"""
+Lazily loaded configuration.
+
+``settings``, ``projects_config``, ``preloaders_config`` and ``preloaders`` are loaded and validated
+on first access and cached, so importing a module does not parse configuration it never uses:
+tools that only need settings never read the projects and preloaders configs.
+
+``from snapshotter.settings.config import settings`` keeps working and triggers the load at that
+point; the ``get_*`` accessors can be called instead to defer loading until first use, and always
+return the latest values after :func:`cache_projects_and_preloaders`. Projects and preloaders configs
+are cached per path, so every data market served by the node can have its own.
+"""
+
 import json
+from typing import List
+from typing import Optional
+from typing import Tuple
 
+from snapshotter.utils.models.settings_model import Preloader
 from snapshotter.utils.models.settings_model import PreloaderConfig
+from snapshotter.utils.models.settings_model import ProjectConfig
 from snapshotter.utils.models.settings_model import ProjectsConfig
 from snapshotter.utils.models.settings_model import Settings
 
-settings_file = open('config/settings.json', 'r')
-settings_dict = json.load(settings_file)
-
-settings: Settings = Settings(**settings_dict)
-
-projects_config_path = settings.projects_config_path
-projects_config_file = open(projects_config_path)
-projects_config_dict = json.load(projects_config_file)
-projects_config = ProjectsConfig(**projects_config_dict).config
-
-# sanity check
-# making sure all project types are unique
-project_types = set()
-for project in projects_config:
-    project_types.add(project.project_type)
-assert len(project_types) == len(projects_config)
-
-preloaders_config_path = settings.preloaders_config_path
-preloaders_config_file = open(preloaders_config_path)
-preloaders_config_dict = json.load(preloaders_config_file)
-preloaders_config = PreloaderConfig(**preloaders_config_dict)
-preloaders = preloaders_config.preloaders
-
-preloader_types = set()
-for preloader in preloaders:
-    preloader_types.add(preloader.task_type)
-assert len(preloader_types) == len(preloaders), 'Duplicate preloader types found'
+SETTINGS_PATH = 'config/settings.json'
+
+_cache = dict()
+
+
+def _read_json(path: str):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _cached(name: str, loader):
+    if name not in _cache:
+        _cache[name] = loader()
+    return _cache[name]
+
+
+def _load_projects_config(path: str) -> List[ProjectConfig]:
+    projects_config = ProjectsConfig(**_read_json(path)).config
+
+    # sanity check
+    # making sure all project types are unique
+    project_types = set()
+    for project in projects_config:
+        project_types.add(project.project_type)
+    assert len(project_types) == len(projects_config)
+    return projects_config
+
+
+def _load_preloaders_config(path: str) -> PreloaderConfig:
+    preloaders_config = PreloaderConfig(**_read_json(path))
+
+    preloader_types = set()
+    for preloader in preloaders_config.preloaders:
+        preloader_types.add(preloader.task_type)
+    assert len(preloader_types) == len(preloaders_config.preloaders), 'Duplicate preloader types found'
+    return preloaders_config
+
+
+def get_settings() -> Settings:
+    return _cached('settings', lambda: Settings(**_read_json(SETTINGS_PATH)))
+
+
+def get_projects_config(path: Optional[str] = None) -> List[ProjectConfig]:
+    """
+    Projects config read from path, by default settings.projects_config_path.
+    """
+    path = path or get_settings().projects_config_path
+    return _cached(f'projects_config:{path}', lambda: _load_projects_config(path))
+
+
+def get_preloaders_config(path: Optional[str] = None) -> PreloaderConfig:
+    """
+    Preloaders config read from path, by default settings.preloaders_config_path.
+    """
+    path = path or get_settings().preloaders_config_path
+    return _cached(f'preloaders_config:{path}', lambda: _load_preloaders_config(path))
+
+
+def get_preloaders(path: Optional[str] = None) -> List[Preloader]:
+    return get_preloaders_config(path).preloaders
+
+
+def read_projects_and_preloaders(
+    projects_config_path: Optional[str] = None,
+    preloaders_config_path: Optional[str] = None,
+) -> Tuple[List[ProjectConfig], PreloaderConfig]:
+    """
+    Re-read and validate the projects and preloaders configs without replacing the cached values.
+    Once everything built from them is ready, they are cached with :func:`cache_projects_and_preloaders`.
+
+    Args:
+        projects_config_path (str, optional): Defaults to settings.projects_config_path
+        preloaders_config_path (str, optional): Defaults to settings.preloaders_config_path
+
+    Raises:
+        Exception: If either config cannot be read or fails validation
+    """
+    projects_config_path = projects_config_path or get_settings().projects_config_path
+    preloaders_config_path = preloaders_config_path or get_settings().preloaders_config_path
+    return _load_projects_config(projects_config_path), _load_preloaders_config(preloaders_config_path)
+
+
+def cache_projects_and_preloaders(
+    projects_config: List[ProjectConfig],
+    preloaders_config: PreloaderConfig,
+    projects_config_path: Optional[str] = None,
+    preloaders_config_path: Optional[str] = None,
+):
+    """
+    Replace the cached projects and preloaders configs, e.g. with reloaded ones.
+
+    Args:
+        projects_config (List[ProjectConfig]): Projects config read from projects_config_path
+        preloaders_config (PreloaderConfig): Preloaders config read from preloaders_config_path
+        projects_config_path (str, optional): Defaults to settings.projects_config_path
+        preloaders_config_path (str, optional): Defaults to settings.preloaders_config_path
+    """
+    projects_config_path = projects_config_path or get_settings().projects_config_path
+    preloaders_config_path = preloaders_config_path or get_settings().preloaders_config_path
+    _cache[f'projects_config:{projects_config_path}'] = projects_config
+    _cache[f'preloaders_config:{preloaders_config_path}'] = preloaders_config
+
+
+_LAZY_ATTRIBUTES = {
+    'settings': get_settings,
+    'projects_config': get_projects_config,
+    'preloaders_config': get_preloaders_config,
+    'preloaders': get_preloaders,
+}
+
+
+def __getattr__(name):
+    loader = _LAZY_ATTRIBUTES.get(name)
+    if loader is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return loader()
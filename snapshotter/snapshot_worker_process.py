@@ -0,0 +1,229 @@
+import asyncio
+import os
+import resource
+import signal
+import sys
+import time
+from multiprocessing.context import SpawnProcess
+from signal import SIGINT
+from signal import SIGQUIT
+from signal import SIGTERM
+
+from snapshotter.processor_distributor import MarketRouter
+from snapshotter.settings.config import settings
+from snapshotter.utils.deadline import anchor_head
+from snapshotter.utils.default_logger import flush_logs
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.event_ipc import EventSubscriber
+from snapshotter.utils.liveness import LAST_SUCCESSFUL_SUBMISSION
+from snapshotter.utils.liveness import liveness_state
+from snapshotter.utils.local_http_server import local_http_server
+from snapshotter.utils.loop_monitor import loop_monitor
+from snapshotter.utils.models.data_models import EpochReleasedEvent
+from snapshotter.utils.notifications import telegram_notifier
+from snapshotter.utils.profiling import install_profiling_signal_handler
+from snapshotter.utils.profiling import on_demand_profiler
+from snapshotter.utils.readiness import wait_until_ready
+from snapshotter.utils.startup_profiler import startup_profiler
+
+
+def worker_file_path(path: str, worker_id: int) -> str:
+    """
+    Per worker variant of a state file path, e.g. submission_outbox.jsonl -> submission_outbox.worker1.jsonl
+    """
+    root, ext = os.path.splitext(path)
+    return f'{root}.worker{worker_id}{ext}'
+
+
+class SnapshotWorkerProcess(SpawnProcess):
+    """
+    Runs the processor distributors of the served data markets and their snapshot workers in a separate
+    process, fed with events by the event detector over local IPC (see snapshotter.utils.event_ipc).
+
+    Started with the spawn method so the detector can restart a worker while its own event loop is running.
+    Workers leave the detector's process group: termination signals reach them through the detector,
+    which drains them on shutdown, and they exit on their own once the detector is gone.
+    Files holding per process state (outbox journal, slot selection mirror, epoch timeline export,
+    startup profile) get a per worker suffix so that worker processes never write to the same file, and each worker serves
+    its local HTTP endpoints (e.g. its pipeline metrics) on the port following the detector's, offset by its index.
+
+    Attributes:
+        worker_id (int): Index of the worker, stable across restarts so a restarted worker replays its own outbox
+        run_init_check (bool): Whether this worker processes the simulation epoch at startup
+    """
+
+    def __init__(self, name, worker_id: int, run_init_check: bool = False, **kwargs):
+        """
+        Initialize the SnapshotWorkerProcess.
+
+        Args:
+            name (str): Name of the process for logging and identification
+            worker_id (int): Index of the worker
+            run_init_check (bool): Whether to process the simulation epoch at startup
+            **kwargs: Additional keyword arguments passed to multiprocessing.Process
+        """
+        SpawnProcess.__init__(self, name=name, **kwargs)
+        self.worker_id = worker_id
+        self.run_init_check = run_init_check
+        self._detector_pid = os.getpid()
+        self._shutdown_initiated = False
+        self._event_tasks = set()
+
+    def _isolate_state_files(self):
+        settings.outbox.journal_path = worker_file_path(settings.outbox.journal_path, self.worker_id)
+        settings.slot_selection.status_file = worker_file_path(settings.slot_selection.status_file, self.worker_id)
+        if settings.epoch_timeline.export_path:
+            settings.epoch_timeline.export_path = worker_file_path(settings.epoch_timeline.export_path, self.worker_id)
+        if settings.startup_profile.report_path:
+            settings.startup_profile.report_path = worker_file_path(settings.startup_profile.report_path, self.worker_id)
+
+    async def _init(self):
+        """
+        Initialize the distributors, wait for the dependencies of the snapshot worker and, for the
+        first worker, process the simulation epoch.
+        """
+        startup_profiler.start()
+        loop_monitor.start()
+        if settings.local_api.enabled:
+            # the detector serves the configured port, each worker the ports after it
+            port = settings.local_api.port + 1 + self.worker_id
+            try:
+                await local_http_server.start(settings.local_api.host, port)
+            except Exception as e:
+                self._logger.error('Unable to start local HTTP endpoints: {}', e)
+        self.market_router = MarketRouter()
+        try:
+            with startup_profiler.step('distributor.init'):
+                await self.market_router.init()
+            with startup_profiler.step('readiness'):
+                await wait_until_ready(self.market_router.readiness_probes())
+            if self.run_init_check:
+                with startup_profiler.step('init_check'):
+                    await self._init_check()
+        finally:
+            startup_profiler.finish()
+
+    async def _init_check(self):
+        """
+        Process a simulation epoch for the current block. The process exits on failure, which the
+        detector reports as a failed startup.
+        """
+        try:
+            current_block_number = await self.market_router.rpc_helper.get_current_block_number()
+            target_block = current_block_number - 1
+            event = EpochReleasedEvent(
+                begin=target_block,
+                end=target_block,
+                epochId=0,
+                timestamp=int(time.time()),
+            )
+            self._logger.info('Processing simulation event: {}', event)
+            await self.market_router.process_event('EpochReleased', event)
+        except Exception as e:
+            self._logger.error('❌ Simulation event processing failed! Error: {}', e)
+            await telegram_notifier.flush()
+            sys.exit(1)
+
+    def _handle_event(self, event_type: str, event, anchor_block):
+        if anchor_block:
+            anchor_head.update(anchor_block)
+        self._logger.info('Processing event: {}', event)
+        task = asyncio.ensure_future(self.market_router.process_event(event_type, event))
+        self._event_tasks.add(task)
+        task.add_done_callback(self._event_tasks.discard)
+
+    def _status(self):
+        return {
+            'load': len(self._event_tasks) + len(self.market_router.in_flight_tasks),
+            'last_selection': self.market_router.last_selection(),
+            LAST_SUCCESSFUL_SUBMISSION: liveness_state.get(LAST_SUCCESSFUL_SUBMISSION),
+        }
+
+    async def _main(self):
+        await self._init()
+        subscriber = EventSubscriber(self.worker_id, self._handle_event, self._status)
+        await subscriber.run(parent_pid=self._detector_pid)
+        # the detector is gone, nothing will be dispatched anymore
+        self._shutdown_initiated = True
+
+    def _exit_handler(self, signum):
+        if self._shutdown_initiated:
+            self._logger.warning(f"Received signal {signal.Signals(signum).name} while draining, exiting immediately")
+            flush_logs()
+            os._exit(1)
+        self._shutdown_initiated = True
+        self._logger.info(
+            f"Received signal {signal.Signals(signum).name}, draining in-flight work for up to "
+            f"{settings.shutdown.drain_timeout} seconds before shutdown...",
+        )
+        if hasattr(self, 'market_router'):
+            self.market_router.stop_accepting_epochs()
+        self._main_task.cancel()
+
+    async def _shutdown(self):
+        """
+        Drains in-flight events within the configured budget, then releases resources.
+        """
+        deadline = time.time() + settings.shutdown.drain_timeout
+        distributor = getattr(self, 'market_router', None)
+        while True:
+            in_flight = set(self._event_tasks)
+            if distributor:
+                in_flight |= distributor.in_flight_tasks
+            remaining = deadline - time.time()
+            if not in_flight or remaining <= 0:
+                break
+            await asyncio.wait(in_flight, timeout=remaining)
+        if in_flight:
+            self._logger.warning('Drain budget exhausted with {} tasks still in flight, cancelling them', len(in_flight))
+
+        try:
+            if distributor:
+                await distributor.close()
+            await liveness_state.flush()
+            await telegram_notifier.close()
+            await on_demand_profiler.stop()
+            await local_http_server.stop()
+            loop_monitor.stop()
+        except Exception as e:
+            self._logger.error(f"Error during shutdown: {e}")
+
+        current_task = asyncio.current_task()
+        remaining_tasks = [task for task in asyncio.all_tasks() if task is not current_task]
+        for task in remaining_tasks:
+            task.cancel()
+        await asyncio.gather(*remaining_tasks, return_exceptions=True)
+        self._logger.info('Shutdown complete')
+
+    def run(self):
+        """
+        Main entry point of the worker process.
+        """
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(
+            resource.RLIMIT_NOFILE,
+            (settings.rlimit.file_descriptors, hard),
+        )
+        os.setpgrp()
+        self._logger = logger.bind(module=self.name)
+        self._isolate_state_files()
+
+        self.ev_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.ev_loop)
+        for sig in (SIGTERM, SIGINT, SIGQUIT):
+            self.ev_loop.add_signal_handler(sig, self._exit_handler, sig)
+        install_profiling_signal_handler(self.ev_loop)
+
+        self._main_task = self.ev_loop.create_task(self._main())
+        try:
+            self.ev_loop.run_until_complete(self._main_task)
+        except asyncio.CancelledError:
+            if not self._shutdown_initiated:
+                raise
+        except Exception as e:
+            self._logger.opt(exception=True).error(f"Fatal error in worker process: {e}")
+            flush_logs()
+            os._exit(1)
+
+        self.ev_loop.run_until_complete(self._shutdown())
+        self.ev_loop.close()
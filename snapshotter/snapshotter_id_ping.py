@@ -6,11 +6,12 @@ from web3 import Web3
 
 from snapshotter.settings.config import settings
 from snapshotter.utils.file_utils import read_json_file
+from snapshotter.utils.slots import configured_slots
 
 
 async def main():
     """
-    Checks if snapshotting is allowed for the given instance ID by querying the protocol state contract.
+    Checks if snapshotting is allowed for every slot served by querying the protocol state contract.
     If snapshotting is allowed, sets the active status key in Redis to True and exits with code 0.
     If snapshotting is not allowed, sets the active status key in Redis to False and exits with code 1.
     """
@@ -29,8 +30,17 @@ async def main():
         sys.exit(1)
 
     protocol_state_contract = w3.eth.contract(address=settings.protocol_state.address, abi=protocol_abi)
-    snapshotter_address = w3.eth.account.from_key(settings.signer_private_key).address
-    print('Extracted snapshotter address from private key: ', snapshotter_address)
+    for slot in configured_slots():
+        check_slot(w3, protocol_state_contract, slot.slot_id, slot.signer_private_key)
+
+
+def check_slot(w3, protocol_state_contract, slot_id, signer_private_key):
+    """
+    Checks that the address of the signing key is an allowed snapshotter and is mapped to the slot.
+    Exits with code 1 otherwise.
+    """
+    snapshotter_address = w3.eth.account.from_key(signer_private_key).address
+    print(f'Extracted snapshotter address for slot {slot_id} from private key: ', snapshotter_address)
 
     print('Querying allowed snapshotters...')
     # Query allowed snapshotters
@@ -40,7 +50,7 @@ async def main():
 
     # Check slot ID mapping
     slot_id_mapping_query = protocol_state_contract.functions.slotSnapshotterMapping(
-        settings.slot_id
+        slot_id
     ).call()
 
     if allowed_snapshotters is True or allowed_snapshotters:
@@ -52,9 +62,9 @@ async def main():
     try:
         slot_id_snapshotter_addr = Web3.to_checksum_address(slot_id_mapping_query)
         if slot_id_snapshotter_addr == Web3.to_checksum_address(snapshotter_address):
-            print('✅ Snapshotter identity found in slot ID mapping...')
+            print(f'✅ Snapshotter identity found in slot ID mapping for slot {slot_id}...')
         else:
-            print('❌ Snapshotter identity not found in slot ID mapping...')
+            print(f'❌ Snapshotter identity not found in slot ID mapping for slot {slot_id}...')
             sys.exit(1)
     except Exception as e:
         print('Error in slot ID mapping query: ', e)
@@ -7,27 +7,52 @@ import time
 from signal import SIGINT
 from signal import SIGQUIT
 from signal import SIGTERM
-import httpx
 from eth_utils.address import to_checksum_address
 from web3 import Web3
 import sys
 import os
-import aiofiles
-from snapshotter.processor_distributor import ProcessorDistributor
+from snapshotter.processor_distributor import MarketRouter
 from snapshotter.settings.config import settings
-from snapshotter.utils.callback_helpers import send_telegram_notification_sync
+from snapshotter.snapshot_worker_process import SnapshotWorkerProcess
 
+from snapshotter.utils.circuit_breaker import ANCHOR_RPC
+from snapshotter.utils.circuit_breaker import guard_rpc_helper
+from snapshotter.utils.circuit_breaker import SOURCE_RPC
+from snapshotter.utils.deadline import anchor_head
+from snapshotter.utils.default_logger import flush_logs
 from snapshotter.utils.default_logger import logger
+from snapshotter.utils.event_ipc import EventDispatcher
 from snapshotter.utils.file_utils import read_json_file
+from snapshotter.utils.liveness import LAST_SUCCESSFUL_SUBMISSION
+from snapshotter.utils.liveness import liveness_state
+from snapshotter.utils.local_http_server import local_http_server
+from snapshotter.utils.loop_monitor import loop_monitor
+from snapshotter.utils.markets import configured_markets
+from snapshotter.utils.metrics import ANCHOR_REORGS
+from snapshotter.utils.metrics import DUPLICATE_EVENTS
+from snapshotter.utils.metrics import EVENT_DETECTION_LAG
+from snapshotter.utils.metrics import EVENTS_DETECTED
 from snapshotter.utils.models.data_models import DailyTaskCompletedEvent
 from snapshotter.utils.models.data_models import DayStartedEvent
 from snapshotter.utils.models.data_models import EpochReleasedEvent
 from snapshotter.utils.models.data_models import SnapshotterIssue
 from snapshotter.utils.models.data_models import SnapshotterReportState
 from snapshotter.utils.models.message_models import TelegramEpochProcessingReportMessage
+from snapshotter.utils.notifications import telegram_notifier
+from snapshotter.utils.profiling import install_profiling_signal_handler
+from snapshotter.utils.profiling import on_demand_profiler
+from snapshotter.utils import readiness
+from snapshotter.utils.readiness import probe_rpc_helper
+from snapshotter.utils.reorg import block_header
+from snapshotter.utils.reorg import BlockHashTracker
+from snapshotter.utils.reorg import DispatchedEvents
+from snapshotter.utils.readiness import wait_until_ready
+from snapshotter.utils.slots import configured_slots
+from snapshotter.utils.startup_profiler import profiled
+from snapshotter.utils.startup_profiler import startup_profiler
+from snapshotter.utils.utility_functions import close_quietly
 from rpc_helper.rpc import get_event_sig_and_abi
 from rpc_helper.rpc import RpcHelper
-from pathlib import Path
 
 
 class EventDetectorProcess(multiprocessing.Process):
@@ -43,6 +68,11 @@ class EventDetectorProcess(multiprocessing.Process):
         _shutdown_initiated (bool): Flag indicating if shutdown has been initiated
         _logger (Logger): Logger instance for this process
         _last_processed_block (int): Last blockchain block that was processed
+        _block_hashes (BlockHashTracker): Hashes of the recently processed blocks, to detect reorgs between polls
+        _dispatched_events (DispatchedEvents): Recently dispatched epochs and days, never dispatched twice
+        _in_flight_tasks (set): Event processing tasks dispatched but not yet finished, drained on shutdown
+        _worker_processes (list): Snapshot worker processes fed over local IPC when settings.worker_processes is enabled
+        _event_dispatcher (EventDispatcher): IPC channel to the worker processes
         rpc_helper (RpcHelper): Helper for RPC interactions with anchor chain
         _source_rpc_helper (RpcHelper): Helper for RPC interactions with source chain
         contract_abi (dict): Contract ABI for interacting with smart contracts
@@ -50,11 +80,9 @@ class EventDetectorProcess(multiprocessing.Process):
         contract (Contract): Web3 contract instance
         event_sig (dict): Event signatures being monitored
         event_abi (dict): Event ABIs for decoding events
-        notification_cooldown (int): Minimum time between notifications in seconds
         failure_count (int): Counter for consecutive failures
         last_status_check_time (int): Timestamp of last status check
         _initialized (bool): Flag indicating if process has been initialized
-        last_notification_time (int): Timestamp of last notification sent
     """
 
     def __init__(self, name, **kwargs):
@@ -72,10 +100,13 @@ class EventDetectorProcess(multiprocessing.Process):
         )
 
         self._last_processed_block = None
+        self._block_hashes = BlockHashTracker()
+        self._dispatched_events = DispatchedEvents()
+        self._in_flight_tasks = set()
+        self._worker_processes = []
+        self._event_dispatcher = None
 
-        # Initialize reporting and notification related attributes
-        self.notification_cooldown = settings.reporting.notification_cooldown
-        self.last_notification_time = 0
+        # Initialize reporting related attributes
         self.failure_count = 0
         self.last_status_check_time = int(time.time())
         self._initialized = False
@@ -86,21 +117,43 @@ class EventDetectorProcess(multiprocessing.Process):
         
         This method:
         1. Initializes RPC helpers for both anchor and source chains
-        2. Sets up the processor distributor
+        2. Sets up a processor distributor for every data market served
         3. Loads contract ABI and initializes contract instance
-        4. Creates HTTP clients for reporting and notifications
+        4. Waits for the local collector, IPFS and RPC nodes to become ready
         5. Performs initial system checks and bootstrapping
-        6. Waits for required initialization periods
+
+        The detector's RPC helpers and the processor distributors are initialized concurrently, and
+        the duration of every step is recorded in the startup timeline.
+
+        With settings.worker_processes enabled, the distributors run in worker processes instead: the
+        detector starts them, only waits for its own RPC nodes and then for every worker to connect.
         
         Raises:
             Various exceptions possible during initialization steps
         """
-        self.rpc_helper = RpcHelper(rpc_settings=settings.powerloom_chain_rpc)
-        self._source_rpc_helper = RpcHelper(rpc_settings=settings.rpc)
-        await self.rpc_helper.init()
-        await self._source_rpc_helper.init()
-
-        self.processor_distributor = ProcessorDistributor()
+        startup_profiler.start()
+        loop_monitor.start()
+        liveness_state.mark(LAST_SUCCESSFUL_SUBMISSION)
+        await liveness_state.flush()
+        if settings.local_api.enabled:
+            try:
+                await local_http_server.start(settings.local_api.host, settings.local_api.port)
+            except Exception as e:
+                self._logger.error('Unable to start local HTTP endpoints: {}', e)
+
+        self.rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.powerloom_chain_rpc), ANCHOR_RPC)
+        self._source_rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.rpc), SOURCE_RPC)
+        if settings.worker_processes.enabled:
+            with startup_profiler.step('workers.start'):
+                await self._start_worker_processes()
+            with startup_profiler.step('detector.rpc_helpers'):
+                await self._init_rpc_helpers()
+        else:
+            self.market_router = MarketRouter()
+            await asyncio.gather(
+                profiled('detector.rpc_helpers', self._init_rpc_helpers()),
+                profiled('distributor.init', self.market_router.init()),
+            )
 
 
         # Load contract ABI from settings
@@ -109,16 +162,6 @@ class EventDetectorProcess(multiprocessing.Process):
             self._logger,
         )
 
-        # Initialize HTTP client for Telegram notifications
-        self._telegram_httpx_client = httpx.Client(
-            base_url=settings.reporting.telegram_url,
-            limits=httpx.Limits(
-                max_keepalive_connections=2,
-                max_connections=2,
-                keepalive_expiry=300,
-            ),
-        )
-
         # Initialize contract instance
         self.contract_address = settings.protocol_state.address
         self.contract = self.rpc_helper.get_current_node()['web3_client'].eth.contract(
@@ -128,9 +171,6 @@ class EventDetectorProcess(multiprocessing.Process):
             abi=self.contract_abi,
         )
 
-        with open('last_successful_submission.txt', 'w') as f:
-            f.write(str(int(time.time())))
-
         # Define event ABIs and signatures for monitoring
         EVENTS_ABI = {
             'EpochReleased': self.contract.events.EpochReleased._get_event_abi(),
@@ -149,11 +189,109 @@ class EventDetectorProcess(multiprocessing.Process):
             EVENTS_ABI,
         )
 
-        await self.processor_distributor.init()
         # TODO: introduce setting to control simulation snapshot submission if the node has been bootstrapped earlier
-        self._logger.info('Initializing SystemEventDetector. Awaiting local collector initialization and DHT bootstrapping for 30 seconds...')
-        await asyncio.sleep(30)
-        await self._init_check_and_report()
+        self._logger.info('Initializing SystemEventDetector. Awaiting local collector, IPFS and RPC readiness...')
+        try:
+            if self._event_dispatcher:
+                with startup_profiler.step('readiness'):
+                    await wait_until_ready({
+                        readiness.ANCHOR_RPC: lambda: probe_rpc_helper(self.rpc_helper),
+                        readiness.SOURCE_RPC: lambda: probe_rpc_helper(self._source_rpc_helper),
+                    })
+                with startup_profiler.step('workers.connect'):
+                    await self._wait_for_worker_processes()
+            else:
+                with startup_profiler.step('readiness'):
+                    await wait_until_ready(self.market_router.readiness_probes())
+                with startup_profiler.step('init_check'):
+                    await self._init_check_and_report()
+        finally:
+            startup_profiler.finish()
+
+    async def _init_rpc_helpers(self):
+        await asyncio.gather(self.rpc_helper.init(), self._source_rpc_helper.init())
+
+    def _start_worker_process(self, worker_id: int) -> SnapshotWorkerProcess:
+        process = SnapshotWorkerProcess(
+            name=f'SnapshotWorker-{worker_id}',
+            worker_id=worker_id,
+            # a restarted worker does not repeat the startup simulation
+            run_init_check=worker_id == 0 and not self._event_dispatcher.has_connected(worker_id),
+        )
+        process.start()
+        self._logger.info('Started snapshot worker process {} (pid {})', process.name, process.pid)
+        return process
+
+    async def _start_worker_processes(self):
+        """
+        Start the IPC channel and the snapshot worker processes.
+        """
+        self._event_dispatcher = EventDispatcher()
+        await self._event_dispatcher.start()
+        self._worker_processes = [
+            self._start_worker_process(worker_id) for worker_id in range(settings.worker_processes.count)
+        ]
+
+    async def _wait_for_worker_processes(self):
+        """
+        Wait for every worker process to finish its startup and connect. A worker exiting first, e.g.
+        because the simulation epoch failed, fails startup like a failed init check.
+
+        Raises:
+            SystemExit: If a worker process exits or does not connect in time
+        """
+        timeout = settings.readiness.timeout + settings.worker_processes.ack_timeout + 30
+        all_alive = lambda: all(process.is_alive() for process in self._worker_processes)
+        if await self._event_dispatcher.wait_for_workers(len(self._worker_processes), timeout, alive=all_alive):
+            self._logger.info('All {} snapshot worker processes connected', len(self._worker_processes))
+            return
+        exited = {p.name: p.exitcode for p in self._worker_processes if not p.is_alive()}
+        error = Exception(
+            f'Snapshot worker processes exited during startup: {exited}' if exited
+            else f'Snapshot worker processes did not connect within {timeout}s',
+        )
+        self._logger.error('❌ {}', error)
+        self._logger.info("Please check your config and if issue persists please reach out to the team!")
+        self._send_telegram_epoch_processing_notification(error=error)
+        await telegram_notifier.flush()
+        for process in self._worker_processes:
+            process.kill()
+        sys.exit(1)
+
+    def _restart_dead_worker_processes(self):
+        for index, process in enumerate(self._worker_processes):
+            if process.is_alive():
+                continue
+            self._logger.error(
+                'Snapshot worker process {} exited with code {}, restarting it', process.name, process.exitcode,
+            )
+            self._worker_processes[index] = self._start_worker_process(process.worker_id)
+
+    async def _stop_worker_processes(self):
+        """
+        Ask the worker processes to drain and exit, killing those still running after the drain budget.
+        """
+        for process in self._worker_processes:
+            if process.is_alive():
+                os.kill(process.pid, SIGTERM)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(None, process.join, settings.shutdown.drain_timeout + 2)
+            for process in self._worker_processes
+        ])
+        for process in self._worker_processes:
+            if process.is_alive():
+                self._logger.warning('Snapshot worker process {} did not exit in time, killing it', process.name)
+                process.kill()
+        await self._event_dispatcher.close()
+
+    def _last_slot_selection(self):
+        """
+        Latest slot selection reported by the snapshot workers, or by any worker process.
+        """
+        if self._event_dispatcher:
+            return self._event_dispatcher.last_selection()
+        return self.market_router.last_selection()
 
     async def _init_check_and_report(self):
         """
@@ -182,7 +320,7 @@ class EventDetectorProcess(multiprocessing.Process):
             self._logger.info(
                 'Processing simulation event: {}', event,
             )
-            await self.processor_distributor.process_event(
+            await self.market_router.process_event(
                 "EpochReleased", event,
             )
         except Exception as e:
@@ -190,9 +328,10 @@ class EventDetectorProcess(multiprocessing.Process):
                 '❌ Simulation event processing failed! Error: {}', e,
             )
             self._logger.info("Please check your config and if issue persists please reach out to the team!")
-            await self._send_telegram_epoch_processing_notification(
+            self._send_telegram_epoch_processing_notification(
                 error=e,
             )
+            await telegram_notifier.flush()
             sys.exit(1)
 
     async def get_events(self, from_block: int, to_block: int):
@@ -200,7 +339,8 @@ class EventDetectorProcess(multiprocessing.Process):
         Retrieves and filters blockchain events for the given block range.
 
         This method fetches events from the blockchain and processes them based on event type.
-        It filters events based on data market address and snapshotter instance settings.
+        It filters events based on the data markets and the slots served by this node. Released epochs
+        and day changes carry their data market so that they are processed by that market's distributor.
 
         Args:
             from_block (int): Starting block number to fetch events from
@@ -226,14 +366,18 @@ class EventDetectorProcess(multiprocessing.Process):
             },
         )
         
-        self._logger.info('Found {} events in blocks {} to {}', len(events_log), from_block, to_block)
+        self._logger.debug('Found {} events in blocks {} to {}', len(events_log), from_block, to_block)
         
         events = []
+        served_markets = {market.data_market.lower() for market in configured_markets()}
+        served_slots = {
+            (to_checksum_address(slot.instance_id), slot.slot_id) for slot in configured_slots()
+        }
         for log in events_log:
             if log.event == 'EpochReleased':
-                self._logger.info(f"EpochReleased event found: {log.args.dataMarketAddress}, comparing with {settings.data_market}")
+                self._logger.trace('EpochReleased event found: {}, comparing with {}', log.args.dataMarketAddress, served_markets)
                 
-                if log.args.dataMarketAddress.lower() == settings.data_market.lower():
+                if log.args.dataMarketAddress.lower() in served_markets:
                     self._logger.info(f"EpochReleased event matched for our data market! Epoch ID: {log.args.epochId}")
 
                     event = EpochReleasedEvent(
@@ -241,24 +385,30 @@ class EventDetectorProcess(multiprocessing.Process):
                         end=log.args.end,
                         epochId=log.args.epochId,
                         timestamp=log.args.timestamp,
+                        dataMarket=log.args.dataMarketAddress,
                     )
                     events.append((log.event, event))
                 else:
-                    self._logger.info(f"Skipping EpochReleased event for different data market: {log.args.dataMarketAddress}")
+                    self._logger.debug('Skipping EpochReleased event for different data market: {}', log.args.dataMarketAddress)
 
             elif log.event == 'DayStartedEvent':
-                self._logger.info(f"DayStartedEvent found: Day ID {log.args.dayId}")
-                event = DayStartedEvent(
-                    dayId=log.args.dayId,
-                    timestamp=log.args.timestamp,
-                )
-                events.append((log.event, event))
+                self._logger.debug('DayStartedEvent found: Day ID {}', log.args.dayId)
+                if log.args.dataMarketAddress.lower() in served_markets:
+                    event = DayStartedEvent(
+                        dayId=log.args.dayId,
+                        timestamp=log.args.timestamp,
+                        dataMarket=log.args.dataMarketAddress,
+                    )
+                    events.append((log.event, event))
+                else:
+                    self._logger.debug('Skipping DayStartedEvent for different data market: {}', log.args.dataMarketAddress)
                 
             elif log.event == 'DailyTaskCompletedEvent':
-                snapshotter_address = to_checksum_address(settings.instance_id)
-                self._logger.info(f"DailyTaskCompletedEvent found: Snapshotter {log.args.snapshotterAddress}, Slot {log.args.slotId}")
+                self._logger.trace(
+                    'DailyTaskCompletedEvent found: Snapshotter {}, Slot {}', log.args.snapshotterAddress, log.args.slotId,
+                )
                 
-                if log.args.snapshotterAddress == snapshotter_address and log.args.slotId == settings.slot_id:
+                if (log.args.snapshotterAddress, log.args.slotId) in served_slots:
                     self._logger.info(f"DailyTaskCompletedEvent matched for our snapshotter and slot! Day ID: {log.args.dayId}")
                     event = DailyTaskCompletedEvent(
                         dayId=log.args.dayId,
@@ -266,18 +416,74 @@ class EventDetectorProcess(multiprocessing.Process):
                     )
                     events.append((log.event, event))
                 else:
-                    self._logger.info(f"Skipping DailyTaskCompletedEvent for different snapshotter/slot")
+                    self._logger.trace('Skipping DailyTaskCompletedEvent for different snapshotter/slot')
 
-        self._logger.info('Filtered events to process: {}', events)
+        self._logger.debug('Filtered events to process: {}', events)
+        detected_at = time.time()
+        for event_type, event in events:
+            EVENTS_DETECTED.inc(event=event_type)
+            EVENT_DETECTION_LAG.observe(detected_at - event.timestamp, event=event_type)
         return events
 
+    async def _block_headers(self, from_block: int, to_block: int):
+        """
+        Number, hash and parent hash of the blocks in a range, in order.
+
+        Returns:
+            List[dict]: The block headers, None if the node does not have every block of the range yet
+        """
+        blocks = await self.rpc_helper.batch_eth_get_block(from_block, to_block) or []
+        if len(blocks) != to_block - from_block + 1 or not all(block.get('result') for block in blocks):
+            return None
+        return sorted((block_header(block['result']) for block in blocks), key=lambda header: header['number'])
+
+    async def _scan_range_start(self, from_block: int, to_block: int):
+        """
+        First block to scan for events, going back to the fork point when the anchor chain reorganized
+        since the last poll.
+
+        Args:
+            from_block (int): Block after the last processed one
+            to_block (int): Current block
+
+        Returns:
+            Tuple[int, List[dict]]: The first block to scan and the headers of the blocks to scan,
+                (None, None) if the chain is changing under the RPC node and the poll should be retried
+        """
+        headers = await self._block_headers(from_block, to_block)
+        if headers is None or any(
+            child['parentHash'] != parent['hash'] for parent, child in zip(headers, headers[1:])
+        ):
+            return None, None
+        if self._block_hashes.extends(headers[0]):
+            return from_block, headers
+
+        ANCHOR_REORGS.inc()
+        oldest = self._block_hashes.oldest
+        canonical = await self._block_headers(oldest, from_block - 1)
+        if canonical is None:
+            return None, None
+        fork_point = self._block_hashes.common_ancestor({header['number']: header['hash'] for header in canonical})
+        if fork_point is None:
+            self._logger.error(
+                'Anchor chain reorg deeper than the {} tracked blocks, re-scanning from block {}',
+                settings.reorg.tracked_blocks, oldest,
+            )
+            fork_point = oldest - 1
+        self._block_hashes.rewind(fork_point)
+        self._logger.warning(
+            'Anchor chain reorg detected at block {}, re-scanning blocks {} to {}', from_block, fork_point + 1, to_block,
+        )
+        return fork_point + 1, [header for header in canonical if header['number'] > fork_point] + headers
+
     def _generic_exit_handler(self, signum, sigframe):
         """
         Generic signal handler for graceful process shutdown.
 
-        This handler manages the cleanup process when the application receives
-        termination signals. It ensures resources are properly released and
-        ongoing tasks are cancelled.
+        The first termination signal puts the process in drain mode: event detection stops,
+        newly released epochs are ignored and in-flight work gets up to
+        `settings.shutdown.drain_timeout` seconds to finish before pools are closed (see `_shutdown`).
+        A second signal received while draining exits immediately.
 
         Args:
             signum (int): Signal number received
@@ -286,28 +492,71 @@ class EventDetectorProcess(multiprocessing.Process):
         Note:
             Handles SIGINT, SIGTERM, and SIGQUIT signals
             Ensures only one shutdown process runs at a time
-            Forces exit after cleanup using os._exit()
         """
-        if (
-            signum in [SIGINT, SIGTERM, SIGQUIT] and
-            not self._shutdown_initiated
-        ):
-            self._shutdown_initiated = True
-            self._logger.info(f"Received signal {signal.Signals(signum).name}, initiating shutdown...")
-            
-            try:
-                # Cancel all running tasks
-                for task in asyncio.all_tasks(self.ev_loop):
-                    task.cancel()
-                # Clean up resources with timeout
-                if hasattr(self, '_telegram_httpx_client'):
-                    self._telegram_httpx_client.close()
-                self.ev_loop.stop()
-                
-            except Exception as e:
-                self._logger.error(f"Error during shutdown: {e}")
-            finally:
-                os._exit(0)
+        if signum not in [SIGINT, SIGTERM, SIGQUIT]:
+            return
+
+        if self._shutdown_initiated:
+            self._logger.warning(f"Received signal {signal.Signals(signum).name} while draining, exiting immediately")
+            flush_logs()
+            os._exit(1)
+
+        self._shutdown_initiated = True
+        self._logger.info(
+            f"Received signal {signal.Signals(signum).name}, draining in-flight work for up to "
+            f"{settings.shutdown.drain_timeout} seconds before shutdown...",
+        )
+        if hasattr(self, 'market_router'):
+            self.market_router.stop_accepting_epochs()
+        # unblocks run() which then drives the drain
+        self._detect_task.cancel()
+
+    async def _shutdown(self):
+        """
+        Drains in-flight epoch processing within the configured budget, then releases resources.
+
+        Tasks spawned while draining (e.g. snapshot builds kicked off by a finishing preload)
+        are waited on as well, as long as the budget lasts. Whatever is still running once the
+        budget is exhausted is cancelled; unacknowledged submissions stay in the outbox for replay.
+        """
+        deadline = time.time() + settings.shutdown.drain_timeout
+        distributor = getattr(self, 'market_router', None)
+
+        while True:
+            in_flight = set(self._in_flight_tasks)
+            if distributor:
+                in_flight |= distributor.in_flight_tasks
+            if not in_flight:
+                self._logger.info('All in-flight work drained')
+                break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self._logger.warning('Drain budget exhausted with {} tasks still in flight, cancelling them', len(in_flight))
+                break
+            await asyncio.wait(in_flight, timeout=remaining)
+
+        try:
+            if distributor:
+                await distributor.close()
+            if self._event_dispatcher:
+                await self._stop_worker_processes()
+            if hasattr(self, 'rpc_helper'):
+                await close_quietly(self.rpc_helper)
+                await close_quietly(self._source_rpc_helper)
+            await telegram_notifier.close()
+            await on_demand_profiler.stop()
+            await liveness_state.flush()
+            await local_http_server.stop()
+            loop_monitor.stop()
+        except Exception as e:
+            self._logger.error(f"Error during shutdown: {e}")
+
+        current_task = asyncio.current_task()
+        remaining_tasks = [task for task in asyncio.all_tasks() if task is not current_task]
+        for task in remaining_tasks:
+            task.cancel()
+        await asyncio.gather(*remaining_tasks, return_exceptions=True)
+        self._logger.info('Shutdown complete')
 
     async def check_last_submission(self):
         """
@@ -322,6 +571,7 @@ class EventDetectorProcess(multiprocessing.Process):
         try:
             if self.failure_count >= 3:
                 self._logger.error('Too many failures, exiting...')
+                await telegram_notifier.flush()
                 sys.exit(1)
 
             current_time = int(time.time())
@@ -332,33 +582,25 @@ class EventDetectorProcess(multiprocessing.Process):
             else:
                 self._logger.info('Checking epoch activity...., current failure count: {}', self.failure_count)
 
-            # Read slot selection status to verify node is processing epochs
-            selection_file = Path('slot_selection_status.txt')
-            if selection_file.exists():
-                try:
-                    async with aiofiles.open(selection_file, 'r') as f:
-                        selection_status = json.loads(await f.read())
-                    
-                    last_check_time = selection_status.get('timestamp', 0)
-                    
-                    # If no slot selection check in 10 minutes, node is stuck
-                    if current_time - last_check_time > 600:
-                        error_message = f'No epoch processing activity in 10 minutes. Last check: {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_check_time))}'
-                        self._logger.error(error_message)
-                        await self._send_telegram_epoch_processing_notification(
-                            error=Exception(error_message)
-                        )
-                        self.failure_count += 1
-                    else:
-                        self._logger.info('Epoch processing active. Last check: {}', time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last_check_time)))
-                        self.failure_count = 0
-                        
-                except Exception as e:
-                    self._logger.error('Error reading selection status: {}', e)
+            # Look up the latest slot selection check to verify node is processing epochs
+            selection_status = self._last_slot_selection()
+            if selection_status:
+                last_check_time = selection_status.get('timestamp', 0)
+
+                # If no slot selection check in 10 minutes, node is stuck
+                if current_time - last_check_time > 600:
+                    error_message = f'No epoch processing activity in 10 minutes. Last check: {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_check_time))}'
+                    self._logger.error(error_message)
+                    self._send_telegram_epoch_processing_notification(
+                        error=Exception(error_message)
+                    )
                     self.failure_count += 1
+                else:
+                    self._logger.info('Epoch processing active. Last check: {}', time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last_check_time)))
+                    self.failure_count = 0
             else:
-                self._logger.warning('No slot selection status file found - node may not have processed any epochs yet')
-                
+                self._logger.warning('No slot selection reported yet - node may not have processed any epochs yet')
+
         except Exception as e:
             self._logger.error('Error checking epoch activity: {}', e)
             self.failure_count += 1
@@ -372,8 +614,9 @@ class EventDetectorProcess(multiprocessing.Process):
         This method:
         1. Initializes the detector if not already done
         2. Periodically pings reporting service to indicate active status
-        3. Fetches and processes new blocks since last processed block
-        4. Handles event detection and distribution to processors
+        3. Fetches and processes new blocks since last processed block, re-scanning from the fork
+           point when the anchor chain reorganized since the last poll (see snapshotter.utils.reorg)
+        4. Handles event detection and distribution to processors, dispatching each epoch and day once
         5. Manages error conditions and recovery
         6. Implements configurable polling intervals
         
@@ -387,7 +630,9 @@ class EventDetectorProcess(multiprocessing.Process):
             await self.init()
             self._initialized = True
 
-        while True:
+        while not self._shutdown_initiated:
+            if self._event_dispatcher:
+                self._restart_dead_worker_processes()
             current_time = int(time.time())
             if current_time - self.last_status_check_time > 120:
                 await self.check_last_submission()
@@ -395,7 +640,8 @@ class EventDetectorProcess(multiprocessing.Process):
 
                 # Get current block from the appropriate RPC helper based on latest epoch
                 current_block = await self.rpc_helper.get_current_block_number()
-                
+                anchor_head.update(current_block)
+
                 self._logger.info('Current block: {}', current_block)
 
             except Exception as e:
@@ -408,7 +654,7 @@ class EventDetectorProcess(multiprocessing.Process):
                     settings.rpc.polling_interval,
                 )
 
-                await self._send_telegram_epoch_processing_notification(
+                self._send_telegram_epoch_processing_notification(
                     error=e,
                 )
 
@@ -434,9 +680,17 @@ class EventDetectorProcess(multiprocessing.Process):
                 )
                 self._last_processed_block = current_block - 10
 
-            # Get events from current block to last_processed_block
+            # Get events from the block after the last processed one, or from the fork point after a reorg
             try:
-                events = await self.get_events(self._last_processed_block + 1, current_block)
+                from_block, headers = await self._scan_range_start(self._last_processed_block + 1, current_block)
+                if from_block is None:
+                    self._logger.warning(
+                        'Blocks {} to {} are changing on the anchor chain, retrying in {} seconds',
+                        self._last_processed_block + 1, current_block, settings.rpc.polling_interval,
+                    )
+                    await asyncio.sleep(settings.rpc.polling_interval)
+                    continue
+                events = await self.get_events(from_block, current_block)
             except Exception as e:
                 self._logger.opt(exception=True).error(
                     (
@@ -449,7 +703,7 @@ class EventDetectorProcess(multiprocessing.Process):
                     settings.rpc.polling_interval,
                 )
 
-                await self._send_telegram_epoch_processing_notification(
+                self._send_telegram_epoch_processing_notification(
                     error=e,
                 )
 
@@ -457,15 +711,27 @@ class EventDetectorProcess(multiprocessing.Process):
                 continue
 
             for event_type, event in events:
+                if not self._dispatched_events.first_dispatch(event_type, event):
+                    DUPLICATE_EVENTS.inc(event=event_type)
+                    self._logger.info('Skipping {} event dispatched already: {}', event_type, event)
+                    continue
                 self._logger.info(
                     'Processing event: {}', event,
                 )
-                asyncio.ensure_future(
-                    self.processor_distributor.process_event(
-                        event_type, event,
-                    ),
-                )
+                if self._event_dispatcher:
+                    task = asyncio.ensure_future(
+                        self._event_dispatcher.dispatch(event_type, event, anchor_block=current_block),
+                    )
+                else:
+                    task = asyncio.ensure_future(
+                        self.market_router.process_event(
+                            event_type, event,
+                        ),
+                    )
+                self._in_flight_tasks.add(task)
+                task.add_done_callback(self._in_flight_tasks.discard)
 
+            self._block_hashes.record(headers)
             self._last_processed_block = current_block
             self._logger.info(
                 'DONE: Processed blocks till {}',
@@ -477,37 +743,25 @@ class EventDetectorProcess(multiprocessing.Process):
             )
             await asyncio.sleep(settings.rpc.polling_interval)
 
-    async def _send_telegram_epoch_processing_notification(
+    def _send_telegram_epoch_processing_notification(
         self,
         error: Exception,
     ):
         """
-        Send a Telegram notification about epoch processing errors.
+        Queue a Telegram notification about epoch processing errors.
 
-        This method constructs and sends a detailed error notification via Telegram
-        when epoch processing encounters issues. The notification includes instance
-        details, error information, and current status.
+        The notification includes instance details and error information. It is delivered in the
+        background by the notifier, which aggregates errors reported within the notification cooldown,
+        so this never waits on the reporting service.
 
         Args:
             error (Exception): The error that occurred during processing
-
-        Raises:
-            Various exceptions possible during HTTP requests
         """
-
-        if (int(time.time()) - self.last_notification_time) >= self.notification_cooldown and \
-            (settings.reporting.telegram_url and settings.reporting.telegram_chat_id):
-
-            if not self._telegram_httpx_client:
-                self._logger.error('Telegram client not initialized')
-                return
-            
-            message_thread_id = settings.reporting.telegram_message_thread_id
-
-            try:
-                telegram_message = TelegramEpochProcessingReportMessage(
+        try:
+            telegram_notifier.notify(
+                TelegramEpochProcessingReportMessage(
                     chatId=settings.reporting.telegram_chat_id,
-                    message_thread_id=message_thread_id,
+                    message_thread_id=settings.reporting.telegram_message_thread_id,
                     slotId=settings.slot_id,
                     issue=SnapshotterIssue(
                         instanceID=settings.instance_id,
@@ -517,17 +771,11 @@ class EventDetectorProcess(multiprocessing.Process):
                         timeOfReporting=str(time.time()),
                         extra=json.dumps({'issueDetails': f'Error : {error}'}),
                     ),
-                )
-
-                send_telegram_notification_sync(
-                    client=self._telegram_httpx_client,
-                    message=telegram_message,
-                )
+                ),
+            )
+        except Exception as e:
+            self._logger.error('Error queueing Telegram notification: {}', e)
 
-                self.last_notification_time = int(time.time())
-            except Exception as e:
-                self._logger.error('Error sending Telegram notification: {}', e)
-    
     def run(self):
         """
         Main entry point for the event detector process.
@@ -551,22 +799,29 @@ class EventDetectorProcess(multiprocessing.Process):
             (settings.rlimit.file_descriptors, hard),
         )
         
-        # Set up signal handlers
-        signal.signal(signal.SIGTERM, self._generic_exit_handler)
-        signal.signal(signal.SIGINT, self._generic_exit_handler)
-        signal.signal(signal.SIGQUIT, self._generic_exit_handler)
-
         self.ev_loop = asyncio.get_event_loop()
 
+        # Set up signal handlers on the loop so that they can safely schedule the drain
+        for sig in (SIGTERM, SIGINT, SIGQUIT):
+            self.ev_loop.add_signal_handler(sig, self._generic_exit_handler, sig, None)
+        install_profiling_signal_handler(self.ev_loop)
+
+        self._detect_task = self.ev_loop.create_task(self._detect_events())
         try:
             self._logger.info("Starting event detection loop")
-            self.ev_loop.run_until_complete(
-                self._detect_events(),
-            )
+            self.ev_loop.run_until_complete(self._detect_task)
+        except asyncio.CancelledError:
+            if not self._shutdown_initiated:
+                raise
         except Exception as e:
             self._logger.opt(exception=True).error(f"Fatal error in event loop: {e}")
+            flush_logs()
             os._exit(1)
 
+        if self._shutdown_initiated:
+            self.ev_loop.run_until_complete(self._shutdown())
+            self.ev_loop.close()
+
 
 if __name__ == '__main__':
     event_detector = EventDetectorProcess('EventDetector')
@@ -0,0 +1,58 @@
+"""
+Import-time benchmark.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and the cumulative import time
+is reported, together with the heavy third-party packages it pulled in. Run from the directory
+holding ``config/`` so modules that load configuration can be imported:
+
+    python -m snapshotter.tests.benchmark_imports [module ...]
+"""
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    'snapshotter.settings.config',
+    'snapshotter.utils.models.message_models',
+    'snapshotter.utils.callback_helpers',
+    'snapshotter.utils.signing',
+    'snapshotter.utils.snapshot_utils',
+    'snapshotter.snapshotter_id_ping',
+    'snapshotter.utils.generic_worker',
+    'snapshotter.system_event_detector',
+]
+
+HEAVY_PACKAGES = ['web3', 'eth_account', 'eip712_structs', 'grpclib', 'coincurve', 'httpx']
+
+
+def import_profile(module):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    return total_us / 1e6, [package for package in HEAVY_PACKAGES if package in imported]
+
+
+if __name__ == '__main__':
+    modules = sys.argv[1:] or MODULES
+    for module in modules:
+        try:
+            samples = [import_profile(module) for _ in range(3)]
+        except RuntimeError as e:
+            print(f'{module:<45} failed: {e}')
+            continue
+        seconds = statistics.median(sample[0] for sample in samples)
+        heavy = ', '.join(samples[0][1]) or '-'
+        print(f'{module:<45} {seconds * 1000:>8.1f} ms  heavy imports: {heavy}')
@@ -0,0 +1,88 @@
+"""
+Per-record logging cost benchmark.
+
+Compares the previous setup, with one rotating, compressing file sink per level each filtering and
+formatting every record, against the single level routed sink that queues records for a writer
+thread to format and write. The cost seen by
+the logging thread is reported as the CPU time it spends per record, which is what a busy event loop
+pays, and as wall clock time per record for a tight logging loop, in which the writer thread competes
+for the GIL. The time until every record is on disk is reported last:
+
+    python -m snapshotter.tests.benchmark_logging [records]
+"""
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+from snapshotter.utils.default_logger import exception_format
+from snapshotter.utils.default_logger import FORMAT
+from snapshotter.utils.default_logger import LevelRoutedFileSink
+from snapshotter.utils.default_logger import RecordLimiter
+
+LEVELS = ['TRACE', 'DEBUG', 'INFO', 'SUCCESS', 'WARNING', 'ERROR', 'CRITICAL']
+
+
+def add_legacy_sinks(directory):
+    # mirrors the previous default_logger setup
+    def level_filter(name):
+        return lambda record: record['level'].name == name
+
+    return [
+        logger.add(
+            f'{directory}/{level.lower()}.log', level=level, format=FORMAT, filter=level_filter(level),
+            rotation='6 hours', compression='tar.xz', retention='2 days',
+        )
+        for level in LEVELS
+    ]
+
+
+def log_records(count):
+    worker_logger = logger.bind(module='Worker|0')
+    start, start_cpu = time.perf_counter(), time.thread_time()
+    for i in range(count):
+        if i % 10:
+            worker_logger.info('Processed epoch {} for project {}', i, 'pairContract_trade_volume:0xabc')
+        else:
+            worker_logger.debug('Found {} events in blocks {} to {}', i % 3, i, i + 10)
+    return time.thread_time() - start_cpu, time.perf_counter() - start
+
+
+def report(label, count, logging_cpu, logging_elapsed, total_elapsed):
+    print(
+        f'{label:<26} {logging_cpu / count * 1e6:>5.1f} us cpu, {logging_elapsed / count * 1e6:>5.1f} us wall '
+        f'per record on the logging thread, {total_elapsed / count * 1e6:>5.1f} us until written',
+    )
+
+
+def benchmark_legacy(count):
+    with tempfile.TemporaryDirectory() as directory:
+        handler_ids = add_legacy_sinks(directory)
+        cpu, elapsed = log_records(count)
+        for handler_id in handler_ids:
+            logger.remove(handler_id)
+    report('seven filtered sinks', count, cpu, elapsed, elapsed)
+    return cpu
+
+
+def benchmark_routed(count, limiter=None):
+    with tempfile.TemporaryDirectory() as directory:
+        sink = LevelRoutedFileSink(directory=directory)
+        handler_id = logger.add(sink, level='TRACE', format=exception_format, filter=limiter)
+        start = time.perf_counter()
+        cpu, elapsed = log_records(count)
+        logger.remove(handler_id)
+        sink.close()
+        total = time.perf_counter() - start
+    report('routed sink' if limiter is None else 'routed sink, 1000/s limit', count, cpu, elapsed, total)
+    return cpu
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    logger.remove()
+    legacy = benchmark_legacy(count)
+    routed = benchmark_routed(count)
+    benchmark_routed(count, RecordLimiter(rate_limits={'Worker|0': 1000}))
+    print(f'cpu time saved on the logging thread: {legacy / routed:.1f}x')
@@ -0,0 +1,56 @@
+import random
+import time
+
+import sha3
+from coincurve import PrivateKey
+from eip712_structs import make_domain
+from eth_utils.encoding import big_endian_to_int
+
+from snapshotter.tests.test_submission_signer import CHAIN_ID
+from snapshotter.tests.test_submission_signer import PRIVATE_KEY
+from snapshotter.tests.test_submission_signer import PROTOCOL_STATE
+from snapshotter.tests.test_submission_signer import random_request
+from snapshotter.utils.signing import EIPRequest
+from snapshotter.utils.signing import SubmissionSigner
+
+
+class LegacySigner:
+    # mirrors the per-call work of the previous GenericAsyncWorker.generate_signature, with the domain and key cached
+    def __init__(self):
+        self._domain_separator = make_domain(
+            name='PowerloomProtocolContract', version='0.1', chainId=CHAIN_ID, verifyingContract=PROTOCOL_STATE,
+        )
+        self._identity_private_key = PrivateKey.from_hex(PRIVATE_KEY[2:])
+        self._keccak_hash = lambda x: sha3.keccak_256(x).digest()
+
+    def sign(self, slot_id, deadline, snapshot_cid, epoch_id, project_id):
+        request = EIPRequest(
+            slotId=slot_id, deadline=deadline, snapshotCid=snapshot_cid, epochId=epoch_id, projectId=project_id,
+        )
+        signable_bytes = request.signable_bytes(self._domain_separator)
+        signature = self._identity_private_key.sign_recoverable(signable_bytes, hasher=self._keccak_hash)
+        v = signature[64] + 27
+        r = big_endian_to_int(signature[0:32])
+        s = big_endian_to_int(signature[32:64])
+        return r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + v.to_bytes(1, 'big')
+
+
+def benchmark(label, fn, requests):
+    start = time.perf_counter()
+    for request in requests:
+        fn(**request)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<24} {len(requests) / elapsed:>10.0f} signatures/s  ({elapsed / len(requests) * 1e6:.1f} us each)')
+    return elapsed
+
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    requests = [random_request(rng) for _ in range(5000)]
+    legacy_signer = LegacySigner()
+    signer = SubmissionSigner(chain_id=CHAIN_ID, verifying_contract=PROTOCOL_STATE, private_key=PRIVATE_KEY)
+    assert all(legacy_signer.sign(**request) == signer.sign(**request) for request in requests[:100])
+
+    legacy = benchmark('eip712_structs path', legacy_signer.sign, requests)
+    fast = benchmark('precomputed signer', signer.sign, requests)
+    print(f'speedup: {legacy / fast:.1f}x')
@@ -0,0 +1,82 @@
+import json
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+from snapshotter.utils.canonical_json import BACKENDS
+from snapshotter.utils.canonical_json import canonical_json_dumps
+
+
+def reference_encode(obj):
+    # the encoding snapshot CIDs have always been computed over
+    return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class TradeVolume(BaseModel):
+    totalTradesUSD: float
+    totalFeeUSD: float
+    token0TradeVolume: float
+    token1TradeVolume: float
+
+
+class PairSnapshot(BaseModel):
+    contract: str
+    chainHeightRange: Dict[str, int]
+    timestamp: int
+    volume: TradeVolume
+    reserves: Dict[str, List[float]]
+    events: List[str]
+    note: Optional[str] = None
+
+
+PAIR_SNAPSHOT = PairSnapshot(
+    contract='0xB4e16d0168e52d35CaCD2c6185b44281Ec28C9Dc',
+    chainHeightRange={'begin': 19000000, 'end': 19000009},
+    timestamp=1710000000,
+    volume=TradeVolume(
+        totalTradesUSD=123456.789,
+        totalFeeUSD=370.37,
+        token0TradeVolume=61728.1,
+        token1TradeVolume=23.456789,
+    ),
+    reserves={'block19000000': [1234.5, 0.75], 'block19000001': [1235.25, 0.7499]},
+    events=['Swap', 'Mint', 'Burn'],
+)
+
+PAYLOADS = [
+    pytest.param({}, id='empty'),
+    pytest.param({'b': 1, 'a': 2, 'c': {'z': [], 'y': {}}}, id='key-order'),
+    pytest.param({'ints': [0, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 64 - 1]}, id='64-bit-ints'),
+    pytest.param({'uint256': 2 ** 255 + 12345}, id='wide-int'),
+    pytest.param({'floats': [0.1, 1.0, -0.0, 123.456, 0.30000000000000004, 1e15, 0.0001]}, id='decimal-floats'),
+    pytest.param({'floats': [1e16, 1e-5, 2.5e-07, 1e22, 12345678901234567.0, -0.00003]}, id='exponent-floats'),
+    pytest.param({'nan': float('nan'), 'inf': float('inf'), 'ninf': float('-inf')}, id='non-finite-floats'),
+    pytest.param({'none': None, 'flags': [True, False]}, id='null-and-bools'),
+    pytest.param({'text': 'quote" backslash\\ newline\n tab\t ctrl\x01 del\x7f'}, id='escapes'),
+    pytest.param({'text': 'naïve ₿ 😀', 'ключ': 'значение'}, id='non-ascii'),
+    pytest.param({'hex': '0x1e5', 'sci': '1e5', 'zero': '0.00001'}, id='number-like-strings'),
+    pytest.param({'tuple': (1, 'a', 2.5)}, id='tuple'),
+    pytest.param([{'b': 1}, {'a': [1, 2, {'d': 'x', 'c': 'y'}]}], id='top-level-list'),
+    pytest.param(1e-7, id='top-level-float'),
+    pytest.param(PAIR_SNAPSHOT.dict(by_alias=True), id='pair-snapshot'),
+]
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_backend_matches_reference_encoding(backend, payload):
+    assert BACKENDS[backend](payload) == reference_encode(payload)
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_backend_raises_on_unserializable_payload(backend):
+    with pytest.raises(TypeError):
+        BACKENDS[backend]({'obj': object()})
+
+
+def test_default_encoder_matches_reference_encoding():
+    payload = PAIR_SNAPSHOT.dict(by_alias=True)
+    assert canonical_json_dumps(payload) == reference_encode(payload)
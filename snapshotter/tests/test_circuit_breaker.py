@@ -0,0 +1,36 @@
+import asyncio
+
+import httpx
+from web3.exceptions import ContractLogicError
+
+from snapshotter.utils.circuit_breaker import CircuitBreaker
+from snapshotter.utils.circuit_breaker import CircuitState
+from snapshotter.utils.circuit_breaker import is_rpc_unavailable_error
+from snapshotter.utils.exceptions import RPCException
+
+
+def status_error(status):
+    request = httpx.Request('POST', 'http://rpc')
+    return httpx.HTTPStatusError('error', request=request, response=httpx.Response(status, request=request))
+
+
+def test_only_unavailable_rpc_nodes_open_the_circuit():
+    assert is_rpc_unavailable_error(asyncio.TimeoutError())
+    assert is_rpc_unavailable_error(RPCException(None, None, httpx.ConnectError('refused'), None))
+    assert is_rpc_unavailable_error(status_error(503)) and is_rpc_unavailable_error(status_error(429))
+    assert not is_rpc_unavailable_error(status_error(400))
+    assert not is_rpc_unavailable_error(RPCException(None, {'error': 'reverted'}, ContractLogicError('revert'), None))
+
+    async def revert():
+        raise ContractLogicError('revert')
+
+    async def run():
+        breaker = CircuitBreaker('rpc:test', failure_threshold=2, is_failure=is_rpc_unavailable_error)
+        for _ in range(5):
+            try:
+                await breaker.call(revert)
+            except ContractLogicError:
+                pass
+        return breaker.state
+
+    assert asyncio.run(run()) == CircuitState.CLOSED
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+import tenacity
+
+from snapshotter.settings.config import settings
+from snapshotter.utils import deadline
+from snapshotter.utils.deadline import AnchorHeadTracker
+from snapshotter.utils.deadline import deadline_retrying
+from snapshotter.utils.deadline import EpochDeadlines
+from snapshotter.utils.exceptions import SubmissionDeadlineExceeded
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def run_retrying(retrying, fn):
+    async def run():
+        async for attempt in retrying:
+            with attempt:
+                fn()
+    asyncio.run(run())
+
+
+def test_anchor_head_and_epoch_deadlines(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(deadline.time, 'time', clock.time)
+    monkeypatch.setattr(settings.protocol_state, 'deadline_buffer', 10)
+    head = AnchorHeadTracker(default_block_time=2.0)
+    deadlines = EpochDeadlines(head, max_epochs=2)
+
+    assert head.seconds_until(100) is None
+    # no deadline while the head is unknown
+    deadlines.register(1, released_at=990.0)
+    assert deadlines.remaining_seconds(1) is None and deadlines.released_at(1) == 990.0
+
+    head.update(100)
+    clock.now += 8
+    head.update(101)
+    # the block time estimate moves gradually towards the observed 8s
+    assert head.block_time == pytest.approx(3.2)
+    # stale heads are ignored
+    head.update(99)
+    assert head.block_number == 101
+
+    deadlines.register(1)
+    assert deadlines.remaining_seconds(1) == pytest.approx(32.0)
+    clock.now += 40
+    with pytest.raises(SubmissionDeadlineExceeded):
+        deadlines.check(1, 'submission')
+
+    # the oldest epochs are forgotten
+    deadlines.register(2)
+    deadlines.register(3)
+    assert deadlines.remaining_seconds(1) is None and deadlines.remaining_seconds(3) is not None
+
+
+def test_deadline_retrying(monkeypatch):
+    monkeypatch.setattr(settings.submission_retry, 'max_backoff', 0)
+    calls = []
+
+    def failing(error):
+        def fn():
+            calls.append(error)
+            raise error
+        return fn
+
+    # without a time budget, only the attempt count bounds retries
+    retrying = deadline_retrying(lambda: None, 3, lambda e: isinstance(e, ConnectionError), 'upload')
+    with pytest.raises(tenacity.RetryError):
+        run_retrying(retrying, failing(ConnectionError()))
+    assert len(calls) == 3
+
+    # errors that are not retryable are raised at once
+    calls.clear()
+    retrying = deadline_retrying(lambda: None, 3, lambda e: isinstance(e, ConnectionError), 'upload')
+    with pytest.raises(ValueError):
+        run_retrying(retrying, failing(ValueError()))
+    assert len(calls) == 1
+
+    # retries stop once the budget is spent, telling late work apart from failed work
+    calls.clear()
+    budget = iter([5.0, 5.0, 0.0, 0.0, 0.0])
+    retrying = deadline_retrying(lambda: next(budget), 10, lambda e: True, 'upload')
+    with pytest.raises(SubmissionDeadlineExceeded) as e:
+        run_retrying(retrying, failing(ConnectionError()))
+    assert len(calls) == 2 and isinstance(e.value.__cause__, ConnectionError)
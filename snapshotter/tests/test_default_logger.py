@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from loguru import logger
+
+from snapshotter.utils import default_logger
+from snapshotter.utils.default_logger import exception_format
+from snapshotter.utils.default_logger import LevelRoutedFileSink
+from snapshotter.utils.default_logger import RecordLimiter
+
+
+def record(level, module):
+    return {'level': logger.level(level), 'extra': {'module': module}, 'name': 'snapshotter.tests'}
+
+
+def test_records_are_routed_to_their_level_file(tmp_path):
+    sink = LevelRoutedFileSink(directory=str(tmp_path))
+    handler_id = logger.add(sink, level='TRACE', format=exception_format)
+    try:
+        logger.bind(module='Test').info('to info')
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.bind(module='Test').exception('to error')
+        logger.trace('to trace')
+    finally:
+        logger.remove(handler_id)
+        sink.close()
+
+    assert sorted(os.listdir(tmp_path)) == ['error.log', 'info.log', 'trace.log']
+    info = (tmp_path / 'info.log').read_text()
+    assert info.count('\n') == 1 and info.endswith(' | INFO | to info | {\'module\': \'Test\'}\n')
+    assert 'ZeroDivisionError' in (tmp_path / 'error.log').read_text()
+
+
+def test_rotated_files_are_compressed(tmp_path):
+    sink = LevelRoutedFileSink(directory=str(tmp_path), rotation=0)
+    sink.emit('INFO', 'first')
+    sink.emit('INFO', 'second')
+    sink.close()
+
+    rotated = [f for f in os.listdir(tmp_path) if f != 'info.log']
+    assert (tmp_path / 'info.log').read_text().endswith(' | INFO | second | {}\n')
+    assert len(rotated) == 1 and rotated[0].endswith('.log.tar.xz')
+
+
+def test_stale_process_directories_are_removed(tmp_path):
+    for name, age in (('SpawnProcess-7', 3 * 24 * 60 * 60), ('SnapshotWorker-0', 0)):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'info.log').write_text('line\n')
+        modified = time.time() - age
+        os.utime(tmp_path / name / 'info.log', (modified, modified))
+
+    LevelRoutedFileSink(directory=str(tmp_path), prune_process_dirs=True).close()
+
+    assert sorted(os.listdir(tmp_path)) == ['SnapshotWorker-0']
+
+
+def test_full_queue_drops_records_below_error(tmp_path):
+    sink = LevelRoutedFileSink(directory=str(tmp_path), queue_size=1)
+    release = threading.Event()
+    write = sink._write
+    sink._write = lambda item: (release.wait(), write(item))
+    sink.emit('INFO', 'being written')
+    while not sink._queue.empty():
+        time.sleep(0.001)
+    sink.emit('INFO', 'queued')
+    sink.emit('INFO', 'dropped')
+    assert sink.overflowed == 1
+
+    release.set()
+    sink.flush()
+    # flushed without closing the sink
+    assert (tmp_path / 'info.log').read_text().count('\n') == 2
+    assert 'Dropped 1 records while the log queue was full' in (tmp_path / 'warning.log').read_text()
+    sink.close()
+
+
+def test_sampling_and_rate_limits(monkeypatch):
+    sink = SimpleNamespace(lines=[], emit=lambda level, message: sink.lines.append((level, message)))
+    limiter = RecordLimiter(sampling={'Sampled': 0.0}, rate_limits={'Chatty': 2}, sink=sink)
+    monkeypatch.setattr(default_logger.time, 'monotonic', lambda: 100.0)
+
+    assert [limiter(record('INFO', 'Chatty')) for _ in range(4)] == [True, True, False, False]
+    # warnings and other modules are never limited
+    assert limiter(record('WARNING', 'Chatty')) and limiter(record('DEBUG', 'Other'))
+    assert not limiter(record('DEBUG', 'Sampled')) and limiter(record('ERROR', 'Sampled'))
+
+    monkeypatch.setattr(default_logger.time, 'monotonic', lambda: 101.0)
+    assert limiter(record('INFO', 'Chatty'))
+    assert limiter.dropped == {'Chatty': 2, 'Sampled': 1}
+    assert len(sink.lines) == 1 and 'Dropped 2 records of Chatty over its rate limit of 2/s' in sink.lines[0][1]
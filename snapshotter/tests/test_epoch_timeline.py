@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.epoch_timeline import _epochs_endpoint
+from snapshotter.utils.epoch_timeline import EpochTimeline
+from snapshotter.utils.models.data_models import SnapshotterStates
+
+MARKET = '0x00000000000000000000000000000000000000E1'
+
+
+def test_store_is_bounded_and_queryable():
+    timeline = EpochTimeline(MARKET, max_epochs=3, export_path='')
+    for epoch_id in range(1, 6):
+        timeline.record(epoch_id, SnapshotterStates.EPOCH_RELEASED, epoch_end=epoch_id * 10)
+    timeline.record(4, SnapshotterStates.SNAPSHOT_BUILD, 'pairContract_trade_volume', error=ValueError('boom'))
+    timeline.record(5, SnapshotterStates.SNAPSHOT_BUILD, 'pairContract_trade_volume', extra={'duration': 0.5})
+
+    # the oldest epochs are evicted
+    assert timeline.get(2) is None and timeline.get(3).epochEnd == 30
+    assert [item.epochId for item in timeline.recent()] == [5, 4, 3]
+    assert [item.epochId for item in timeline.recent(limit=1)] == [5]
+    assert [item.epochId for item in timeline.recent(failed_only=True)] == [4]
+    assert EpochTimeline.has_failures(timeline.get(4)) and not EpochTimeline.has_failures(timeline.get(5))
+    assert timeline.get(4).transitionStatus['SNAPSHOT_BUILD']['pairContract_trade_volume'].error == 'boom'
+
+
+def test_epochs_endpoint_parses_query():
+    timeline = EpochTimeline(MARKET, max_epochs=10, export_path='')
+    timeline.record(7, SnapshotterStates.EPOCH_RELEASED)
+    timeline.record(8, SnapshotterStates.PRELOAD, 'block_details', error=TimeoutError())
+
+    def query(**params):
+        status, _, body = asyncio.run(_epochs_endpoint({'market': MARKET.lower(), **params}))
+        return status, json.loads(body)
+
+    status, body = query(epoch_id='7')
+    assert status == 200 and [item['epochId'] for item in body[MARKET]] == [7]
+    assert query(epoch_id='9')[1] == {MARKET: []}
+    assert [item['epochId'] for item in query(failed='true')[1][MARKET]] == [8]
+    assert [item['epochId'] for item in query(limit='1')[1][MARKET]] == [8]
+    assert query(limit='many')[0] == 400
+
+
+def test_export_appends_updated_epochs_and_rotates(tmp_path, monkeypatch):
+    path = tmp_path / 'timeline.jsonl'
+
+    async def run():
+        timeline = EpochTimeline(MARKET, export_path=str(path), export_interval=60)
+        timeline.record(1, SnapshotterStates.EPOCH_RELEASED)
+        timeline.record(2, SnapshotterStates.EPOCH_RELEASED)
+        await timeline.export()
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)['epochId'] for line in lines] == [1, 2]
+        assert json.loads(lines[0])['dataMarket'] == MARKET
+
+        # nothing updated since the last export
+        await timeline.export()
+        assert len(path.read_text().splitlines()) == 2
+
+        monkeypatch.setattr(settings.epoch_timeline, 'max_export_bytes', 1)
+        timeline.record(2, SnapshotterStates.PRELOAD, 'block_details')
+        await timeline.close()
+        assert len((tmp_path / 'timeline.jsonl.1').read_text().splitlines()) == 2
+        [line] = path.read_text().splitlines()
+        assert 'PRELOAD' in json.loads(line)['transitionStatus']
+
+    asyncio.run(run())
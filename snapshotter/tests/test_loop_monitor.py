@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from snapshotter.utils.loop_monitor import LoopMonitor
+from snapshotter.utils.metrics import EVENT_LOOP_LAG
+from snapshotter.utils.metrics import EVENT_LOOP_STALLS
+
+
+def test_blocking_call_is_reported(monkeypatch):
+    reports = []
+    monitor = LoopMonitor(sample_interval=0.02, stall_threshold=0.1)
+    monkeypatch.setattr(monitor, '_report_stall', lambda blocked: reports.append(blocked))
+
+    def blocking_call():
+        time.sleep(0.3)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    stalls = EVENT_LOOP_STALLS.value()
+    samples = EVENT_LOOP_LAG.count()
+    asyncio.run(run())
+
+    assert len(reports) == 1 and reports[0] >= 0.1
+    assert EVENT_LOOP_STALLS.value() == stalls + 1
+    assert EVENT_LOOP_LAG.count() > samples
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from snapshotter.utils.exceptions import SubmissionDeadlineExceeded
+from snapshotter.utils.metrics import Counter
+from snapshotter.utils.metrics import Histogram
+from snapshotter.utils.metrics import MetricsRegistry
+from snapshotter.utils.metrics import project_type_of
+
+
+def test_histogram_exposition():
+    histogram = Histogram('stage_seconds', 'Stage duration.', ['stage'], buckets=(0.1, 1))
+    histogram.observe(0.05, stage='sign')
+    histogram.observe(0.5, stage='sign')
+    histogram.observe(3, stage='sign')
+
+    assert histogram.render().split('\n') == [
+        '# HELP stage_seconds Stage duration.',
+        '# TYPE stage_seconds histogram',
+        'stage_seconds_bucket{stage="sign",le="0.1"} 1',
+        'stage_seconds_bucket{stage="sign",le="1"} 2',
+        'stage_seconds_bucket{stage="sign",le="+Inf"} 3',
+        'stage_seconds_sum{stage="sign"} 3.55',
+        'stage_seconds_count{stage="sign"} 3',
+    ]
+
+
+def test_histogram_time_fills_in_outcome():
+    histogram = Histogram('stage_seconds', 'Stage duration.', ['stage', 'outcome'])
+    with histogram.time(stage='submit'):
+        pass
+    with pytest.raises(SubmissionDeadlineExceeded):
+        with histogram.time(stage='submit'):
+            raise SubmissionDeadlineExceeded('late')
+    with pytest.raises(ValueError):
+        with histogram.time(stage='submit'):
+            raise ValueError()
+
+    assert histogram.count(stage='submit', outcome='success') == 1
+    assert histogram.count(stage='submit', outcome='deadline_exceeded') == 1
+    assert histogram.count(stage='submit', outcome='error') == 1
+
+
+def test_histogram_time_across_awaits():
+    histogram = Histogram('stage_seconds', 'Stage duration.', ['stage'], buckets=(0.01, 1))
+
+    async def timed_sleep():
+        with histogram.time(stage='compute'):
+            await asyncio.sleep(0.02)
+
+    asyncio.run(timed_sleep())
+    assert 'stage_seconds_bucket{stage="compute",le="0.01"} 0' in histogram.render()
+    assert histogram.count(stage='compute') == 1
+
+
+def test_counter_and_registry():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter('submissions_total', 'Submissions.', ['project_type', 'outcome']))
+    counter.inc(project_type='pairContract_trade_volume', outcome='success')
+    counter.inc(project_type='pairContract_trade_volume', outcome='success')
+
+    assert registry.render().endswith('submissions_total{project_type="pairContract_trade_volume",outcome="success"} 2\n')
+    with pytest.raises(ValueError):
+        counter.inc(project_type='pairContract_trade_volume')
+    with pytest.raises(ValueError):
+        registry.register(Counter('submissions_total', 'Duplicate.'))
+
+
+def test_project_type_of():
+    assert project_type_of('pairContract_trade_volume:0xabc:UNISWAPV2') == 'pairContract_trade_volume'
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from web3 import Web3
+
+from snapshotter.utils.exceptions import RPCException
+from snapshotter.utils.multicall import MulticallAggregator
+
+CONTRACT = '0x' + '11' * 20
+ABI = [
+    {
+        'inputs': [{'name': 'x', 'type': 'uint256'}],
+        'name': 'double',
+        'outputs': [{'name': '', 'type': 'uint256'}],
+        'stateMutability': 'view',
+        'type': 'function',
+    },
+]
+# argument for which the contract reverts
+REVERTING = 13
+
+
+class StubRpcHelper:
+    """
+    Answers ``double`` individually and through aggregate3, unless multicall is not deployed.
+    """
+
+    def __init__(self, multicall_deployed: bool = True):
+        self.multicall_deployed = multicall_deployed
+        self.aggregated_batches = []
+        self.individual_calls = 0
+        self._codec = Web3().codec
+
+    async def web3_call(self, tasks, contract_addr, abi):
+        [(fn_name, args)] = tasks
+        if fn_name != 'aggregate3':
+            self.individual_calls += 1
+            if args[0] == REVERTING:
+                raise RPCException(request=args, response=None, underlying_exception=None, extra_info='reverted')
+            return [args[0] * 2]
+        if not self.multicall_deployed:
+            raise RPCException(request=args, response=None, underlying_exception=None, extra_info='no code')
+        [calls] = args
+        self.aggregated_batches.append(len(calls))
+        results = []
+        for _, allow_failure, call_data in calls:
+            assert allow_failure
+            [x] = self._codec.decode(['uint256'], bytes.fromhex(call_data[10:]))
+            if x == REVERTING:
+                results.append((False, b''))
+            else:
+                results.append((True, self._codec.encode(['uint256'], [x * 2])))
+        return [results]
+
+
+def call(aggregator, *xs):
+    return aggregator.web3_call([('double', [x]) for x in xs], contract_addr=CONTRACT, abi=ABI)
+
+
+def test_batches_flush_on_window_or_size_and_decode_each_call():
+    async def run():
+        rpc_helper = StubRpcHelper()
+        aggregator = MulticallAggregator(rpc_helper, batch_window_ms=10, max_calls_per_batch=3)
+        # calls from unrelated coroutines within the window share a batch
+        assert await asyncio.gather(call(aggregator, 1), call(aggregator, 2)) == [[2], [4]]
+        assert rpc_helper.aggregated_batches == [2]
+
+        # a full batch is flushed without waiting for the window
+        aggregator = MulticallAggregator(rpc_helper, batch_window_ms=60000, max_calls_per_batch=3)
+        assert await asyncio.wait_for(call(aggregator, 3, 4, 5), 1) == [6, 8, 10]
+        assert rpc_helper.aggregated_batches == [2, 3]
+
+        # a reverting sub-call only fails its own caller
+        aggregator = MulticallAggregator(rpc_helper, batch_window_ms=10)
+        results = await asyncio.gather(call(aggregator, 6), call(aggregator, REVERTING), return_exceptions=True)
+        assert results[0] == [12] and isinstance(results[1], RPCException)
+        assert rpc_helper.individual_calls == 0
+
+    asyncio.run(run())
+
+
+def test_falls_back_to_individual_calls_and_reprobes():
+    async def run():
+        rpc_helper = StubRpcHelper(multicall_deployed=False)
+        aggregator = MulticallAggregator(
+            rpc_helper, batch_window_ms=1, disable_after_failures=2, reprobe_interval=0.2,
+        )
+        # failed batches are answered by individual calls
+        assert await asyncio.gather(call(aggregator, 1), call(aggregator, 2)) == [[2], [4]]
+        assert aggregator.aggregating
+        with pytest.raises(RPCException):
+            await asyncio.gather(call(aggregator, 3), call(aggregator, REVERTING))
+        # disabled after the second consecutive batch failing as aggregate3
+        assert not aggregator.aggregating
+        assert rpc_helper.individual_calls == 4
+
+        assert await asyncio.gather(call(aggregator, 5), call(aggregator, 6)) == [[10], [12]]
+        assert rpc_helper.individual_calls == 6
+
+        # once the interval passed, the next batch probes aggregate3 again
+        await asyncio.sleep(0.2)
+        rpc_helper.multicall_deployed = True
+        assert await asyncio.gather(call(aggregator, 7), call(aggregator, 8)) == [[14], [16]]
+        assert rpc_helper.aggregated_batches == [2] and rpc_helper.individual_calls == 6
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.models.data_models import SnapshotterIssue
+from snapshotter.utils.models.data_models import SnapshotterStatus
+from snapshotter.utils.models.message_models import TelegramSnapshotterReportMessage
+from snapshotter.utils.notifications import TelegramNotifier
+
+
+def _missed_snapshot(epoch_id: int) -> TelegramSnapshotterReportMessage:
+    return TelegramSnapshotterReportMessage(
+        chatId='1',
+        slotId=1,
+        message_thread_id='',
+        status=SnapshotterStatus(projects=[], totalMissedSubmissions=epoch_id),
+        issue=SnapshotterIssue(
+            instanceID='0x1',
+            issueType='MISSED_SNAPSHOT',
+            projectID='pairContract_trade_volume',
+            epochId=str(epoch_id),
+            timeOfReporting='0',
+            extra=json.dumps({'issueDetails': 'Error : boom'}),
+        ),
+    )
+
+
+def test_reports_within_cooldown_are_aggregated(monkeypatch):
+    monkeypatch.setattr(settings.reporting, 'telegram_url', 'http://localhost:1')
+    monkeypatch.setattr(settings.reporting, 'telegram_chat_id', '1')
+    notifier = TelegramNotifier(cooldown=60, max_issues=2, timeout=1)
+    sent = []
+
+    async def post(endpoint, message):
+        sent.append(message)
+    monkeypatch.setattr(notifier, '_post', post)
+
+    async def run():
+        for epoch_id in (1, 2, 2, 3, 4):
+            notifier.notify(_missed_snapshot(epoch_id))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+        # the first report goes out right away, the others wait for the cooldown
+        assert [message.issue.epochId for message in sent] == ['1']
+        await notifier.close()
+
+    asyncio.run(run())
+
+    aggregated = sent[1]
+    details = json.loads(aggregated.issue.extra)
+    assert aggregated.issue.epochId == '2, 3'
+    assert details['issueDetails'] == '3 MISSED_SNAPSHOT issues since the last report'
+    assert [issue['epochId'] for issue in details['issues']] == ['2', '3']
+    assert details['omitted'] == 1
+    # sent with the status of the latest report
+    assert aggregated.status.totalMissedSubmissions == 4
@@ -0,0 +1,39 @@
+import asyncio
+import pstats
+import time
+
+import pytest
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.profiling import OnDemandProfiler
+
+
+def _busy():
+    end = time.monotonic() + 0.01
+    while time.monotonic() < end:
+        pass
+
+
+@pytest.mark.parametrize('mode', ['sampling', 'deterministic'])
+def test_session_writes_task_snapshot_and_profile(tmp_path, monkeypatch, mode):
+    monkeypatch.setattr(settings.profiling, 'output_dir', str(tmp_path))
+    monkeypatch.setattr(settings.profiling, 'sampling_interval_ms', 1)
+    profiler = OnDemandProfiler()
+
+    async def run():
+        status = profiler.start(duration=60, mode=mode)
+        # a second start does not replace the running session
+        assert profiler.start(mode=mode) == status
+        for _ in range(20):
+            _busy()
+            await asyncio.sleep(0.005)
+        return await profiler.stop()
+
+    session = asyncio.run(run())
+
+    assert not profiler.running
+    assert 'Stack for <Task' in open(session['tasks_path']).read()
+    if mode == 'sampling':
+        assert '_busy (test_profiling.py' in open(session['profile_path']).read()
+    else:
+        assert any(func[2] == '_busy' for func in pstats.Stats(session['profile_path']).stats)
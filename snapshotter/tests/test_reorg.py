@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from snapshotter.utils.reorg import BlockHashTracker
+from snapshotter.utils.reorg import DispatchedEvents
+
+MARKET = '0x0000000000000000000000000000000000000001'
+
+
+def headers(start, end, fork=''):
+    return [
+        {'number': n, 'hash': f'0x{fork}{n}', 'parentHash': f'0x{fork if n > start else ""}{n - 1}'}
+        for n in range(start, end + 1)
+    ]
+
+
+def test_reorg_is_rescanned_from_the_fork_point():
+    tracker = BlockHashTracker(depth=5)
+    tracker.record(headers(1, 10))
+    assert tracker.oldest == 6
+    assert tracker.extends(headers(11, 11)[0])
+
+    # blocks 9 and 10 were replaced, the new block 11 builds on the new block 10
+    fork = headers(9, 11, fork='f')
+    assert not tracker.extends(fork[-1])
+    canonical = {header['number']: header['hash'] for header in headers(6, 8) + fork[:2]}
+    assert tracker.common_ancestor(canonical) == 8
+    tracker.rewind(8)
+    tracker.record(fork)
+    assert tracker.extends({'number': 12, 'hash': '0x12', 'parentHash': '0xf11'})
+    # deeper than the tracked blocks
+    assert tracker.common_ancestor({}) is None
+
+
+def test_epochs_and_days_are_dispatched_once():
+    dispatched = DispatchedEvents(capacity=2)
+    epoch = SimpleNamespace(epochId=7, dataMarket=MARKET)
+    assert dispatched.first_dispatch('EpochReleased', epoch)
+    assert not dispatched.first_dispatch('EpochReleased', SimpleNamespace(epochId=7, dataMarket=MARKET.upper()))
+    assert dispatched.first_dispatch('DayStartedEvent', SimpleNamespace(dayId=7, dataMarket=MARKET))
+    # events without an identity are always dispatched
+    assert dispatched.first_dispatch('DailyTaskCompletedEvent', SimpleNamespace(dayId=7))
+    assert dispatched.first_dispatch('DailyTaskCompletedEvent', SimpleNamespace(dayId=7))
+    # the window only remembers the most recent events
+    assert dispatched.first_dispatch('EpochReleased', SimpleNamespace(epochId=8, dataMarket=MARKET))
+    assert dispatched.first_dispatch('EpochReleased', epoch)
@@ -0,0 +1,48 @@
+import asyncio
+
+from snapshotter.utils.metrics import observe_stage
+from snapshotter.utils.submission_history import note
+from snapshotter.utils.submission_history import recording
+from snapshotter.utils.submission_history import SubmissionHistory
+
+MARKET = '0x0000000000000000000000000000000000000001'
+
+
+def test_recording_collects_notes_and_stage_timings():
+    with recording() as attempt:
+        note(snapshots=2)
+        with recording() as submission:
+            note(cid='bafy')
+            observe_stage('submit', 'pairContract_trade_volume', 0.25)
+        observe_stage('compute', 'pairContract_trade_volume', 0.5)
+
+    assert attempt == {'snapshots': 2, 'compute_ms': 500.0}
+    assert submission == {'cid': 'bafy', 'submit_ms': 250.0}
+    # outside of a recording notes are ignored
+    note(cid='bafy')
+
+
+def test_queries_over_windows(tmp_path):
+    async def run():
+        history = SubmissionHistory(MARKET, db_path=str(tmp_path / 'history.db'), flush_interval_ms=0)
+        # slot 1 selected for epochs 10 to 14, failing 11, 13 and 14; not selected for epoch 15
+        for epoch_id in range(10, 15):
+            error = ValueError('boom') if epoch_id in (11, 13, 14) else None
+            history.record_attempt(epoch_id, 1, 'pairContract_trade_volume', True, {'compute_ms': epoch_id}, error=error)
+        history.record_attempt(15, 1, 'pairContract_trade_volume', False)
+        for epoch_id in range(1, 21):
+            history.record_submission(epoch_id, 1, 'pairContract_trade_volume:0xabc:ns', {'submit_ms': epoch_id * 10})
+        # simulations are not recorded
+        history.record_attempt(0, 1, 'pairContract_trade_volume', True, error=ValueError('boom'))
+
+        assert await history.success_rate() == {'attempts': 5, 'succeeded': 2, 'rate': 0.4}
+        assert await history.success_rate(to_epoch=10) == {'attempts': 1, 'succeeded': 1, 'rate': 1.0}
+        assert (await history.success_rate(slot_id=2))['rate'] is None
+        assert await history.latency_percentile(0.95, 'submit') == 190
+        assert await history.latency_percentile(0.5, 'submit', from_epoch=11) == 150
+        assert await history.latency_percentile(0.95, 'compute') == 12
+        assert await history.missed_epoch_streak() == {'current': 2, 'longest': 2, 'missed_epochs': 3}
+        assert await history.missed_epoch_streak(to_epoch=12) == {'current': 0, 'longest': 1, 'missed_epochs': 1}
+        await history.close()
+
+    asyncio.run(run())
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from snapshotter.utils.deadline import anchor_head
+from snapshotter.utils.models.proto.snapshot_submission.submission_pb2 import SnapshotSubmission
+from snapshotter.utils.submission_outbox import SubmissionOutbox
+
+
+def submission(epoch_id: int, deadline: int, project_id: str = 'pairContract_trade_volume:0xabc:ns') -> SnapshotSubmission:
+    msg = SnapshotSubmission()
+    msg.request.slotId = 1
+    msg.request.epochId = epoch_id
+    msg.request.deadline = deadline
+    msg.request.projectId = project_id
+    msg.request.snapshotCid = f'bafy{epoch_id}'
+    return msg
+
+
+def journal_ops(path):
+    return [json.loads(line)['op'] for line in path.read_text().splitlines()]
+
+
+def test_record_acknowledge_and_recover(tmp_path):
+    path = tmp_path / 'outbox.jsonl'
+
+    async def run():
+        outbox = SubmissionOutbox(journal_path=str(path), fsync_interval_ms=0)
+        for epoch_id in (3, 1, 2):
+            await outbox.record(submission(epoch_id, deadline=100 + epoch_id))
+        await outbox.acknowledge(submission(2, deadline=102))
+        # acknowledging twice appends nothing
+        await outbox.acknowledge(submission(2, deadline=102))
+        await outbox.flush()
+        assert outbox.pending_count == 2
+        assert journal_ops(path) == ['pending', 'pending', 'pending', 'ack']
+
+        # a torn last line left behind by a crash is skipped
+        with open(path, 'a') as f:
+            f.write('{"op": "pen')
+
+        restarted = SubmissionOutbox(journal_path=str(path), fsync_interval_ms=0)
+        # epoch 1's deadline block has passed
+        replay = await restarted.recover(current_block=102)
+        assert [msg.request.epochId for msg in replay] == [3]
+        assert restarted.pending_count == 1
+        assert journal_ops(path) == ['pending']
+
+    asyncio.run(run())
+
+
+def test_compaction_drops_acknowledged_and_expired_entries(tmp_path, monkeypatch):
+    path = tmp_path / 'outbox.jsonl'
+    monkeypatch.setattr(anchor_head, 'block_number', 105)
+
+    async def run():
+        outbox = SubmissionOutbox(journal_path=str(path), fsync_interval_ms=0, compact_after_acks=2)
+        for epoch_id in range(1, 5):
+            await outbox.record(submission(epoch_id, deadline=100 + epoch_id * 2))
+        await outbox.acknowledge(submission(4, deadline=108))
+        await outbox.flush()
+        assert journal_ops(path) == ['pending'] * 4 + ['ack']
+
+        # the second acknowledgement triggers compaction: epochs 1 and 2 are behind the head
+        await outbox.acknowledge(submission(3, deadline=106))
+        await outbox.flush()
+        assert outbox.pending_count == 0
+        assert path.read_text() == ''
+
+        # while no acknowledgements arrive, compaction is triggered by the journal size
+        outbox = SubmissionOutbox(journal_path=str(path), fsync_interval_ms=0, compact_after_bytes=1)
+        await outbox.record(submission(1, deadline=101))
+        await outbox.record(submission(10, deadline=120))
+        assert outbox.pending_count == 1
+        assert [json.loads(line)['key'] for line in path.read_text().splitlines()] == [
+            '1:10:pairContract_trade_volume:0xabc:ns',
+        ]
+
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+import random
+import string
+
+import pytest
+import sha3
+from coincurve import PrivateKey
+from eip712_structs import make_domain
+from eth_utils.encoding import big_endian_to_int
+
+from snapshotter.utils.signing import EIPRequest
+from snapshotter.utils.signing import SubmissionSigner
+
+CHAIN_ID = 11167
+PROTOCOL_STATE = '0x000AA7d3a6a2556496f363B59e56D9aA1881548F'
+PRIVATE_KEY = '0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d'
+OTHER_PRIVATE_KEY = '0x5de4111afa1a4b94908f83103eb1f1706367c2e68ca870fc3fb9a804cdab365a'
+
+GOLDEN_REQUEST = dict(
+    slot_id=42,
+    deadline=1234567,
+    snapshot_cid='bafkreigdhwqyg3jw5qrykw3bqhzefbh3qdkegvnv6a4ufwhw2ttnogm4de',
+    epoch_id=98765,
+    project_id='pairContract_trade_volume:0xb4e16d0168e52d35cacd2c6185b44281ec28c9dc:UNISWAPV2',
+)
+GOLDEN_SIGNATURE = (
+    'aaa0ce5e7d93c0e7122000e9727d3975b1e4cb7d38d8a9b752912c646ca56753'
+    '114959cde9d485c0ca0162b3d4489c48e50342402c3275c5583c5396ad55b25e1b'
+)
+
+
+def reference_signature(slot_id, deadline, snapshot_cid, epoch_id, project_id, private_key=PRIVATE_KEY):
+    # signing path used by GenericAsyncWorker.generate_signature before the precomputed signer
+    domain = make_domain(
+        name='PowerloomProtocolContract', version='0.1', chainId=CHAIN_ID, verifyingContract=PROTOCOL_STATE,
+    )
+    request = EIPRequest(
+        slotId=slot_id, deadline=deadline, snapshotCid=snapshot_cid, epochId=epoch_id, projectId=project_id,
+    )
+    signature = PrivateKey.from_hex(private_key[2:]).sign_recoverable(
+        request.signable_bytes(domain), hasher=lambda x: sha3.keccak_256(x).digest(),
+    )
+    v = signature[64] + 27
+    r = big_endian_to_int(signature[0:32])
+    s = big_endian_to_int(signature[32:64])
+    return r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + v.to_bytes(1, 'big')
+
+
+def random_request(rng):
+    text = string.ascii_letters + string.digits + ':_'
+    return dict(
+        slot_id=rng.randrange(1, 10_000),
+        deadline=rng.randrange(0, 2 ** 64),
+        snapshot_cid='bafkrei' + ''.join(rng.choice(string.ascii_lowercase) for _ in range(52)),
+        epoch_id=rng.randrange(0, 2 ** 32),
+        project_id=''.join(rng.choice(text) for _ in range(rng.randrange(0, 120))),
+    )
+
+
+@pytest.fixture(scope='module')
+def signer():
+    return SubmissionSigner(chain_id=CHAIN_ID, verifying_contract=PROTOCOL_STATE, private_key=PRIVATE_KEY)
+
+
+def test_golden_vector(signer):
+    assert signer.sign(**GOLDEN_REQUEST).hex() == GOLDEN_SIGNATURE
+    assert reference_signature(**GOLDEN_REQUEST).hex() == GOLDEN_SIGNATURE
+
+
+def test_digest_matches_eip712_structs(signer):
+    request = EIPRequest(
+        slotId=GOLDEN_REQUEST['slot_id'],
+        deadline=GOLDEN_REQUEST['deadline'],
+        snapshotCid=GOLDEN_REQUEST['snapshot_cid'],
+        epochId=GOLDEN_REQUEST['epoch_id'],
+        projectId=GOLDEN_REQUEST['project_id'],
+    )
+    expected = sha3.keccak_256(request.signable_bytes(signer.domain)).digest()
+    assert signer.domain_separator == signer.domain.hash_struct()
+    assert signer.type_hash == EIPRequest.type_hash()
+    assert signer.digest(**GOLDEN_REQUEST) == expected
+
+
+def test_random_requests_match_reference(signer):
+    rng = random.Random(1337)
+    for _ in range(200):
+        request = random_request(rng)
+        assert signer.sign(**request) == reference_signature(**request)
+
+
+def test_private_key_override_matches_reference(signer):
+    assert signer.sign(**GOLDEN_REQUEST, private_key=OTHER_PRIVATE_KEY) == reference_signature(
+        **GOLDEN_REQUEST, private_key=OTHER_PRIVATE_KEY,
+    )
+
+
+def test_batch_signing_matches_single_signing(signer):
+    rng = random.Random(7)
+    requests = [random_request(rng) for _ in range(20)]
+    batch = signer.sign_batch([tuple(request.values()) for request in requests])
+    assert batch == [signer.sign(**request) for request in requests]
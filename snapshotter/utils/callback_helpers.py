@@ -3,11 +3,12 @@ import functools
 from abc import ABC
 from abc import ABCMeta
 from abc import abstractmethod
+from typing import Optional
+from typing import TYPE_CHECKING
 from urllib.parse import urljoin
 
 from httpx import AsyncClient
 from httpx import Client as SyncClient
-from ipfs_client.main import AsyncIPFSClient
 
 from snapshotter.settings.config import settings
 from snapshotter.utils.default_logger import logger
@@ -17,7 +18,11 @@ from snapshotter.utils.models.message_models import SnapshotProcessMessage
 from snapshotter.utils.models.message_models import TelegramEpochProcessingReportMessage
 from snapshotter.utils.models.message_models import TelegramMessage
 from snapshotter.utils.models.message_models import TelegramSnapshotterReportMessage
-from rpc_helper.rpc import RpcHelper
+
+if TYPE_CHECKING:
+    # only used in annotations, importing them pulls in web3 for every processor module
+    from ipfs_client.main import AsyncIPFSClient
+    from rpc_helper.rpc import RpcHelper
 
 # setup logger
 helper_logger = logger.bind(module='Callback|Helpers')
@@ -69,6 +74,20 @@ def sync_notification_callback_result_handler(f: functools.partial):
         logger.debug('Callback or notification result:{}', result)
 
 
+def telegram_endpoint(message: TelegramMessage) -> Optional[str]:
+    """
+    Reporting service endpoint of a Telegram message, None with an error logged if its type is not supported.
+    """
+    if isinstance(message, TelegramEpochProcessingReportMessage):
+        return '/reportEpochProcessingIssue'
+    if isinstance(message, TelegramSnapshotterReportMessage):
+        return '/reportSnapshotIssue'
+    helper_logger.error(
+        f'Unsupported telegram message type: {type(message)} - message not sent',
+    )
+    return None
+
+
 async def send_telegram_notification_async(client: AsyncClient, message: TelegramMessage):
     """
     Sends an asynchronous Telegram notification for reporting issues.
@@ -87,14 +106,8 @@ async def send_telegram_notification_async(client: AsyncClient, message: Telegra
     if not settings.reporting.telegram_url or not settings.reporting.telegram_chat_id:
         return
 
-    if isinstance(message, TelegramEpochProcessingReportMessage):
-        endpoint = '/reportEpochProcessingIssue'
-    elif isinstance(message, TelegramSnapshotterReportMessage):
-        endpoint = '/reportSnapshotIssue'
-    else:
-        helper_logger.error(
-            f'Unsupported telegram message type: {type(message)} - message not sent',
-        )
+    endpoint = telegram_endpoint(message)
+    if endpoint is None:
         return
 
     f = asyncio.ensure_future(
@@ -124,14 +137,8 @@ def send_telegram_notification_sync(client: SyncClient, message: TelegramMessage
     if not settings.reporting.telegram_url or not settings.reporting.telegram_chat_id:
         return
 
-    if isinstance(message, TelegramEpochProcessingReportMessage):
-        endpoint = '/reportEpochProcessingIssue'
-    elif isinstance(message, TelegramSnapshotterReportMessage):
-        endpoint = '/reportSnapshotIssue'
-    else:
-        helper_logger.error(
-            f'Unsupported telegram message type: {type(message)} - message not sent',
-        )
+    endpoint = telegram_endpoint(message)
+    if endpoint is None:
         return
 
     f = functools.partial(
@@ -152,9 +159,9 @@ class GenericProcessor(ABC):
     async def compute(
         self,
         msg_obj: SnapshotProcessMessage,
-        rpc_helper: RpcHelper,
-        anchor_rpc_helper: RpcHelper,
-        ipfs_reader: AsyncIPFSClient,
+        rpc_helper: 'RpcHelper',
+        anchor_rpc_helper: 'RpcHelper',
+        ipfs_reader: 'AsyncIPFSClient',
         protocol_state_contract,
         preloader_results: dict,
     ):
@@ -174,7 +181,7 @@ class GenericPreloader(ABC):
     async def compute(
         self,
         epoch: EpochBase,
-        rpc_helper: RpcHelper,
+        rpc_helper: 'RpcHelper',
     ) -> PreloaderResult:
         """
         Abstract method to compute preload data.
@@ -0,0 +1,106 @@
+"""
+Canonical JSON encoding for snapshot payloads.
+
+Snapshot CIDs are computed over the encoded payload, so the encoding has to stay byte-identical to
+the reference form ``json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')``
+used since the first release, and identical across every snapshotter running any version.
+
+Two backends produce that form:
+
+* ``stdlib``: a reused ``json.JSONEncoder`` instance, avoiding the per-call encoder construction
+  ``json.dumps`` does whenever non-default options are passed.
+* ``orjson``: used when the optional ``orjson`` package is installed. Its output differs from the
+  reference for non-ASCII text, the DEL character, floats printed in exponent notation and
+  non-finite floats, and it rejects integers wider than 64 bits. Output containing any construct
+  that could be affected is re-encoded with the ``stdlib`` backend, which keeps the guarantee
+  while payloads made of plain ASCII strings, integers and regular decimals take the fast path.
+"""
+
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional native backend
+    orjson = None
+
+_reference_encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+# orjson prints floats the stdlib renders in exponent notation (magnitude < 1e-4 or >= 1e16) either with a
+# differently formatted exponent or, below 1e-4, as plain decimals starting with '0.0000'. A number token is always
+# followed by ',', ']', '}' or the end of the document; matches inside strings only cause a (correct) fallback.
+_EXPONENT_FLOAT = re.compile(rb'e-?[0-9]+(?:[,\]}]|$)')
+
+
+def _may_differ_from_reference(encoded: bytes) -> bool:
+    return (
+        # non-ASCII text and DEL are written raw by orjson and escaped by the stdlib
+        not encoded.isascii() or b'\x7f' in encoded or
+        # orjson encodes NaN and Infinity as null
+        b'null' in encoded or
+        b'0.0000' in encoded or
+        _EXPONENT_FLOAT.search(encoded) is not None
+    )
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS |
+        orjson.OPT_PASSTHROUGH_DATETIME |
+        orjson.OPT_PASSTHROUGH_DATACLASS |
+        orjson.OPT_PASSTHROUGH_SUBCLASS
+    )
+
+
+def _reject(obj):
+    # anything orjson cannot encode natively is left to the stdlib backend, including its errors
+    raise TypeError
+
+
+def _encode_stdlib(obj: Any) -> bytes:
+    return _reference_encoder.encode(obj).encode('utf-8')
+
+
+def _encode_orjson(obj: Any) -> bytes:
+    try:
+        encoded = orjson.dumps(obj, default=_reject, option=_ORJSON_OPTIONS)
+    except TypeError:
+        return _encode_stdlib(obj)
+    if _may_differ_from_reference(encoded):
+        return _encode_stdlib(obj)
+    return encoded
+
+
+BACKENDS = {
+    'stdlib': _encode_stdlib,
+}
+if orjson is not None:
+    BACKENDS['orjson'] = _encode_orjson
+
+
+def get_canonical_encoder(backend: str = 'auto'):
+    """
+    Return a function encoding an object to canonical JSON bytes.
+
+    Args:
+        backend (str): 'stdlib', 'orjson', or 'auto' to use orjson when it is installed
+
+    Raises:
+        ValueError: If the requested backend is unknown or not installed
+    """
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'stdlib'
+    if backend not in BACKENDS:
+        raise ValueError(f'Canonical JSON backend {backend} is not available, choose from {sorted(BACKENDS)}')
+    return BACKENDS[backend]
+
+
+def canonical_json_dumps(obj: Any) -> bytes:
+    """
+    Encode an object to canonical JSON bytes with the best available backend.
+    """
+    return _default_encoder(obj)
+
+
+_default_encoder = get_canonical_encoder()
@@ -0,0 +1,251 @@
+"""
+Circuit breakers for the external dependencies of the snapshotter: IPFS, the local collector and the
+source and anchor chain RPCs.
+
+A breaker counts consecutive failures of a dependency. Once ``failure_threshold`` is reached it opens
+and calls are rejected immediately with CircuitOpenError instead of running through their retry
+chains. After ``reset_timeout`` seconds a single call is let through as a probe: if it succeeds the
+breaker closes again, otherwise it stays open for another ``reset_timeout``.
+
+Breakers are shared by name, so every component talking to the same dependency (the event detector,
+the processor distributor and the snapshot worker) sees the same state.
+"""
+
+import asyncio
+import inspect
+import sys
+import time
+from enum import Enum
+from functools import wraps
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+import httpx
+import tenacity
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.exceptions import CircuitOpenError
+
+breaker_logger = logger.bind(module='CircuitBreaker')
+
+IPFS = 'ipfs'
+COLLECTOR = 'collector'
+SOURCE_RPC = 'rpc:source'
+ANCHOR_RPC = 'rpc:anchor'
+
+
+class CircuitState(str, Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+def _any_exception(e: BaseException) -> bool:
+    return not isinstance(e, CircuitOpenError)
+
+
+def _status_code(e: BaseException) -> Optional[int]:
+    response = getattr(e, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(e, 'status', None)
+    return status if isinstance(status, int) else None
+
+
+def is_rpc_unavailable_error(e: BaseException) -> bool:
+    """
+    Whether an RPC call failed because the node is unavailable. That covers transport errors, timeouts
+    and 429 or 5xx responses. Reverts, invalid arguments and decoding errors of a call do not count, as
+    they say nothing about the node. Errors wrapped by the RPC helper or tenacity are unwrapped.
+    """
+    seen = set()
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        if isinstance(e, CircuitOpenError):
+            return False
+        if isinstance(e, (asyncio.TimeoutError, OSError, httpx.TransportError)):
+            return True
+        # aiohttp errors can only be raised once web3 has imported it
+        aiohttp = sys.modules.get('aiohttp')
+        if aiohttp is not None and isinstance(e, aiohttp.ClientConnectionError):
+            return True
+        status = _status_code(e)
+        if status is not None:
+            return status == 429 or status >= 500
+        if isinstance(e, tenacity.RetryError):
+            e = e.last_attempt.exception()
+        else:
+            e = getattr(e, 'underlying_exception', None) or e.__cause__
+    return False
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a single half-open probe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ):
+        """
+        Args:
+            name (str): Dependency name used in logs and errors
+            failure_threshold (int, optional): Consecutive failures that open the circuit.
+                Defaults to settings.circuit_breaker.failure_threshold
+            reset_timeout (float, optional): Seconds the circuit stays open before probing.
+                Defaults to settings.circuit_breaker.reset_timeout
+            is_failure (Callable[[BaseException], bool], optional): Whether an error means the dependency is
+                unavailable. Other errors count as proof that it is reachable. Defaults to all errors
+        """
+        self.name = name
+        self.enabled = settings.circuit_breaker.enabled
+        self.failure_threshold = failure_threshold or settings.circuit_breaker.failure_threshold
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.circuit_breaker.reset_timeout
+        self._is_failure = is_failure or _any_exception
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    @property
+    def rejecting(self) -> bool:
+        """
+        Whether a call made now would be rejected without reaching the dependency.
+        """
+        if not self.enabled:
+            return False
+        if self._state == CircuitState.OPEN:
+            return time.monotonic() - self._opened_at < self.reset_timeout
+        return self._state == CircuitState.HALF_OPEN and self._probe_in_flight
+
+    @property
+    def retry_after(self) -> float:
+        """
+        Seconds until the next probe is allowed, 0 if calls are not being rejected.
+        """
+        if not self.rejecting:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def _set_state(self, state: CircuitState):
+        if state == self._state:
+            return
+        if state == CircuitState.OPEN:
+            breaker_logger.warning(
+                'Circuit for {} opened after {} consecutive failures, short-circuiting calls for {}s',
+                self.name, self._consecutive_failures, self.reset_timeout,
+            )
+        elif state == CircuitState.CLOSED:
+            breaker_logger.info('Circuit for {} closed, dependency recovered', self.name)
+        else:
+            breaker_logger.info('Circuit for {} half-open, probing dependency', self.name)
+        self._state = state
+
+    def _before_call(self):
+        if not self.enabled or self._state == CircuitState.CLOSED:
+            return
+        if self.rejecting:
+            raise CircuitOpenError(self.name, self.retry_after)
+        # the reset timeout elapsed: this call is the probe
+        self._set_state(CircuitState.HALF_OPEN)
+        self._probe_in_flight = True
+
+    def record_success(self):
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self._state == CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.OPEN)
+
+    async def call(self, fn, *args, **kwargs):
+        """
+        Await ``fn(*args, **kwargs)`` through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open and the call was not attempted
+        """
+        self._before_call()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            # a cancelled probe says nothing about the dependency, let the next call probe instead
+            self._probe_in_flight = False
+            raise
+        except Exception as e:
+            if not self.enabled:
+                raise
+            if self._is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        if self.enabled:
+            self.record_success()
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = dict()
+
+
+def get_circuit_breaker(name: str, is_failure: Optional[Callable[[BaseException], bool]] = None) -> CircuitBreaker:
+    """
+    Return the shared breaker for a dependency, creating it on first use.
+
+    Args:
+        name (str): Dependency name, e.g. IPFS, COLLECTOR, SOURCE_RPC or ANCHOR_RPC
+        is_failure (Callable[[BaseException], bool], optional): Failure classifier used when the breaker is created
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name, is_failure=is_failure)
+        _breakers[name] = breaker
+    return breaker
+
+
+class CircuitBreakingRpcHelper:
+    """
+    Proxy around an RpcHelper routing its public coroutine methods through a shared circuit breaker.
+
+    Lifecycle methods and synchronous attributes (e.g. ``get_current_node``) are passed through unchanged.
+    """
+
+    _UNGUARDED = {'init', 'close'}
+
+    def __init__(self, rpc_helper, breaker: CircuitBreaker):
+        self._rpc_helper = rpc_helper
+        self._breaker = breaker
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self._rpc_helper, name)
+        if name.startswith('_') or name in self._UNGUARDED or not inspect.iscoroutinefunction(attr):
+            return attr
+
+        @wraps(attr)
+        async def guarded(*args, **kwargs):
+            return await self._breaker.call(attr, *args, **kwargs)
+        return guarded
+
+
+def guard_rpc_helper(rpc_helper, name: str) -> CircuitBreakingRpcHelper:
+    """
+    Wrap an RpcHelper with the shared breaker of its chain (SOURCE_RPC or ANCHOR_RPC). Only errors
+    meaning the node is unavailable count as failures, so failing project calls cannot open the circuit.
+    """
+    return CircuitBreakingRpcHelper(rpc_helper, get_circuit_breaker(name, is_failure=is_rpc_unavailable_error))
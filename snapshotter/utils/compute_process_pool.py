@@ -0,0 +1,458 @@
+"""
+Process pool for compute of CPU-bound processors.
+
+Processors marked ``cpu_bound`` in the projects config run their ``compute`` in a child process, so
+heavy decoding or math does not stall event polling, signing and gRPC I/O on the main event loop.
+
+* Each preloader result of an epoch is pickled once into shared memory and read by every child
+  computing a project that uses it, instead of being sent to each child separately.
+* The RPC helpers and the IPFS reader stay in the main process. Children receive proxies whose
+  (possibly nested) method calls, e.g. ``await rpc_helper.batch_eth_call_on_block(...)`` or
+  ``await ipfs_reader.dag.get(cid)``, are executed on the main event loop, so calls share its warm
+  connections, rate limits and circuit breakers. Arguments and results must be picklable.
+* Slot selection reports are recorded in the child and replayed on the worker's slot tracker.
+* ``protocol_state_contract`` is not available in the child and is passed as ``None``.
+
+Each child runs one compute at a time; children are spawned on first use up to the pool size.
+Children are named ``ComputePool-<index>`` after the lowest index no running child holds, prefixed
+with the name of the pool's process outside the main one, so replacements reuse the log directories
+of the children they replace.
+"""
+
+import asyncio
+import importlib
+import itertools
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from snapshotter.utils.callback_helpers import GenericProcessor
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.exceptions import ComputeProcessError
+
+pool_logger = logger.bind(module='ComputeProcessPool')
+
+# messages exchanged over the pipe of each child, as tuples starting with the message type
+_COMPUTE = 'compute'
+_CALL = 'call'
+_CALL_RESULT = 'call_result'
+_RESULT = 'result'
+_STOP = 'stop'
+
+
+def _picklable_exception(e: BaseException) -> BaseException:
+    try:
+        pickle.loads(pickle.dumps(e))
+        return e
+    except Exception:
+        return ComputeProcessError(f'{type(e).__name__}: {e}')
+
+
+class _RemoteProxy:
+    """
+    Child side stand-in for an object living in the main process. Attribute access builds a path,
+    calling it runs the call on the main event loop.
+    """
+
+    def __init__(self, runtime: '_ChildRuntime', task_id: int, target: str, path=()):
+        self._runtime = runtime
+        self._task_id = task_id
+        self._target = target
+        self._path = path
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _RemoteProxy(self._runtime, self._task_id, self._target, self._path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        return self._runtime.call(self._task_id, self._target, self._path, args, kwargs)
+
+
+class _SlotSelectionRecorder:
+    """
+    Child side stand-in for the SlotSelectionTracker; reports are replayed in the main process.
+    """
+
+    def __init__(self):
+        self.reports: List[tuple] = []
+        self._selections: Dict[int, dict] = dict()
+
+    def report_selection(self, epoch_id: int, was_selected: bool, slot_id: int) -> None:
+        self.reports.append((epoch_id, was_selected, slot_id))
+        self._selections[epoch_id] = {
+            'epoch_id': epoch_id,
+            'was_selected': was_selected,
+            'slot_id': slot_id,
+            'timestamp': int(time.time()),
+        }
+
+    def get_selection(self, epoch_id: int) -> Optional[dict]:
+        return self._selections.get(epoch_id)
+
+    def was_selected(self, epoch_id: int) -> bool:
+        selection = self._selections.get(epoch_id)
+        return bool(selection and selection['was_selected'])
+
+    def get_last_selection(self) -> Optional[dict]:
+        return self._selections[max(self._selections)] if self._selections else None
+
+
+def _read_shared(name: str, size: int):
+    # spawned children share the main process' resource tracker, which unlinks the segment
+    shm = SharedMemory(name=name)
+    try:
+        return pickle.loads(shm.buf[:size])
+    finally:
+        shm.close()
+
+
+class _ChildRuntime:
+    """
+    Event loop of a child process: computes one task at a time and proxies calls to the parent.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._call_ids = itertools.count()
+        self._pending_calls: Dict[int, asyncio.Future] = dict()
+        self._processors: Dict[tuple, GenericProcessor] = dict()
+
+    def _receive_forever(self):
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                message = (_STOP,)
+            self._loop.call_soon_threadsafe(self._dispatch, message)
+            if message[0] == _STOP:
+                return
+
+    def _dispatch(self, message):
+        kind = message[0]
+        if kind == _COMPUTE:
+            asyncio.ensure_future(self._compute(*message[1:]))
+        elif kind == _CALL_RESULT:
+            _, call_id, ok, value = message
+            future = self._pending_calls.pop(call_id, None)
+            if future is None or future.done():
+                return
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        elif kind == _STOP:
+            self._stopped.set()
+
+    async def call(self, task_id: int, target: str, path: tuple, args: tuple, kwargs: dict):
+        call_id = next(self._call_ids)
+        future = self._loop.create_future()
+        self._pending_calls[call_id] = future
+        self._conn.send((_CALL, task_id, call_id, target, path, args, kwargs))
+        return await future
+
+    def _processor(self, module: str, class_name: str) -> GenericProcessor:
+        key = (module, class_name)
+        if key not in self._processors:
+            self._processors[key] = getattr(importlib.import_module(module), class_name)()
+        return self._processors[key]
+
+    async def _compute(self, task_id: int, module: str, class_name: str, msg_obj, segments, targets):
+        recorder = _SlotSelectionRecorder()
+        try:
+            snapshots = await self._processor(module, class_name).compute(
+                msg_obj=msg_obj,
+                rpc_helper=_RemoteProxy(self, task_id, 'rpc_helper') if 'rpc_helper' in targets else None,
+                anchor_rpc_helper=_RemoteProxy(self, task_id, 'anchor_rpc_helper') if 'anchor_rpc_helper' in targets else None,
+                ipfs_reader=_RemoteProxy(self, task_id, 'ipfs_reader') if 'ipfs_reader' in targets else None,
+                protocol_state_contract=None,
+                preloader_results={task: _read_shared(name, size) for task, name, size in segments},
+                slot_tracker=recorder,
+            )
+            result = (_RESULT, task_id, True, snapshots, recorder.reports)
+            payload = pickle.dumps(result)
+        except Exception as e:
+            pool_logger.opt(exception=True).debug('Offloaded compute {}.{} failed', module, class_name)
+            result = (_RESULT, task_id, False, _picklable_exception(e), recorder.reports)
+            payload = pickle.dumps(result)
+        self._conn.send_bytes(payload)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        threading.Thread(target=self._receive_forever, daemon=True).start()
+        await self._stopped.wait()
+
+
+def _child_main(conn):
+    asyncio.run(_ChildRuntime(conn).run())
+
+
+class _SharedResult:
+    """
+    A preloader result pickled into shared memory, unlinked once no compute uses it.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        self.users = 0
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.size = len(data)
+        self.shm = SharedMemory(create=True, size=max(self.size, 1))
+        self.shm.buf[:self.size] = data
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _reap(process, conn):
+    process.join(timeout=5)
+    if process.is_alive():
+        process.kill()
+        process.join()
+    conn.close()
+
+
+class _ChildProcess:
+    def __init__(self, context, index: int):
+        self.index = index
+        self.conn, child_conn = context.Pipe(duplex=True)
+        name = f'ComputePool-{index}'
+        if multiprocessing.parent_process() is not None:
+            name = f'{multiprocessing.current_process().name}-{name}'
+        self.process = context.Process(target=_child_main, args=(child_conn,), name=name, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.retired = False
+
+
+class ComputeProcessPool:
+    """
+    Runs ``compute`` of CPU-bound processors in child processes.
+
+    Args:
+        size (int): Maximum number of child processes, and so of concurrently offloaded computes
+    """
+
+    def __init__(self, size: int):
+        self._size = max(size, 1)
+        self._context = multiprocessing.get_context('spawn')
+        self._children: List[_ChildProcess] = []
+        self._idle: List[_ChildProcess] = []
+        self._slots = asyncio.Semaphore(self._size)
+        # one blocking receive per busy child
+        self._receivers = ThreadPoolExecutor(max_workers=self._size, thread_name_prefix='compute-pool-recv')
+        self._task_ids = itertools.count()
+        # keyed by id() of the result object, which the entry keeps alive while in use
+        self._shared: Dict[int, _SharedResult] = dict()
+
+    def _acquire_child(self) -> _ChildProcess:
+        while self._idle:
+            child = self._idle.pop()
+            if child.process.is_alive() and not child.retired:
+                return child
+            self._discard(child)
+        used = {child.index for child in self._children}
+        child = _ChildProcess(self._context, next(index for index in itertools.count() if index not in used))
+        self._children.append(child)
+        pool_logger.info('Started compute process {} (pid {})', child.process.name, child.process.pid)
+        return child
+
+    def _release_child(self, child: _ChildProcess, healthy: bool):
+        if healthy and not child.retired and child.process.is_alive():
+            self._idle.append(child)
+        else:
+            # a child abandoned mid-compute is killed, which also unblocks its pending receive
+            self._discard(child, graceful=healthy)
+
+    def _discard(self, child: _ChildProcess, graceful: bool = True):
+        if child in self._children:
+            self._children.remove(child)
+        if graceful:
+            try:
+                child.conn.send((_STOP,))
+            except Exception:
+                graceful = False
+        if not graceful:
+            child.process.kill()
+        # reaped off the event loop
+        threading.Thread(target=_reap, args=(child.process, child.conn), daemon=True).start()
+
+    def _share(self, preloader_results: dict) -> Dict[str, _SharedResult]:
+        # projects of an epoch receive the same result objects, so each is written to shared memory once
+        shared = dict()
+        try:
+            for task, value in preloader_results.items():
+                key = id(value)
+                if key not in self._shared:
+                    self._shared[key] = _SharedResult(value)
+                self._shared[key].users += 1
+                shared[task] = self._shared[key]
+        except Exception:
+            self._unshare(shared)
+            raise
+        return shared
+
+    def _unshare(self, shared: Dict[str, _SharedResult]):
+        for entry in shared.values():
+            entry.users -= 1
+            if entry.users == 0:
+                del self._shared[id(entry.value)]
+                entry.release()
+
+    async def _serve_call(self, child: _ChildProcess, targets: Dict[str, Any], message):
+        _, _, call_id, target, path, args, kwargs = message
+        try:
+            fn = targets[target]
+            for name in path:
+                fn = getattr(fn, name)
+            value = fn(*args, **kwargs)
+            if asyncio.iscoroutine(value) or isinstance(value, asyncio.Future):
+                value = await value
+            reply = (_CALL_RESULT, call_id, True, value)
+            payload = pickle.dumps(reply)
+        except Exception as e:
+            reply = (_CALL_RESULT, call_id, False, _picklable_exception(e))
+            payload = pickle.dumps(reply)
+        try:
+            child.conn.send_bytes(payload)
+        except (BrokenPipeError, OSError):
+            # the child died; its compute fails with a ComputeProcessError
+            pass
+
+    async def compute(
+        self,
+        module: str,
+        class_name: str,
+        msg_obj,
+        preloader_results: dict,
+        targets: Dict[str, Any],
+        slot_tracker=None,
+    ):
+        """
+        Run ``compute`` of a processor class in a child process.
+
+        Args:
+            module (str): Module of the processor class
+            class_name (str): Name of the processor class
+            msg_obj: The message passed to compute
+            preloader_results (dict): Preloader results of the epoch, shared across computes of the epoch
+            targets (Dict[str, Any]): Objects proxied to the child, e.g. {'rpc_helper': rpc_helper}
+            slot_tracker (optional): Tracker on which slot selections reported by the compute are replayed
+
+        Returns:
+            The value returned by compute
+
+        Raises:
+            ComputeProcessError: If the child process died or the error raised by compute could not be pickled
+            Exception: The error raised by compute
+        """
+        loop = asyncio.get_running_loop()
+        targets = {name: target for name, target in targets.items() if target is not None}
+        async with self._slots:
+            shared = self._share(preloader_results)
+            child = self._acquire_child()
+            task_id = next(self._task_ids)
+            healthy = False
+            calls = set()
+            try:
+                child.conn.send((
+                    _COMPUTE, task_id, module, class_name, msg_obj,
+                    [(task, entry.shm.name, entry.size) for task, entry in shared.items()],
+                    list(targets),
+                ))
+                while True:
+                    try:
+                        message = await loop.run_in_executor(self._receivers, child.conn.recv)
+                    except (EOFError, OSError) as e:
+                        raise ComputeProcessError(
+                            f'Compute process {child.process.pid} exited while computing {module}.{class_name}',
+                        ) from e
+                    if message[0] == _CALL:
+                        call = asyncio.ensure_future(self._serve_call(child, targets, message))
+                        calls.add(call)
+                        call.add_done_callback(calls.discard)
+                        continue
+                    _, _, ok, value, selection_reports = message
+                    healthy = True
+                    break
+            finally:
+                for call in calls:
+                    call.cancel()
+                self._unshare(shared)
+                self._release_child(child, healthy)
+        if slot_tracker is not None:
+            for epoch_id, was_selected, slot_id in selection_reports:
+                slot_tracker.report_selection(epoch_id, was_selected, slot_id)
+        if not ok:
+            raise value
+        return value
+
+    def recycle(self):
+        """
+        Replace the child processes, e.g. after processor modules were reloaded. Busy children finish their compute first.
+        """
+        for child in self._children:
+            child.retired = True
+        for child in list(self._idle):
+            self._idle.remove(child)
+            self._discard(child)
+
+    async def close(self):
+        for child in list(self._children):
+            self._discard(child)
+        self._idle = []
+        self._receivers.shutdown(wait=False)
+        for shared in self._shared.values():
+            shared.release()
+        self._shared = dict()
+
+
+class OffloadedProcessor(GenericProcessor):
+    """
+    Stands in for a CPU-bound processor in the worker's project mapping and runs its compute in the pool.
+
+    Args:
+        module (str): Module of the processor class
+        class_name (str): Name of the processor class
+        pool_factory (Callable[[], ComputeProcessPool]): Returns the pool, which is started on first use
+    """
+
+    def __init__(self, module: str, class_name: str, pool_factory):
+        super().__init__()
+        self.module = module
+        self.class_name = class_name
+        self._pool_factory = pool_factory
+
+    async def compute(
+        self,
+        msg_obj,
+        rpc_helper,
+        anchor_rpc_helper,
+        ipfs_reader,
+        protocol_state_contract,
+        preloader_results: dict,
+        slot_tracker=None,
+    ):
+        return await self._pool_factory().compute(
+            module=self.module,
+            class_name=self.class_name,
+            msg_obj=msg_obj,
+            preloader_results=preloader_results,
+            targets={
+                'rpc_helper': rpc_helper,
+                'anchor_rpc_helper': anchor_rpc_helper,
+                'ipfs_reader': ipfs_reader,
+            },
+            slot_tracker=slot_tracker,
+        )
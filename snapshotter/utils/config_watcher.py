@@ -0,0 +1,94 @@
+"""
+Change detection and module reloading for hot reload of the projects and preloaders configs.
+
+The watcher fingerprints (mtime, size) the config files and the source files of the packages the
+processor and preloader classes live in. Checking is a handful of ``os.stat`` calls, cheap enough to
+run at every epoch boundary; nothing is polled in the background.
+"""
+
+import importlib
+import os
+import sys
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+
+def _fingerprint(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _watched_package(module_name: str) -> Optional[str]:
+    # processors and preloaders live in compute packages; a module directly below a top level
+    # package is watched on its own so that the snapshotter's core modules are never reloaded
+    package = module_name.rpartition('.')[0]
+    return package if '.' in package else None
+
+
+def module_files(entry_modules: Iterable[str]) -> Dict[str, str]:
+    """
+    Source files of the given modules and of every loaded module in their packages, keyed by path.
+    """
+    entry_modules = set(entry_modules)
+    packages = {package for package in map(_watched_package, entry_modules) if package}
+    files = dict()
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if not path:
+            continue
+        if name in entry_modules or any(name.startswith(package + '.') for package in packages):
+            files[path] = name
+    return files
+
+
+def reload_modules(entry_modules: Iterable[str], changed_files: Set[str]) -> List[str]:
+    """
+    Reload loaded modules whose source changed, then the entry modules so that names they imported
+    from reloaded modules are rebound.
+
+    Returns:
+        List[str]: Names of the reloaded modules
+    """
+    importlib.invalidate_caches()
+    changed = [
+        name for name, module in list(sys.modules.items())
+        if getattr(module, '__file__', None) in changed_files
+    ]
+    if not changed:
+        return []
+    reloaded = []
+    for name in changed + [name for name in entry_modules if name not in changed]:
+        module = sys.modules.get(name)
+        if module is None or name in reloaded:
+            continue
+        importlib.reload(module)
+        reloaded.append(name)
+    return reloaded
+
+
+class ConfigWatcher:
+    """
+    Tracks fingerprints of a set of files and reports which ones changed since the last check.
+    """
+
+    def __init__(self):
+        self._fingerprints: Dict[str, Optional[Tuple[int, int]]] = dict()
+
+    def watch(self, paths: Iterable[str]):
+        """
+        Replace the watched set, taking the current state of each file as the baseline.
+        """
+        self._fingerprints = {path: _fingerprint(path) for path in paths}
+
+    def changed_files(self) -> Set[str]:
+        return {
+            path for path, fingerprint in self._fingerprints.items()
+            if _fingerprint(path) != fingerprint
+        }
@@ -9,6 +9,7 @@ from tenacity import wait_random_exponential
 from web3 import Web3
 
 from snapshotter.utils.default_logger import logger
+from snapshotter.utils.multicall import aggregated_web3_call
 
 logger = logger.bind(module='data_helper')
 
@@ -86,7 +87,7 @@ async def w3_get_and_cache_finalized_cid(
         ("maxSnapshotsCid", [Web3.to_checksum_address(data_market), project_id, epoch_id]),
     ]
 
-    [consensus_status, cid] = await rpc_helper.web3_call(tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
+    [consensus_status, cid] = await aggregated_web3_call(rpc_helper, tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
     logger.trace(f'consensus status for project {project_id} and epoch {epoch_id} is {consensus_status}')
     if consensus_status[0]:
         return cid, epoch_id
@@ -108,10 +109,10 @@ async def get_project_last_finalized_cid_and_epoch(state_contract_obj, data_mark
     """
 
     tasks = [
-        ("lastFinalizedSnapshot", [project_id]),
+        ("lastFinalizedSnapshot", [Web3.to_checksum_address(data_market), project_id]),
     ]
 
-    [last_finalized_epoch] = await rpc_helper.web3_call(tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
+    [last_finalized_epoch] = await aggregated_web3_call(rpc_helper, tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
     logger.info(f'last finalized epoch for project {project_id} is {last_finalized_epoch}')
 
     # getting finalized cid for last finalized epoch
@@ -142,7 +143,7 @@ async def get_project_first_epoch(state_contract_obj, data_market, rpc_helper, p
         ("projectFirstEpochId", [Web3.to_checksum_address(data_market), project_id]),
     ]
 
-    [first_epoch] = await rpc_helper.web3_call(tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
+    [first_epoch] = await aggregated_web3_call(rpc_helper, tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
     logger.info(f'first epoch for project {project_id} is {first_epoch}')
     # Don't cache if it is 0
     if first_epoch == 0:
@@ -240,7 +241,7 @@ async def get_source_chain_id(state_contract_obj, data_market, rpc_helper):
         ("SOURCE_CHAIN_ID", [data_market]),
     ]
 
-    [source_chain_id] = await rpc_helper.web3_call(tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
+    [source_chain_id] = await aggregated_web3_call(rpc_helper, tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
 
     return source_chain_id
 
@@ -260,7 +261,7 @@ async def get_source_chain_epoch_size(state_contract_obj, data_market, rpc_helpe
         ("EPOCH_SIZE", [data_market]),
     ]
 
-    [source_chain_epoch_size] = await rpc_helper.web3_call(tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
+    [source_chain_epoch_size] = await aggregated_web3_call(rpc_helper, tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
 
     return source_chain_epoch_size
 
@@ -280,7 +281,7 @@ async def get_source_chain_block_time(state_contract_obj, data_market, rpc_helpe
         ("SOURCE_CHAIN_BLOCK_TIME", [data_market]),
     ]
 
-    [source_chain_block_time] = await rpc_helper.web3_call(tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
+    [source_chain_block_time] = await aggregated_web3_call(rpc_helper, tasks, contract_addr=state_contract_obj.address, abi=state_contract_obj.abi)
     source_chain_block_time = int(source_chain_block_time / 1e4)
 
     return source_chain_block_time
@@ -0,0 +1,175 @@
+"""
+Deadline bookkeeping for epoch processing and deadline-bounded retries.
+
+A submission is only useful until its deadline block on the anchor chain. This module keeps a
+cached view of the anchor chain head (fed by the event detector's polling and by the block fetched
+for every signature), estimates how many seconds remain until a given block, and builds tenacity
+retry policies that stop as soon as another attempt could no longer finish within that budget.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable
+from typing import Optional
+
+import tenacity
+from tenacity import AsyncRetrying
+from tenacity import retry_if_exception
+from tenacity import stop_after_attempt
+from tenacity import wait_random_exponential
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.exceptions import SubmissionDeadlineExceeded
+
+
+class AnchorHeadTracker:
+    """
+    Last seen anchor chain head plus a running estimate of the anchor block time.
+    """
+
+    def __init__(self, default_block_time: Optional[float] = None):
+        self.block_number: Optional[int] = None
+        self.seen_at: Optional[float] = None
+        self.block_time = default_block_time or settings.submission_retry.anchor_block_time
+
+    def update(self, block_number: int):
+        """
+        Record an observed head. Advancing heads refine the block time estimate (EWMA).
+        """
+        now = time.time()
+        if self.block_number is not None and block_number > self.block_number:
+            observed = (now - self.seen_at) / (block_number - self.block_number)
+            # polling observes block changes late, so only let the estimate move gradually
+            self.block_time = 0.8 * self.block_time + 0.2 * observed
+        if self.block_number is None or block_number >= self.block_number:
+            self.block_number = block_number
+            self.seen_at = now
+
+    def estimated_head(self) -> Optional[int]:
+        if self.block_number is None:
+            return None
+        return self.block_number + int((time.time() - self.seen_at) / self.block_time)
+
+    def seconds_until(self, block_number: int) -> Optional[float]:
+        """
+        Estimated seconds until the anchor chain reaches ``block_number``, None if the head is unknown.
+        """
+        if self.block_number is None:
+            return None
+        return (block_number - self.block_number) * self.block_time - (time.time() - self.seen_at)
+
+
+class EpochDeadlines:
+    """
+    Deadline block and release time of each epoch in processing, registered when processing of the epoch starts.
+    """
+
+    def __init__(self, head: AnchorHeadTracker, max_epochs: int = 64):
+        self._head = head
+        self._max_epochs = max_epochs
+        self._deadlines = OrderedDict()
+        self._released_at = OrderedDict()
+
+    def register(self, epoch_id: int, released_at: Optional[float] = None):
+        """
+        Start the clock for an epoch: its budget ends ``deadline_buffer`` blocks after the current head.
+
+        Args:
+            epoch_id (int): The epoch
+            released_at (float, optional): Unix timestamp of the epoch's release
+        """
+        if released_at is not None and epoch_id not in self._released_at:
+            self._released_at[epoch_id] = released_at
+            while len(self._released_at) > self._max_epochs:
+                self._released_at.popitem(last=False)
+        if epoch_id in self._deadlines or self._head.block_number is None:
+            return
+        self._deadlines[epoch_id] = self._head.estimated_head() + settings.protocol_state.deadline_buffer
+        while len(self._deadlines) > self._max_epochs:
+            self._deadlines.popitem(last=False)
+
+    def released_at(self, epoch_id: int) -> Optional[float]:
+        """
+        Unix timestamp of the epoch's release, None if it was not registered with one.
+        """
+        return self._released_at.get(epoch_id)
+
+    def remaining_seconds(self, epoch_id: int) -> Optional[float]:
+        """
+        Seconds left in the epoch's budget, None if the epoch has no registered deadline (e.g. simulations).
+        """
+        deadline = self._deadlines.get(epoch_id)
+        if deadline is None:
+            return None
+        return self._head.seconds_until(deadline)
+
+    def check(self, epoch_id: int, stage: str):
+        """
+        Raise SubmissionDeadlineExceeded if the epoch's budget is already spent.
+        """
+        remaining = self.remaining_seconds(epoch_id)
+        if remaining is not None and remaining <= 0:
+            raise SubmissionDeadlineExceeded(f'Deadline for epoch {epoch_id} passed {-remaining:.1f}s before {stage}')
+
+
+anchor_head = AnchorHeadTracker()
+epoch_deadlines = EpochDeadlines(anchor_head)
+
+
+def deadline_retrying(
+    remaining_budget: Callable[[], Optional[float]],
+    max_attempts: int,
+    is_retryable: Callable[[BaseException], bool],
+    description: str,
+    before_sleep=None,
+) -> AsyncRetrying:
+    """
+    Build a retry policy bounded by both an attempt count and a time budget.
+
+    Another attempt is only made if the failure is retryable and the remaining budget exceeds the
+    average duration of the attempts made so far; backoff sleeps are capped to leave room for that
+    attempt. When the budget runs out, SubmissionDeadlineExceeded is raised from the last error so
+    callers can tell late work apart from failed work.
+
+    Args:
+        remaining_budget (Callable[[], Optional[float]]): Seconds left, or None for no time bound
+        max_attempts (int): Upper bound on attempts regardless of budget
+        is_retryable (Callable[[BaseException], bool]): Classifies errors worth another attempt
+        description (str): Operation name used in the deadline error
+        before_sleep: Optional tenacity before_sleep callback
+    """
+    attempts = stop_after_attempt(max_attempts)
+    backoff = wait_random_exponential(multiplier=1, max=settings.submission_retry.max_backoff)
+
+    def average_attempt_duration(retry_state: tenacity.RetryCallState) -> float:
+        return retry_state.seconds_since_start / retry_state.attempt_number
+
+    def out_of_budget(retry_state: tenacity.RetryCallState) -> bool:
+        remaining = remaining_budget()
+        return remaining is not None and remaining <= average_attempt_duration(retry_state)
+
+    def stop(retry_state: tenacity.RetryCallState) -> bool:
+        return attempts(retry_state) or out_of_budget(retry_state)
+
+    def wait(retry_state: tenacity.RetryCallState) -> float:
+        delay = backoff(retry_state)
+        remaining = remaining_budget()
+        if remaining is None:
+            return delay
+        return max(0.0, min(delay, remaining - average_attempt_duration(retry_state)))
+
+    def on_give_up(retry_state: tenacity.RetryCallState):
+        last_exception = retry_state.outcome.exception()
+        if out_of_budget(retry_state):
+            raise SubmissionDeadlineExceeded(
+                f'{description} abandoned after {retry_state.attempt_number} attempts: deadline budget exhausted',
+            ) from last_exception
+        raise tenacity.RetryError(retry_state.outcome) from last_exception
+
+    return AsyncRetrying(
+        stop=stop,
+        wait=wait,
+        retry=retry_if_exception(is_retryable),
+        retry_error_callback=on_give_up,
+        before_sleep=before_sleep,
+    )
@@ -1,3 +1,43 @@
+"""
+Process wide logging setup.
+
+Every record goes through a single sink, which only queues the record's level, time, message and
+extra. A writer thread formats them as :data:`FORMAT` lines, appends those to ``logs/<level>.log``
+and rotates the files every 6 hours. A separate compressor thread compresses rotated files to
+``tar.xz`` and removes archives older than 2 days, so neither formatting, file I/O nor compression
+runs on the thread that logs. Processes other than the main one, such as snapshot worker processes,
+write to ``logs/<process name>/<level>.log``, so that every file has a single writer rotating it.
+The main process removes the directories of processes that wrote nothing within the retention period.
+
+The queue holds up to ``settings.logs.queue_size`` records. When it is full, records below ERROR
+are dropped and counted, and ERROR and above wait for room. Queued records only reach the files
+once the writer gets to them, so :func:`flush_logs` must be called before ``os._exit``, which skips
+``atexit`` handlers.
+
+Before a record is formatted, ``settings.logs.sampling`` and ``settings.logs.rate_limits`` can drop
+DEBUG and INFO records of chatty modules. A module is the ``module`` bound to the logger with
+``.bind()``, or else the name of the Python module that logs.
+"""
+import atexit
+import glob
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import tarfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import Dict
+from typing import IO
+from typing import Optional
+from typing import Tuple
+
 from loguru import logger
 
 from snapshotter.settings.config import settings
@@ -5,6 +45,14 @@ from snapshotter.settings.config import settings
 # {extra} field can be used to pass extra parameters to the logger using .bind()
 FORMAT = '{time:MMMM D, YYYY > HH:mm:ss!UTC} | {level} | {message} | {extra}'
 
+LOG_DIR = 'logs'
+ROTATION_SECONDS = 6 * 60 * 60
+RETENTION_SECONDS = 2 * 24 * 60 * 60
+# records at or above this level are never sampled or rate limited
+UNLIMITED_LEVEL_NO = logger.level('WARNING').no
+# records at or above this level are never dropped when the queue of the file sink is full
+BLOCKING_LEVEL_NO = logger.level('ERROR').no
+
 
 def trace_enabled(_):
     """
@@ -19,139 +67,285 @@ def trace_enabled(_):
     return settings.logs.trace_enabled
 
 
-def logger_filter_trace(record):
+def exception_format(record):
     """
-    Filter function for logging records with level 'TRACE'.
-
-    Args:
-        record (dict): The logging record to be filtered.
-
-    Returns:
-        bool: True if the record's level is 'TRACE', False otherwise.
+    Loguru format of the records queued by :class:`LevelRoutedFileSink`, which formats the rest of the
+    line itself. Tracebacks are rendered right away, while the frames they refer to are still intact.
     """
-    if record['level'].name == 'TRACE':
-        return True
-    return False
+    return '{exception}' if record['exception'] else ''
 
 
-def logger_filter_debug(record):
+def format_line(level: str, timestamp: datetime, message: str, extra: Dict[str, Any], exception: str = '') -> str:
     """
-    Filter function to be used with Python's logging module to filter out log records with level lower than DEBUG.
-
-    Args:
-        record (logging.LogRecord): The log record to be filtered.
-
-    Returns:
-        bool: True if the log record's level is DEBUG, False otherwise.
-    """
-    if record['level'].name == 'DEBUG':
-        return True
-    return False
-
-
-def logger_filter_info(record):
+    A record formatted as :data:`FORMAT`.
     """
-    Filter function for logger to only allow INFO level logs.
+    utc = timestamp.astimezone(timezone.utc)
+    return f'{utc:%B} {utc.day}, {utc:%Y > %H:%M:%S} | {level} | {message} | {extra}\n{exception}'
 
-    Args:
-        record (dict): The log record to be filtered.
 
-    Returns:
-        bool: True if the log record is INFO level, False otherwise.
+def process_log_dir() -> str:
     """
-    if record['level'].name == 'INFO':
-        return True
-    return False
-
-
-def logger_filter_success(record):
+    Directory of the log files of the current process.
     """
-    Filter function to only allow records with level 'SUCCESS'.
+    if multiprocessing.parent_process() is None:
+        return LOG_DIR
+    return os.path.join(LOG_DIR, multiprocessing.current_process().name)
 
-    Args:
-        record (dict): The log record to filter.
 
-    Returns:
-        bool: True if the record's level is 'SUCCESS', False otherwise.
+class LevelRoutedFileSink:
     """
-    if record['level'].name == 'SUCCESS':
-        return True
-    return False
-
-
-def logger_filter_warning(record):
+    Loguru sink that writes each record to the file of its level from a background thread.
     """
-    Filter function to only allow warning level logs through.
-
-    Args:
-        record (dict): The log record to filter.
 
-    Returns:
-        bool: True if the log record is a warning level log, False otherwise.
+    def __init__(
+        self,
+        directory: str = LOG_DIR,
+        rotation: float = ROTATION_SECONDS,
+        retention: float = RETENTION_SECONDS,
+        queue_size: int = 100000,
+        prune_process_dirs: bool = False,
+    ):
+        """
+        Initialize the sink and start its writer thread.
+
+        Args:
+            directory (str): Directory of the log files. Defaults to 'logs'
+            rotation (float): Seconds after which a log file is rotated. Defaults to 6 hours
+            retention (float): Seconds rotated files are kept for. Defaults to 2 days
+            queue_size (int): Records queued for the writer before records below ERROR are dropped
+            prune_process_dirs (bool): Whether to also remove subdirectories of other processes whose files
+                were not modified within the retention period
+        """
+        self._directory = directory
+        self._rotation = rotation
+        self._retention = retention
+        self._prune_process_dirs = prune_process_dirs
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        # records dropped because the queue was full, reported by the writer once it catches up
+        self.overflowed = 0
+        # level name -> open file and the time it is due for rotation
+        self._files: Dict[str, Tuple[IO, float]] = dict()
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-compressor')
+        self._writer = threading.Thread(target=self._write_loop, name='log-writer', daemon=True)
+        self._writer.start()
+        self._compressor.submit(self._prune)
+
+    def __call__(self, message):
+        record = message.record
+        item = (record['level'].name, record['time'], record['message'], record['extra'], str(message))
+        if record['level'].no >= BLOCKING_LEVEL_NO:
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.overflowed += 1
+
+    def emit(self, level: str, message: str, extra: Optional[Dict[str, Any]] = None):
+        """
+        Queue a record that did not go through the logger, e.g. about records it dropped.
+        """
+        try:
+            self._queue.put_nowait((level, datetime.now(timezone.utc), message, extra or dict(), ''))
+        except queue.Full:
+            self.overflowed += 1
+
+    def _write_loop(self):
+        reported_overflows = 0
+        while True:
+            item = self._queue.get()
+            touched = set()
+            flushed = []
+            # drain whatever queued up meanwhile before flushing
+            while item is not None:
+                if isinstance(item, threading.Event):
+                    flushed.append(item)
+                else:
+                    self._write(item)
+                    touched.add(item[0])
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if self.overflowed != reported_overflows:
+                overflowed, reported_overflows = self.overflowed - reported_overflows, self.overflowed
+                self._write((
+                    'WARNING', datetime.now(timezone.utc),
+                    f'Dropped {overflowed} records while the log queue was full', dict(), '',
+                ))
+                touched.add('WARNING')
+            for level in touched:
+                try:
+                    self._files[level][0].flush()
+                except (KeyError, OSError):
+                    pass
+            for event in flushed:
+                event.set()
+            if item is None:
+                return
+
+    def _write(self, item: Tuple):
+        try:
+            self._file(item[0]).write(format_line(*item))
+        except OSError:
+            pass
+
+    def _file(self, level: str) -> IO:
+        now = time.time()
+        entry = self._files.get(level)
+        if entry is not None and now < entry[1]:
+            return entry[0]
+        path = os.path.join(self._directory, f'{level.lower()}.log')
+        if entry is not None:
+            entry[0].close()
+            rotated = os.path.join(
+                self._directory, f'{level.lower()}.{datetime.now():%Y-%m-%d_%H-%M-%S_%f}.log',
+            )
+            try:
+                os.replace(path, rotated)
+            except OSError:
+                pass
+            else:
+                self._compressor.submit(self._compress, rotated)
+        os.makedirs(self._directory, exist_ok=True)
+        f = open(path, 'a', encoding='utf-8')
+        self._files[level] = (f, now + self._rotation)
+        return f
+
+    def _compress(self, path: str):
+        with tarfile.open(f'{path}.tar.xz', 'w:xz') as archive:
+            archive.add(path, arcname=os.path.basename(path))
+        os.remove(path)
+        self._prune()
+
+    def _prune(self):
+        expiry = time.time() - self._retention
+        for path in glob.glob(os.path.join(self._directory, '*.*.log*')):
+            try:
+                if os.path.getmtime(path) < expiry:
+                    os.remove(path)
+            except OSError:
+                pass
+        if self._prune_process_dirs:
+            for path in glob.glob(os.path.join(self._directory, '*', '')):
+                self._prune_process_dir(path, expiry)
+
+    @staticmethod
+    def _prune_process_dir(path: str, expiry: float):
+        try:
+            modified = [entry.stat().st_mtime for entry in os.scandir(path) if entry.is_file()]
+        except OSError:
+            return
+        if max(modified, default=0) < expiry:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def flush(self, timeout: float = 5):
+        """
+        Wait until the records queued so far are written to their files.
+
+        Args:
+            timeout (float): Maximum seconds to wait for
+        """
+        if not self._writer.is_alive():
+            return
+        written = threading.Event()
+        try:
+            self._queue.put(written, timeout=timeout)
+        except queue.Full:
+            return
+        written.wait(timeout)
+
+    def close(self):
+        """
+        Write queued records, close the files and wait for pending compressions.
+        """
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+        for f, _ in self._files.values():
+            f.close()
+        self._files.clear()
+        self._compressor.shutdown(wait=True)
+
+
+class RecordLimiter:
     """
-    if record['level'].name == 'WARNING':
-        return True
-    return False
-
-
-def logger_filter_error(record):
+    Loguru filter sampling and rate limiting DEBUG and INFO records per module.
     """
-    Filter function to only allow ERROR level logs to be processed.
-
-    Args:
-        record (dict): The log record to be filtered.
 
-    Returns:
-        bool: True if the log record is an ERROR level log, False otherwise.
-    """
-    if record['level'].name == 'ERROR':
+    def __init__(
+        self,
+        sampling: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, int]] = None,
+        sink: Optional[LevelRoutedFileSink] = None,
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            sampling (dict, optional): Fraction of records kept, per module
+            rate_limits (dict, optional): Records kept per second, per module
+            sink (LevelRoutedFileSink, optional): Sink the number of records dropped over a rate limit
+                is reported to, once per second
+        """
+        self._sampling = sampling or dict()
+        self._rate_limits = rate_limits or dict()
+        self._sink = sink
+        # module -> [second, records kept, records dropped] of the current rate limit window
+        self._windows: Dict[str, list] = dict()
+        self.dropped: Counter = Counter()
+
+    def __call__(self, record) -> bool:
+        if record['level'].no >= UNLIMITED_LEVEL_NO or not (self._sampling or self._rate_limits):
+            return True
+        module = record['extra'].get('module') or record['name']
+        fraction = self._sampling.get(module)
+        if fraction is not None and random.random() >= fraction:
+            self.dropped[module] += 1
+            return False
+        limit = self._rate_limits.get(module)
+        if limit is None:
+            return True
+        second = int(time.monotonic())
+        window = self._windows.get(module)
+        if window is None or window[0] != second:
+            if window is not None and window[2]:
+                self._report(module, window[2])
+            window = self._windows[module] = [second, 0, 0]
+        if window[1] >= limit:
+            window[2] += 1
+            self.dropped[module] += 1
+            return False
+        window[1] += 1
         return True
-    return False
-
 
-def logger_filter_critical(record):
-    """
-    Filter function to only allow records with CRITICAL level.
+    def _report(self, module: str, count: int):
+        if self._sink is None:
+            return
+        self._sink.emit(
+            'WARNING', f'Dropped {count} records of {module} over its rate limit of {self._rate_limits[module]}/s',
+        )
 
-    Args:
-        record (dict): The log record to be filtered.
 
-    Returns:
-        bool: True if the record's level is CRITICAL, False otherwise.
+def flush_logs():
     """
-    if record['level'].name == 'CRITICAL':
-        return True
-    return False
+    Write the queued records to the log files. Call before ``os._exit``.
+    """
+    if file_sink is not None:
+        file_sink.flush()
 
 
 logger.remove()
 
+file_sink: Optional[LevelRoutedFileSink] = None
 if settings.logs.write_to_files:
-    logger.add(
-        'logs/debug.log', level='DEBUG', format=FORMAT, filter=logger_filter_debug,
-        rotation='6 hours', compression='tar.xz', retention='2 days',
-    )
-    logger.add(
-        'logs/info.log', level='INFO', format=FORMAT, filter=logger_filter_info,
-        rotation='6 hours', compression='tar.xz', retention='2 days',
-    )
-    logger.add(
-        'logs/success.log', level='SUCCESS', format=FORMAT, filter=logger_filter_success,
-        rotation='6 hours', compression='tar.xz', retention='2 days',
-    )
-    logger.add(
-        'logs/warning.log', level='WARNING', format=FORMAT, filter=logger_filter_warning,
-        rotation='6 hours', compression='tar.xz', retention='2 days',
-    )
-    logger.add(
-        'logs/error.log', level='ERROR', format=FORMAT, filter=logger_filter_error,
-        rotation='6 hours', compression='tar.xz', retention='2 days',
-    )
-    logger.add(
-        'logs/critical.log', level='CRITICAL', format=FORMAT, filter=logger_filter_critical,
-        rotation='6 hours', compression='tar.xz', retention='2 days',
+    file_sink = LevelRoutedFileSink(
+        directory=process_log_dir(), queue_size=settings.logs.queue_size,
+        prune_process_dirs=multiprocessing.parent_process() is None,
     )
+    atexit.register(file_sink.close)
     logger.add(
-        'logs/trace.log', level='TRACE', format=FORMAT, filter=logger_filter_trace,
-        rotation='6 hours', compression='tar.xz', retention='2 days',
+        file_sink, level='TRACE', format=exception_format,
+        filter=RecordLimiter(settings.logs.sampling, settings.logs.rate_limits, file_sink),
     )
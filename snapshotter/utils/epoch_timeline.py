@@ -0,0 +1,252 @@
+"""
+Per-epoch record of processing state transitions.
+
+The distributor and the snapshot worker record a timestamped :class:`SnapshotterStateUpdate` for every
+stage an epoch goes through: its release, each preloader, each project's snapshot build and each
+submission (``SNAPSHOT_FINALIZE``). Updates are kept per epoch as a
+:class:`SnapshotterEpochProcessingReportItem` in a bounded in-memory store, which can be queried on
+the local HTTP endpoint ``/epochs``, and epochs updated since the last export are periodically
+appended to a JSON lines file in a worker thread. The last line written for an epoch holds its
+latest state, so slow or failed epochs can be diagnosed after the fact.
+
+Each data market served keeps its own timeline since epoch ids of different markets are unrelated.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.local_http_server import json_response
+from snapshotter.utils.local_http_server import local_http_server
+from snapshotter.utils.markets import market_file_path
+from snapshotter.utils.metrics import outcome_of
+from snapshotter.utils.models.data_models import SnapshotterEpochProcessingReportItem
+from snapshotter.utils.models.data_models import SnapshotterStates
+from snapshotter.utils.models.data_models import SnapshotterStateUpdate
+
+timeline_logger = logger.bind(module='EpochTimeline')
+
+# timelines of the markets served by this process, keyed by lowercased data market address
+_timelines: Dict[str, 'EpochTimeline'] = dict()
+
+
+class EpochTimeline:
+    """
+    Bounded store of the state transitions of the most recent epochs of one data market.
+
+    Transitions of the release are stored as a single update; preloads, snapshot builds and
+    submissions as a mapping from preloader, project type or project ID to its update.
+    """
+
+    def __init__(
+        self,
+        data_market: str,
+        max_epochs: Optional[int] = None,
+        export_path: Optional[str] = None,
+        export_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the timeline and make it queryable on the local HTTP endpoint.
+
+        Args:
+            data_market (str): Data market the epochs belong to
+            max_epochs (int, optional): Epochs kept in memory. Defaults to settings.epoch_timeline.max_epochs
+            export_path (str, optional): JSON lines export file, empty to disable exports.
+                Defaults to settings.epoch_timeline.export_path, suffixed with the market in multi-market mode
+            export_interval (float, optional): Seconds between exports. Defaults to settings.epoch_timeline.export_interval
+        """
+        self.data_market = data_market
+        self._max_epochs = max_epochs or settings.epoch_timeline.max_epochs
+        if export_path is None and settings.epoch_timeline.export_path:
+            export_path = market_file_path(settings.epoch_timeline.export_path, data_market)
+        self._export_path = export_path
+        self._export_interval = (
+            export_interval if export_interval is not None else settings.epoch_timeline.export_interval
+        )
+        self._epochs: OrderedDict = OrderedDict()
+        self._dirty = set()
+        self._exporter_task: Optional[asyncio.Task] = None
+        _timelines[data_market.lower()] = self
+
+    def record(
+        self,
+        epoch_id: int,
+        state: SnapshotterStates,
+        key: Optional[str] = None,
+        error: Optional[BaseException] = None,
+        extra: Optional[Dict] = None,
+        epoch_end: Optional[int] = None,
+    ):
+        """
+        Record a state transition of an epoch.
+
+        Args:
+            epoch_id (int): The epoch
+            state (SnapshotterStates): Stage that finished
+            key (str, optional): Preloader, project type or project ID the stage ran for, None for epoch wide stages
+            error (BaseException, optional): Error the stage failed with, None if it succeeded
+            extra (dict, optional): Details of the transition, e.g. its duration
+            epoch_end (int, optional): Last block of the epoch
+        """
+        if not settings.epoch_timeline.enabled:
+            return
+        item = self._epochs.get(epoch_id)
+        if item is None:
+            item = self._epochs[epoch_id] = SnapshotterEpochProcessingReportItem(epochId=epoch_id, transitionStatus=dict())
+            while len(self._epochs) > self._max_epochs:
+                self._epochs.popitem(last=False)
+        if epoch_end is not None:
+            item.epochEnd = epoch_end
+
+        update = SnapshotterStateUpdate(
+            status=outcome_of(error),
+            error=(str(error) or type(error).__name__) if error is not None else None,
+            extra=extra,
+            timestamp=int(time.time()),
+        )
+        if key is None:
+            item.transitionStatus[state.value] = update
+        else:
+            item.transitionStatus.setdefault(state.value, dict())[key] = update
+        self._dirty.add(epoch_id)
+        self._ensure_exporter()
+
+    async def track(
+        self,
+        epoch_id: int,
+        state: SnapshotterStates,
+        key: str,
+        coro,
+        describe_result: Optional[Callable[[Any], Dict]] = None,
+    ):
+        """
+        Await a coroutine and record its outcome and duration as a state transition of the epoch.
+
+        Args:
+            describe_result (Callable, optional): Returns details of the coroutine's result to record, e.g. a CID
+        """
+        started = time.monotonic()
+        try:
+            result = await coro
+        except BaseException as e:
+            self.record(epoch_id, state, key, error=e, extra={'duration': round(time.monotonic() - started, 3)})
+            raise
+        extra = {'duration': round(time.monotonic() - started, 3)}
+        if describe_result is not None:
+            extra.update(describe_result(result))
+        self.record(epoch_id, state, key, extra=extra)
+        return result
+
+    def get(self, epoch_id: int) -> Optional[SnapshotterEpochProcessingReportItem]:
+        return self._epochs.get(epoch_id)
+
+    def recent(self, limit: int = 20, failed_only: bool = False) -> List[SnapshotterEpochProcessingReportItem]:
+        """
+        Most recently started epochs first.
+
+        Args:
+            limit (int): Maximum number of epochs returned
+            failed_only (bool): Only return epochs with a failed transition
+        """
+        items = []
+        for item in reversed(self._epochs.values()):
+            if failed_only and not self.has_failures(item):
+                continue
+            items.append(item)
+            if len(items) >= limit:
+                break
+        return items
+
+    @staticmethod
+    def has_failures(item: SnapshotterEpochProcessingReportItem) -> bool:
+        for status in item.transitionStatus.values():
+            updates = status.values() if isinstance(status, dict) else [status]
+            if any(update is not None and update.status != 'success' for update in updates):
+                return True
+        return False
+
+    def _ensure_exporter(self):
+        if not self._export_path or (self._exporter_task is not None and not self._exporter_task.done()):
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # no running event loop, the next record or the final export writes the update
+            return
+        self._exporter_task = asyncio.ensure_future(self._export_loop())
+
+    def _write_lines(self, lines: List[str]):
+        if os.path.exists(self._export_path) and os.path.getsize(self._export_path) > settings.epoch_timeline.max_export_bytes:
+            os.replace(self._export_path, f'{self._export_path}.1')
+        with open(self._export_path, 'a') as f:
+            f.writelines(lines)
+
+    async def export(self):
+        """
+        Append every epoch updated since the last export to the export file.
+        """
+        if not self._export_path or not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        lines = [
+            json.dumps({'dataMarket': self.data_market, **self._epochs[epoch_id].dict()}) + '\n'
+            for epoch_id in sorted(dirty) if epoch_id in self._epochs
+        ]
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_lines, lines)
+        except Exception as e:
+            timeline_logger.error('Unable to export epoch timeline to {}: {}', self._export_path, e)
+            self._dirty.update(dirty)
+
+    async def _export_loop(self):
+        while self._dirty:
+            await asyncio.sleep(self._export_interval)
+            await self.export()
+
+    async def close(self):
+        """
+        Export pending updates and stop the background exporter.
+        """
+        if self._exporter_task is not None:
+            self._exporter_task.cancel()
+        await self.export()
+
+
+def _serialize(items: List[SnapshotterEpochProcessingReportItem]) -> List[Dict]:
+    return [item.dict() for item in items]
+
+
+async def _epochs_endpoint(query: Dict[str, str]):
+    """
+    Epoch timelines of every market, or of ``market``: the epoch ``epoch_id``, or the ``limit`` most recent
+    epochs, only those with a failed transition if ``failed`` is set.
+    """
+    timelines = _timelines
+    if query.get('market'):
+        timelines = {key: timeline for key, timeline in _timelines.items() if key == query['market'].lower()}
+    try:
+        epoch_id = int(query['epoch_id']) if 'epoch_id' in query else None
+        limit = int(query.get('limit', 20))
+    except ValueError:
+        return json_response({'error': 'epoch_id and limit must be integers'}, 400)
+    if epoch_id is not None:
+        return json_response({
+            timeline.data_market: _serialize([timeline.get(epoch_id)] if timeline.get(epoch_id) else [])
+            for timeline in timelines.values()
+        })
+    failed_only = query.get('failed', '').lower() in ('1', 'true', 'yes')
+    return json_response({
+        timeline.data_market: _serialize(timeline.recent(limit, failed_only)) for timeline in timelines.values()
+    })
+
+
+local_http_server.add_route('/epochs', _epochs_endpoint)
@@ -0,0 +1,323 @@
+"""
+Local IPC between the event detector and snapshot worker processes.
+
+In worker process mode the detector only polls the anchor chain and pushes detected events over a
+Unix socket to the worker processes, each running its own distributors on its own core.
+
+Messages are JSON objects framed by a 4 byte big-endian length. A worker connects and introduces
+itself with ``hello``; the detector then sends ``event`` messages, each acknowledged by the worker
+with an ``ack`` once it scheduled processing of the event. Acks carry the worker's load (tasks in
+processing), its latest slot selection and its last successful submission, so the detector can
+balance epochs and report liveness.
+
+Released epochs go to the least loaded worker and are re-sent to another worker if not acknowledged
+in time, so delivery is at least once. The detector dispatches each epoch once (see
+snapshotter.utils.reorg), but a worker that acknowledges late may still process an epoch that was
+re-sent to another one. Both then submit the same snapshots, which the collector deduplicates; such
+late acknowledgements are logged. Other events (day changes) are sent to every worker.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import struct
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.liveness import LAST_SUCCESSFUL_SUBMISSION
+from snapshotter.utils.liveness import liveness_state
+from snapshotter.utils.models.data_models import DailyTaskCompletedEvent
+from snapshotter.utils.models.data_models import DayStartedEvent
+from snapshotter.utils.models.data_models import EpochReleasedEvent
+
+ipc_logger = logger.bind(module='EventIPC')
+
+EVENT_MODELS = {
+    'EpochReleased': EpochReleasedEvent,
+    'DayStartedEvent': DayStartedEvent,
+    'DailyTaskCompletedEvent': DailyTaskCompletedEvent,
+}
+
+_HEADER = struct.Struct('>I')
+
+
+def write_message(writer: asyncio.StreamWriter, message: Dict):
+    data = json.dumps(message).encode('utf-8')
+    writer.write(_HEADER.pack(len(data)) + data)
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict]:
+    """
+    Read one framed message, None once the peer closed the connection.
+    """
+    try:
+        header = await reader.readexactly(_HEADER.size)
+        data = await reader.readexactly(_HEADER.unpack(header)[0])
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    return json.loads(data)
+
+
+class _WorkerConnection:
+    def __init__(self, worker_id: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.worker_id = worker_id
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[int, asyncio.Future] = dict()
+        # released epochs, by message seq, that were re-sent to another worker after not being acknowledged in time
+        self.timed_out: Dict[int, int] = dict()
+        self.reported_load = 0
+        self.last_selection: Optional[Dict] = None
+        self.closed = False
+
+    @property
+    def load(self) -> int:
+        # events sent but not acknowledged yet are not part of the reported load
+        return self.reported_load + len(self.pending)
+
+
+class EventDispatcher:
+    """
+    Detector side of the IPC channel: accepts worker connections and dispatches events to them.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, ack_timeout: Optional[float] = None):
+        self._socket_path = socket_path or settings.worker_processes.socket_path
+        self._ack_timeout = ack_timeout if ack_timeout is not None else settings.worker_processes.ack_timeout
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[int, _WorkerConnection] = dict()
+        self._ever_connected = set()
+        self._connected: Optional[asyncio.Event] = None
+        self._seq = itertools.count(1)
+
+    @property
+    def connected_workers(self) -> List[int]:
+        return sorted(self._connections)
+
+    def has_connected(self, worker_id: int) -> bool:
+        return worker_id in self._ever_connected
+
+    async def start(self):
+        self._connected = asyncio.Event()
+        if os.path.exists(self._socket_path):
+            # left behind by a previous run
+            os.unlink(self._socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self._socket_path)
+        ipc_logger.info('Dispatching events to worker processes over {}', self._socket_path)
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for connection in list(self._connections.values()):
+            connection.writer.close()
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = await read_message(reader)
+        if not hello or hello.get('type') != 'hello':
+            writer.close()
+            return
+        connection = _WorkerConnection(hello['worker'], reader, writer)
+        previous = self._connections.get(connection.worker_id)
+        if previous:
+            previous.writer.close()
+        self._connections[connection.worker_id] = connection
+        self._ever_connected.add(connection.worker_id)
+        self._connected.set()
+        ipc_logger.info('Worker process {} connected', connection.worker_id)
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                if message.get('type') != 'ack':
+                    continue
+                connection.reported_load = message.get('load', 0)
+                if message.get('last_selection'):
+                    connection.last_selection = message['last_selection']
+                submitted_at = message.get(LAST_SUCCESSFUL_SUBMISSION)
+                if submitted_at and submitted_at > (liveness_state.get(LAST_SUCCESSFUL_SUBMISSION) or 0):
+                    liveness_state.mark(LAST_SUCCESSFUL_SUBMISSION, submitted_at)
+                epoch_id = connection.timed_out.pop(message['seq'], None)
+                if epoch_id is not None:
+                    ipc_logger.warning(
+                        'Worker process {} acknowledged epoch {} after it was re-sent, it may be processed twice',
+                        connection.worker_id, epoch_id,
+                    )
+                future = connection.pending.get(message['seq'])
+                if future and not future.done():
+                    future.set_result(True)
+        finally:
+            connection.closed = True
+            for future in connection.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f'Worker process {connection.worker_id} disconnected'))
+            if self._connections.get(connection.worker_id) is connection:
+                del self._connections[connection.worker_id]
+                ipc_logger.warning('Worker process {} disconnected', connection.worker_id)
+            if not self._connections:
+                self._connected.clear()
+            writer.close()
+
+    async def wait_for_workers(self, count: int, timeout: float, alive: Callable[[], bool] = lambda: True) -> bool:
+        """
+        Wait until ``count`` distinct workers connected at least once.
+
+        Args:
+            count (int): Number of workers to wait for
+            timeout (float): Seconds to wait
+            alive (Callable[[], bool]): Returns False to stop waiting early, e.g. when a worker process exited
+
+        Returns:
+            bool: Whether all workers connected in time
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while len(self._ever_connected) < count:
+            if loop.time() >= deadline or not alive():
+                return False
+            await asyncio.sleep(0.2)
+        return True
+
+    async def _send(self, connection: _WorkerConnection, message: Dict) -> bool:
+        seq = message['seq']
+        future = asyncio.get_running_loop().create_future()
+        connection.pending[seq] = future
+        try:
+            write_message(connection.writer, message)
+            await connection.writer.drain()
+            await asyncio.wait_for(future, self._ack_timeout)
+            return True
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            ipc_logger.warning('Worker process {} did not acknowledge event {}: {}', connection.worker_id, seq, e or 'timeout')
+            if message['event_type'] == 'EpochReleased' and isinstance(e, asyncio.TimeoutError):
+                connection.timed_out[seq] = message['event']['epochId']
+                # only the most recent ones matter, a worker that never acknowledges must not grow this
+                while len(connection.timed_out) > 100:
+                    connection.timed_out.pop(next(iter(connection.timed_out)))
+            return False
+        finally:
+            connection.pending.pop(seq, None)
+
+    async def _wait_for_connection(self) -> bool:
+        if self._connections:
+            return True
+        try:
+            await asyncio.wait_for(self._connected.wait(), self._ack_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def dispatch(self, event_type: str, event, anchor_block: Optional[int] = None) -> bool:
+        """
+        Send an event to the worker processes.
+
+        Args:
+            event_type (str): Event name, a key of EVENT_MODELS
+            event: The event model
+            anchor_block (int, optional): Current anchor chain head, used by workers for deadline estimates
+
+        Returns:
+            bool: Whether a worker (for released epochs) or every connected worker (for other events) acknowledged the event
+        """
+        message = {
+            'type': 'event',
+            'seq': next(self._seq),
+            'event_type': event_type,
+            'event': event.dict(),
+            'anchor_block': anchor_block,
+        }
+        if not await self._wait_for_connection():
+            ipc_logger.error('No worker process connected, dropping {} event {}', event_type, message['event'])
+            return False
+
+        if event_type != 'EpochReleased':
+            results = await asyncio.gather(*[
+                self._send(connection, dict(message)) for connection in list(self._connections.values())
+            ])
+            return all(results)
+
+        tried = set()
+        while True:
+            candidates = [c for c in self._connections.values() if c.worker_id not in tried and not c.closed]
+            if not candidates:
+                ipc_logger.error('No worker process acknowledged epoch {}, dropping it', event.epochId)
+                return False
+            connection = min(candidates, key=lambda c: (c.load, c.worker_id))
+            tried.add(connection.worker_id)
+            if await self._send(connection, message):
+                ipc_logger.debug('Epoch {} dispatched to worker process {}', event.epochId, connection.worker_id)
+                return True
+
+    def last_selection(self) -> Optional[Dict]:
+        """
+        Most recent slot selection reported by any worker.
+        """
+        selections = [c.last_selection for c in self._connections.values() if c.last_selection]
+        return max(selections, key=lambda s: s.get('timestamp', 0), default=None)
+
+
+class EventSubscriber:
+    """
+    Worker side of the IPC channel: receives events from the detector, reconnecting whenever the connection drops.
+
+    Args:
+        worker_id (int): Index of the worker process
+        handle_event (Callable): Called with (event_type, event, anchor_block) for every event; must only schedule processing
+        status (Callable[[], Dict]): Returns the load and latest selection sent with every ack
+    """
+
+    def __init__(self, worker_id: int, handle_event: Callable, status: Callable[[], Dict], socket_path: Optional[str] = None):
+        self._worker_id = worker_id
+        self._handle_event = handle_event
+        self._status = status
+        self._socket_path = socket_path or settings.worker_processes.socket_path
+        self._logger = ipc_logger.bind(module=f'EventSubscriber-{worker_id}')
+
+    async def _connect(self, parent_pid: Optional[int]) -> Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+        delay = 0.1
+        while parent_pid is None or os.getppid() == parent_pid:
+            try:
+                return await asyncio.open_unix_connection(self._socket_path)
+            except (ConnectionError, FileNotFoundError) as e:
+                self._logger.debug('Unable to connect to event detector at {}: {}', self._socket_path, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+        return None
+
+    async def run(self, parent_pid: Optional[int] = None):
+        """
+        Receive events until cancelled, or until the detector process identified by parent_pid is gone.
+        """
+        while True:
+            connection = await self._connect(parent_pid)
+            if connection is None:
+                break
+            reader, writer = connection
+            write_message(writer, {'type': 'hello', 'worker': self._worker_id})
+            await writer.drain()
+            self._logger.info('Connected to event detector')
+            try:
+                while True:
+                    message = await read_message(reader)
+                    if message is None:
+                        break
+                    if message.get('type') != 'event':
+                        continue
+                    event = EVENT_MODELS[message['event_type']](**message['event'])
+                    self._handle_event(message['event_type'], event, message.get('anchor_block'))
+                    write_message(writer, {'type': 'ack', 'seq': message['seq'], **self._status()})
+                    await writer.drain()
+            finally:
+                writer.close()
+            self._logger.warning('Connection to event detector lost, reconnecting')
+        self._logger.error('Event detector process exited, stopping')
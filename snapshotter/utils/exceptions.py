@@ -15,6 +15,25 @@ class GenericExitOnSignal(Exception):
     pass
 
 
+class SubmissionDeadlineExceeded(Exception):
+    """Raised when work for an epoch is abandoned because its submission deadline can no longer be met"""
+    pass
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open"""
+
+    def __init__(self, dependency: str, retry_after: float):
+        self.dependency = dependency
+        self.retry_after = retry_after
+        super().__init__(f'Circuit for {dependency} is open, retrying in {retry_after:.1f}s')
+
+
+class ComputeProcessError(Exception):
+    """Raised when an offloaded compute fails in a way that cannot be re-raised as the original exception, e.g. the process died"""
+    pass
+
+
 class RPCException(Exception):
     def __init__(self, request, response, underlying_exception, extra_info):
         """
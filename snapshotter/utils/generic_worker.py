@@ -1,36 +1,63 @@
 import asyncio
-import json
+import hashlib
 import time
+from collections import OrderedDict
 from typing import Dict
+from typing import Optional
+from typing import Set
 from typing import Union
 import grpclib
-import sha3
 import tenacity
-from coincurve import PrivateKey
-from eip712_structs import EIP712Struct
-from eip712_structs import make_domain
-from eip712_structs import String
-from eip712_structs import Uint
-from eth_utils.encoding import big_endian_to_int
 from grpclib.client import Channel
+from grpclib.const import Status
+from grpclib.exceptions import StreamTerminatedError
 from ipfs_cid import cid_sha256_hash
 from ipfs_client.dag import IPFSAsyncClientError
 from ipfs_client.main import AsyncIPFSClient
 from pydantic import BaseModel
-from tenacity import retry
-from tenacity import retry_if_exception_type
-from tenacity import stop_after_attempt
-from tenacity import wait_random_exponential
 from web3 import Web3
 
 from snapshotter.settings.config import settings
+from snapshotter.utils.canonical_json import canonical_json_dumps
+from snapshotter.utils.circuit_breaker import ANCHOR_RPC
+from snapshotter.utils.circuit_breaker import COLLECTOR
+from snapshotter.utils.circuit_breaker import get_circuit_breaker
+from snapshotter.utils.circuit_breaker import guard_rpc_helper
+from snapshotter.utils.circuit_breaker import IPFS
+from snapshotter.utils.circuit_breaker import SOURCE_RPC
+from snapshotter.utils.deadline import anchor_head
+from snapshotter.utils.deadline import deadline_retrying
+from snapshotter.utils.deadline import epoch_deadlines
+from snapshotter.utils.deadline import EpochDeadlines
 from snapshotter.utils.default_logger import logger
+from snapshotter.utils.exceptions import CircuitOpenError
+from snapshotter.utils.exceptions import SubmissionDeadlineExceeded
 from snapshotter.utils.file_utils import read_json_file
+from snapshotter.utils.liveness import LAST_SUCCESSFUL_SUBMISSION
+from snapshotter.utils.liveness import liveness_state
+from snapshotter.utils.markets import configured_markets
+from snapshotter.utils.markets import market_file_path
+from snapshotter.utils.metrics import EPOCH_RELEASE_TO_ACK
+from snapshotter.utils.metrics import observe_stage
+from snapshotter.utils.metrics import project_type_of
+from snapshotter.utils.metrics import stage_timer
+from snapshotter.utils.multicall import aggregated_web3_call
+from snapshotter.utils import readiness
+from snapshotter.utils.readiness import probe_grpc_channel
+from snapshotter.utils.readiness import probe_rpc_helper
+from snapshotter.utils.readiness import readiness_state
+from snapshotter.utils.submission_history import note
+from snapshotter.utils.submission_outbox import SubmissionOutbox
+from snapshotter.utils.utility_functions import close_quietly
 from snapshotter.utils.models.message_models import SnapshotProcessMessage
+from snapshotter.utils.models.settings_model import MarketConfig
 from snapshotter.utils.models.message_models import SnapshotSubmittedMessage
 from snapshotter.utils.models.proto.snapshot_submission.submission_grpc import SubmissionStub
 from snapshotter.utils.models.proto.snapshot_submission.submission_pb2 import Request
 from snapshotter.utils.models.proto.snapshot_submission.submission_pb2 import SnapshotSubmission
+from snapshotter.utils.signing import SubmissionSigner
+from snapshotter.utils.startup_profiler import profiled
+from snapshotter.utils.startup_profiler import startup_profiler
 
 from rpc_helper.rpc import RpcHelper
 
@@ -38,12 +65,13 @@ import grpclib
 from snapshotter.version import __version__
 
 
-class EIPRequest(EIP712Struct):
-    slotId = Uint()
-    deadline = Uint()
-    snapshotCid = String()
-    epochId = Uint()
-    projectId = String()
+# collector statuses that indicate a transient condition; anything else fails the same way on every attempt
+RETRYABLE_GRPC_STATUSES = {
+    Status.UNAVAILABLE,
+    Status.RESOURCE_EXHAUSTED,
+    Status.ABORTED,
+    Status.INTERNAL,
+}
 
 
 def ipfs_upload_retry_state_callback(retry_state: tenacity.RetryCallState):
@@ -58,30 +86,84 @@ def ipfs_upload_retry_state_callback(retry_state: tenacity.RetryCallState):
     """
     if retry_state and retry_state.outcome.failed:
         logger.warning(
-            f'Encountered ipfs upload exception: {retry_state.outcome.exception()} | args: {retry_state.args}, kwargs:{retry_state.kwargs}',
+            f'Encountered ipfs upload exception: {retry_state.outcome.exception()}, retrying',
         )
 
 
+def is_retryable_ipfs_error(e: BaseException) -> bool:
+    # client errors are raised for responses IPFS will keep rejecting
+    return not isinstance(e, (IPFSAsyncClientError, CircuitOpenError, asyncio.CancelledError))
+
+
+def is_retryable_collector_error(e: BaseException) -> bool:
+    """
+    Only retry collector failures that can succeed on a later attempt: transient gRPC statuses and
+    connection level errors. A terminated stream means the collector accepted the message.
+    """
+    if isinstance(e, grpclib.GRPCError):
+        return e.status in RETRYABLE_GRPC_STATUSES
+    return isinstance(e, (ConnectionError, OSError, asyncio.TimeoutError))
+
+
+def is_stream_terminated(e: BaseException) -> bool:
+    """
+    Whether a send failed only because the collector closed the stream right after receiving the message.
+    """
+    if isinstance(e, tenacity.RetryError):
+        e = e.last_attempt.exception()
+    return isinstance(e, StreamTerminatedError) or 'StreamTerminatedError' in str(e)
+
+
 class GenericAsyncWorker:
     _rpc_helper: RpcHelper
     _anchor_rpc_helper: RpcHelper
     _grpc_channel: Channel
     _grpc_stub: SubmissionStub
 
-    def __init__(self):
+    def __init__(self, market: Optional[MarketConfig] = None):
         """
         Initializes a GenericAsyncWorker instance.
 
         Args:
-            name (str): The name of the worker.
-            **kwargs: Additional keyword arguments to pass to the superclass constructor.
+            market (MarketConfig, optional): Data market the worker submits to. Defaults to settings.data_market
         """
         self._running_callback_tasks: Dict[str, asyncio.Task] = dict()
+        # tasks the worker starts on its own, e.g. the outbox replay, referenced until they finish
+        self._background_tasks: Set[asyncio.Task] = set()
         self.protocol_state_contract = None
+        self.market = market or configured_markets()[0]
+        # epoch ids of different markets are unrelated, so every market keeps its own deadlines
+        self.epoch_deadlines = EpochDeadlines(anchor_head) if settings.markets else epoch_deadlines
 
         self.protocol_state_contract_address = settings.protocol_state.address
         self.initialized = False
         self.logger = logger.bind(module='GenericAsyncWorker')
+        self._outbox = SubmissionOutbox(
+            journal_path=market_file_path(settings.outbox.journal_path, self.market.data_market),
+        ) if settings.outbox.enabled else None
+        self._owns_rpc_helpers = True
+        # submissions given up on because their deadline passed before they could be delivered
+        self.late_submissions_abandoned = 0
+        self._ipfs_breaker = get_circuit_breaker(IPFS, is_failure=is_retryable_ipfs_error)
+        self._collector_breaker = get_circuit_breaker(COLLECTOR, is_failure=is_retryable_collector_error)
+        # uploads of the same snapshot bytes in the same epoch, e.g. by several slots, keyed by (epoch_id, digest)
+        self._snapshot_uploads: OrderedDict = OrderedDict()
+
+    @property
+    def in_flight_tasks(self) -> Set[asyncio.Task]:
+        """
+        Tasks started by the worker on its own that have not finished yet.
+        """
+        return self._background_tasks
+
+    def _spawn_background(self, coro) -> asyncio.Task:
+        """
+        Schedules a coroutine as a task and keeps a reference to it until completion.
+        """
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
 
     def _notification_callback_result_handler(self, fut: asyncio.Future):
         """
@@ -119,31 +201,56 @@ class GenericAsyncWorker:
                 r = str(r)
         return r, exc, req_json['epochId'], req_json['projectId'], req_json['slotId']
 
-    @retry(
-        wait=wait_random_exponential(multiplier=1, max=10),
-        stop=stop_after_attempt(5),
-        retry=tenacity.retry_if_not_exception_type(IPFSAsyncClientError),
-        after=ipfs_upload_retry_state_callback,
-    )
-    async def _upload_to_ipfs(self, snapshot: bytes, _ipfs_writer_client: AsyncIPFSClient):
+    async def _upload_to_ipfs(self, snapshot: bytes, _ipfs_writer_client: AsyncIPFSClient, epoch_id: int):
         """
         Uploads a snapshot to IPFS using the provided AsyncIPFSClient.
 
+        Attempts are retried within the remaining deadline budget of the epoch.
+
         Args:
             snapshot (bytes): The snapshot to upload.
             _ipfs_writer_client (AsyncIPFSClient): The IPFS client to use for uploading.
+            epoch_id (int): The epoch the snapshot belongs to.
 
         Returns:
             str: The CID of the uploaded snapshot.
         """
-        snapshot_cid = await _ipfs_writer_client.add_bytes(snapshot)
-        return snapshot_cid
+        retrying = deadline_retrying(
+            remaining_budget=lambda: self.epoch_deadlines.remaining_seconds(epoch_id),
+            max_attempts=settings.submission_retry.ipfs_attempts,
+            is_retryable=is_retryable_ipfs_error,
+            description=f'IPFS upload for epoch {epoch_id}',
+            before_sleep=ipfs_upload_retry_state_callback,
+        )
+        return await retrying(self._ipfs_breaker.call, _ipfs_writer_client.add_bytes, snapshot)
 
-    async def _send_submission_to_collector(self, snapshot_cid, epoch_id, project_id):
+    async def _upload_snapshot(self, snapshot: bytes, _ipfs_writer_client: AsyncIPFSClient, epoch_id: int):
+        """
+        Uploads a snapshot to IPFS once per epoch: slots committing identical snapshot bytes share one upload.
+        """
+        key = (epoch_id, hashlib.sha256(snapshot).digest())
+        upload = self._snapshot_uploads.get(key)
+        if upload is None:
+            upload = asyncio.ensure_future(self._upload_to_ipfs(snapshot, _ipfs_writer_client, epoch_id))
+            self._snapshot_uploads[key] = upload
+            # failed uploads are not cached so the next commit tries again
+            upload.add_done_callback(
+                lambda f: self._snapshot_uploads.pop(key, None) if f.cancelled() or f.exception() else None,
+            )
+            while len(self._snapshot_uploads) > 256:
+                self._snapshot_uploads.popitem(last=False)
+        return await asyncio.shield(upload)
+
+    async def _send_submission_to_collector(self, snapshot_cid, epoch_id, project_id, slot_id=None, private_key=None):
         self.logger.debug(
             'Sending submission to collector...',
         )
-        request_, signature, current_block_hash = await self.generate_signature(snapshot_cid, epoch_id, project_id, settings.slot_id, settings.signer_private_key)
+        self.epoch_deadlines.check(epoch_id, 'signing the submission')
+        project_type = project_type_of(project_id)
+        with stage_timer('sign', project_type):
+            request_, signature, current_block_hash = await self.generate_signature(
+                snapshot_cid, epoch_id, project_id, slot_id or settings.slot_id, private_key or settings.signer_private_key,
+            )
 
         request_msg = Request(
             slotId=request_['slotId'],
@@ -155,42 +262,117 @@ class GenericAsyncWorker:
         self.logger.debug(
             'Snapshot submission creation with request: {}', request_msg,
         )
-        msg = SnapshotSubmission(request=request_msg, signature=signature.hex(), header=current_block_hash, dataMarket=settings.data_market, nodeVersion=settings.node_version, protocolState=settings.protocol_state.address)
+        note(cid=snapshot_cid, deadline=request_['deadline'])
+        msg = SnapshotSubmission(request=request_msg, signature=signature.hex(), header=current_block_hash, dataMarket=self.market.data_market, nodeVersion=settings.node_version, protocolState=settings.protocol_state.address)
         self.logger.debug(
             'Snapshot submission created: {}', msg,
         )
         kwargs_simulation = {'simulation': False}
         if epoch_id == 0:
             kwargs_simulation['simulation'] = True
+        else:
+            await self._record_in_outbox(msg)
+        submit_started = time.monotonic()
         try:
-            await self.send_message(msg=msg, **kwargs_simulation)
+            response = await self.send_message(msg=msg, **kwargs_simulation)
         except Exception as e:
-            if 'StreamTerminatedError' in str(e):  # Doing this because we get RetryError here not StreamTerminatedError
-                pass  # fail silently as this is intended for the stream to be closed right after sending the message
+            if is_stream_terminated(e):
+                note(collector_response=str(e))
+                await self._acknowledge_in_outbox(msg)  # fail silently as this is intended for the stream to be closed right after sending the message
             else:
+                observe_stage('submit', project_type, time.monotonic() - submit_started, e)
                 self.logger.error(
                     f'Probable exception in _send_submission_to_collector while sending snapshot to local collector {msg}: {e}',
                 )
                 raise
         else:
+            note(collector_response=str(response).strip())
+            await self._acknowledge_in_outbox(msg)
             self.logger.info('In _send_submission_to_collector successfully sent snapshot to local collector {msg}')
+        observe_stage('submit', project_type, time.monotonic() - submit_started)
+        released_at = self.epoch_deadlines.released_at(epoch_id)
+        if released_at is not None:
+            release_to_ack = time.time() - released_at
+            EPOCH_RELEASE_TO_ACK.observe(release_to_ack, project_type=project_type)
+            note(release_to_ack_ms=round(release_to_ack * 1000, 3))
+
+    async def _record_in_outbox(self, msg: SnapshotSubmission):
+        """
+        Durably journals a signed submission before it is sent. Outbox failures never block the submission itself.
+        """
+        if not self._outbox:
+            return
+        try:
+            await self._outbox.record(msg)
+        except Exception as e:
+            self.logger.error('Unable to record submission in outbox, sending without crash protection: {}', e)
+
+    async def _acknowledge_in_outbox(self, msg: SnapshotSubmission):
+        if not self._outbox:
+            return
+        try:
+            await self._outbox.acknowledge(msg)
+        except Exception as e:
+            self.logger.error('Unable to acknowledge submission in outbox: {}', e)
+
+    async def _replay_outbox(self):
+        """
+        Resends submissions that were signed by a previous run but never acknowledged by the collector.
+
+        Replayed messages are sent exactly as they were journaled: nothing is recomputed or re-signed.
+        """
+        if not self._outbox:
+            return
+        try:
+            await asyncio.wait_for(readiness_state.wait_ready(readiness.COLLECTOR), settings.readiness.timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning('Local collector not ready, replaying outbox anyway')
+        try:
+            current_block_number = await self._anchor_rpc_helper.get_current_block_number()
+            # bounds the replayed submissions' retries by their deadlines, even before the detector's first poll
+            anchor_head.update(current_block_number)
+            submissions = await self._outbox.recover(current_block_number)
+        except Exception as e:
+            self.logger.error('Unable to recover submission outbox: {}', e)
+            return
+
+        if submissions:
+            self.logger.info('Replaying {} unacknowledged submissions from outbox', len(submissions))
+        for msg in submissions:
+            try:
+                await self.send_message(msg=msg)
+            except Exception as e:
+                if not is_stream_terminated(e):
+                    self.logger.error(
+                        'Failed to replay outbox submission for epoch {} project {}: {}',
+                        msg.request.epochId, msg.request.projectId, e,
+                    )
+                    continue
+            await self._acknowledge_in_outbox(msg)
 
-    @retry(
-        wait=wait_random_exponential(multiplier=1, max=10),
-        stop=stop_after_attempt(3),
-        retry=retry_if_exception_type(Exception),
-    )
     async def send_message(self, msg, simulation=False):
         """
         Sends a message to the collector, either as a simulation or a real submission.
 
+        Transient failures are retried until the deadline block of the signed request is near.
+
         Args:
             msg (SnapshotSubmission): The message to send.
             simulation (bool, optional): Whether this is a simulation. Defaults to False.
 
         Raises:
+            SubmissionDeadlineExceeded: If the deadline budget ran out before the message was delivered.
             Exception: If failed to send the message.
         """
+        retrying = deadline_retrying(
+            remaining_budget=lambda: anchor_head.seconds_until(msg.request.deadline),
+            max_attempts=settings.submission_retry.collector_attempts,
+            is_retryable=is_retryable_collector_error,
+            description=f'Submission for epoch {msg.request.epochId} project {msg.request.projectId}',
+        )
+        return await retrying(self._collector_breaker.call, self._submit_to_collector, msg)
+
+    async def _submit_to_collector(self, msg):
         try:
             response = await self._grpc_stub.SubmitSnapshot(msg)
             self.logger.debug(f'Sent message to local collector and received response: {response}')
@@ -205,9 +387,8 @@ class GenericAsyncWorker:
             raise
         else:
             self.logger.info(f'Successfully submitted snapshot to local collector: {msg}')
-            # write to a file on last successful submission to local collector
-            with open('last_successful_submission.txt', 'w') as f:
-                f.write(str(int(time.time())))
+            # persisted to last_successful_submission.txt by the background liveness flusher
+            liveness_state.mark(LAST_SUCCESSFUL_SUBMISSION)
         
         return response
 
@@ -221,6 +402,8 @@ class GenericAsyncWorker:
                 SnapshotSubmittedMessage
             ],
             snapshot: BaseModel,
+            slot_id: Optional[int] = None,
+            private_key: Optional[str] = None,
     ):
         """
         Commits the given snapshot to IPFS and sends messages to the event detector dispatch queues.
@@ -232,49 +415,79 @@ class GenericAsyncWorker:
             epoch (Union[SnapshotProcessMessage, SnapshotSubmittedMessage,
             SnapshotSubmittedMessageLite]): The epoch the snapshot belongs to.
             snapshot (BaseModel): The snapshot to commit.
+            slot_id (int, optional): Slot submitting the snapshot. Defaults to settings.slot_id
+            private_key (str, optional): Signing key of the slot. Defaults to settings.signer_private_key
 
         Returns:
             snapshot_cid (str): The CID of the uploaded snapshot.
         """
         # upload to IPFS
-        snapshot_json = json.dumps(snapshot.dict(by_alias=True), sort_keys=True, separators=(',', ':'))
-        snapshot_bytes = snapshot_json.encode('utf-8')
+        with stage_timer('serialize', task_type):
+            snapshot_bytes = canonical_json_dumps(snapshot.dict(by_alias=True))
         try:
             if settings.ipfs.url:
-                snapshot_cid = await self._upload_to_ipfs(snapshot_bytes, _ipfs_writer_client)
+                self.epoch_deadlines.check(epoch.epochId, 'uploading to IPFS')
+                with stage_timer('ipfs_add', task_type):
+                    snapshot_cid = await self._upload_snapshot(snapshot_bytes, _ipfs_writer_client, epoch.epochId)
             else:
                 snapshot_cid = cid_sha256_hash(snapshot_bytes)
+        except SubmissionDeadlineExceeded as e:
+            self._abandon_late_submission(epoch.epochId, project_id, e)
+            raise
         except Exception as e:
             self.logger.opt(exception=True).error(
-                'Exception uploading snapshot to IPFS for epoch {}: {}, Error: {},'
-                'sending failure notifications', epoch, snapshot, e,
+                'Exception uploading snapshot to IPFS for epoch {} project {} ({} bytes), Error: {}, '
+                'sending failure notifications', epoch.epochId, project_id, len(snapshot_bytes), e,
             )
             raise
         else:
             self.logger.info(
-                '🔍 [Epoch {}] Project {} | CID: {} | Serialized snapshot JSON: {}',
-                epoch.epochId, project_id, snapshot_cid, snapshot_json,
+                '🔍 [Epoch {}] Project {} | CID: {} | Serialized snapshot size: {} bytes',
+                epoch.epochId, project_id, snapshot_cid, len(snapshot_bytes),
             )
+            if settings.logs.trace_enabled:
+                self.logger.opt(lazy=True).trace(
+                    '🔍 [Epoch {}] Project {} | CID: {} | Serialized snapshot JSON: {}',
+                    lambda: epoch.epochId, lambda: project_id, lambda: snapshot_cid, lambda: snapshot_bytes.decode('utf-8'),
+                )
             # submit to collector
             try:
-                await self._send_submission_to_collector(snapshot_cid, epoch.epochId, project_id)
+                await self._send_submission_to_collector(snapshot_cid, epoch.epochId, project_id, slot_id, private_key)
+            except SubmissionDeadlineExceeded as e:
+                self._abandon_late_submission(epoch.epochId, project_id, e)
+                raise
             except Exception as e:
                 self.logger.opt(exception=True).error(
-                    'Exception submitting snapshot to collector for epoch {}: {}, Error: {},'
-                    'sending failure notifications', epoch, snapshot, e,
+                    'Exception submitting snapshot to collector for epoch {} project {} | CID: {}, Error: {}, '
+                    'sending failure notifications', epoch.epochId, project_id, snapshot_cid, e,
                 )
                 raise
             else:
                 return snapshot_cid
 
-    async def _init_rpc_helper(self):
+    def _abandon_late_submission(self, epoch_id: int, project_id: str, e: SubmissionDeadlineExceeded):
+        self.late_submissions_abandoned += 1
+        self.logger.warning(
+            'Abandoning late submission for epoch {} project {} ({} abandoned so far): {}',
+            epoch_id, project_id, self.late_submissions_abandoned, e,
+        )
+
+    async def _init_rpc_helper(self, rpc_helper=None, anchor_rpc_helper=None):
         """
         Initializes the RpcHelper objects for the worker and anchor chain, and sets up the protocol state contract.
+
+        Args:
+            rpc_helper (optional): Initialized source chain RpcHelper to share instead of creating one
+            anchor_rpc_helper (optional): Initialized anchor chain RpcHelper to share instead of creating one
         """
-        self._rpc_helper = RpcHelper(rpc_settings=settings.rpc)
-        self._anchor_rpc_helper = RpcHelper(rpc_settings=settings.powerloom_chain_rpc)
-        await self._rpc_helper.init()
-        await self._anchor_rpc_helper.init()
+        self._owns_rpc_helpers = rpc_helper is None or anchor_rpc_helper is None
+        if self._owns_rpc_helpers:
+            self._rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.rpc), SOURCE_RPC)
+            self._anchor_rpc_helper = guard_rpc_helper(RpcHelper(rpc_settings=settings.powerloom_chain_rpc), ANCHOR_RPC)
+            await asyncio.gather(self._rpc_helper.init(), self._anchor_rpc_helper.init())
+        else:
+            self._rpc_helper = rpc_helper
+            self._anchor_rpc_helper = anchor_rpc_helper
         self.protocol_state_contract = self._anchor_rpc_helper.get_current_node()['web3_client'].eth.contract(
             address=Web3.to_checksum_address(
                 self.protocol_state_contract_address,
@@ -286,44 +499,28 @@ class GenericAsyncWorker:
         )
 
         self._anchor_chain_id = await self._anchor_rpc_helper.get_current_node()['web3_client'].eth.chain_id
-        self._keccak_hash = lambda x: sha3.keccak_256(x).digest()
-        self._domain_separator = make_domain(
-            name='PowerloomProtocolContract', version='0.1', chainId=self._anchor_chain_id,
-            verifyingContract=self.protocol_state_contract_address,
+        self._signer = SubmissionSigner(
+            chain_id=self._anchor_chain_id,
+            verifying_contract=self.protocol_state_contract_address,
+            private_key=settings.signer_private_key,
         )
-        self._private_key = settings.signer_private_key
-        if self._private_key.startswith('0x'):
-            self._private_key = self._private_key[2:]
-        self._identity_private_key = PrivateKey.from_hex(settings.signer_private_key)
 
     async def generate_signature(self, snapshot_cid, epoch_id, project_id, slot_id=None, private_key=None):
         
         current_block = await self._anchor_rpc_helper.eth_get_block()
         current_block_number = int(current_block['number'], 16)
         current_block_hash = current_block['hash']
+        anchor_head.update(current_block_number)
         deadline = current_block_number + settings.protocol_state.deadline_buffer
         request_slot_id = settings.slot_id if not slot_id else slot_id
-        request = EIPRequest(
-            slotId=request_slot_id,
+        final_sig = self._signer.sign(
+            slot_id=request_slot_id,
             deadline=deadline,
-            snapshotCid=snapshot_cid,
-            epochId=epoch_id,
-            projectId=project_id,
+            snapshot_cid=snapshot_cid,
+            epoch_id=epoch_id,
+            project_id=project_id,
+            private_key=private_key,
         )
-
-        signable_bytes = request.signable_bytes(self._domain_separator)
-        if not private_key:
-            signature = self._identity_private_key.sign_recoverable(signable_bytes, hasher=self._keccak_hash)
-        else:
-            if private_key.startswith('0x'):
-                private_key = private_key[2:]
-            signer_private_key = PrivateKey.from_hex(private_key)
-            signature = signer_private_key.sign_recoverable(signable_bytes, hasher=self._keccak_hash)
-        v = signature[64] + 27
-        r = big_endian_to_int(signature[0:32])
-        s = big_endian_to_int(signature[32:64])
-
-        final_sig = r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + v.to_bytes(1, 'big')
         request_ = {'slotId': request_slot_id, 'deadline': deadline, 'snapshotCid': snapshot_cid, 'epochId': epoch_id, 'projectId': project_id}
         return request_, final_sig, current_block_hash
 
@@ -337,48 +534,69 @@ class GenericAsyncWorker:
         self._stream = None
         self._cancel_task = None
 
+    def readiness_probes(self):
+        """
+        Probes of the dependencies the worker submits through, keyed by dependency name.
+        """
+        return {
+            readiness.COLLECTOR: lambda: probe_grpc_channel(self._grpc_channel, settings.readiness.probe_timeout),
+            readiness.SOURCE_RPC: lambda: probe_rpc_helper(self._rpc_helper),
+            readiness.ANCHOR_RPC: lambda: probe_rpc_helper(self._anchor_rpc_helper),
+        }
+
     async def _init_protocol_meta(self):
-        # TODO: combine these into a single call
         try:
-            source_block_time = await self._anchor_rpc_helper.web3_call(
+            source_block_time, epoch_size = await aggregated_web3_call(
+                self._anchor_rpc_helper,
                 [
-                    ("SOURCE_CHAIN_BLOCK_TIME", [Web3.to_checksum_address(settings.data_market)]),
+                    ("SOURCE_CHAIN_BLOCK_TIME", [Web3.to_checksum_address(self.market.data_market)]),
+                    ("EPOCH_SIZE", [Web3.to_checksum_address(self.market.data_market)]),
                 ],
                 contract_addr=self.protocol_state_contract.address,
                 abi=self.protocol_state_contract.abi,
             )
         except Exception as e:
             self.logger.exception(
-                'Exception in querying protocol state for source chain block time: {}',
+                'Exception in querying protocol state for source chain block time and epoch size: {}',
                 e,
             )
         else:
-            source_block_time = source_block_time[0]
             self._source_chain_block_time = source_block_time / 10 ** 4
             self.logger.debug('Set source chain block time to {}', self._source_chain_block_time)
-        try:
-            epoch_size = await self._anchor_rpc_helper.web3_call(
-                [
-                    ("EPOCH_SIZE", [Web3.to_checksum_address(settings.data_market)]),
-                ],
-                contract_addr=self.protocol_state_contract.address,
-                abi=self.protocol_state_contract.abi,
-            )
-        except Exception as e:
-            self.logger.exception(
-                'Exception in querying protocol state for epoch size: {}',
-                e,
-            )
-        else:
-            self._epoch_size = epoch_size[0]
+            self._epoch_size = epoch_size
             self.logger.debug('Set epoch size to {}', self._epoch_size)
 
-    async def init(self):
+    async def close(self):
+        """
+        Cancels the worker's background tasks, flushes the submission outbox and closes the RPC and gRPC
+        connections held by the worker. Submissions whose replay was cancelled stay in the outbox.
+        """
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._outbox:
+            await self._outbox.flush()
+        if self.initialized:
+            await close_quietly(self._grpc_channel)
+            if self._owns_rpc_helpers:
+                await close_quietly(self._rpc_helper)
+                await close_quietly(self._anchor_rpc_helper)
+
+    async def init(self, rpc_helper=None, anchor_rpc_helper=None):
         """
         Initializes the worker by initializing the HTTPX client, and RPC helper.
+
+        Args:
+            rpc_helper (optional): Initialized source chain RpcHelper to share instead of creating one
+            anchor_rpc_helper (optional): Initialized anchor chain RpcHelper to share instead of creating one
         """
         if not self.initialized:
-            await self._init_rpc_helper()
-            await self._init_protocol_meta()
-            await self._init_grpc()
+            with startup_profiler.step('worker.rpc_helpers'):
+                await self._init_rpc_helper(rpc_helper, anchor_rpc_helper)
+            await asyncio.gather(
+                profiled('worker.protocol_meta', self._init_protocol_meta()),
+                profiled('worker.grpc', self._init_grpc()),
+            )
+            self._spawn_background(self._replay_outbox())
         self.initialized = True
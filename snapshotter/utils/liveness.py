@@ -0,0 +1,127 @@
+"""
+Liveness markers kept in memory and flushed to disk in the background.
+
+Components record liveness timestamps (e.g. the last successful submission) with
+:meth:`LivenessState.mark`, which only updates a dict. A background task flushes changed
+markers at most once per ``settings.liveness.flush_interval`` seconds, writing each marker
+file through a temporary file and an atomic rename in a worker thread, so bursts of
+submissions never cause synchronous file writes on the event loop. The current values are
+also served on the local HTTP endpoint.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict
+from typing import Optional
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.local_http_server import json_response
+from snapshotter.utils.local_http_server import local_http_server
+
+liveness_logger = logger.bind(module='LivenessState')
+
+LAST_SUCCESSFUL_SUBMISSION = 'last_successful_submission'
+
+
+class LivenessState:
+    """
+    In-memory liveness timestamps with coalesced, atomic persistence to ``<name>.txt`` files.
+    """
+
+    def __init__(self, directory: str = '.', flush_interval: Optional[float] = None):
+        """
+        Initialize the liveness state.
+
+        Args:
+            directory (str): Directory the marker files are written to
+            flush_interval (float, optional): Minimum seconds between flushes. Defaults to settings.liveness.flush_interval
+        """
+        self._directory = directory
+        self._flush_interval = flush_interval if flush_interval is not None else settings.liveness.flush_interval
+        self._markers: Dict[str, int] = dict()
+        self._dirty = set()
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._dirty_event: Optional[asyncio.Event] = None
+
+    def mark(self, name: str, timestamp: Optional[int] = None):
+        """
+        Record a liveness timestamp. The marker file is updated by the next background flush.
+
+        Args:
+            name (str): Marker name, persisted as ``<name>.txt``
+            timestamp (int, optional): Unix timestamp. Defaults to now
+        """
+        self._markers[name] = int(timestamp if timestamp is not None else time.time())
+        self._dirty.add(name)
+        self._ensure_flusher()
+
+    def get(self, name: str) -> Optional[int]:
+        return self._markers.get(name)
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self._markers)
+
+    def _ensure_flusher(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._dirty_event is None:
+            self._dirty_event = asyncio.Event()
+        self._dirty_event.set()
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.ensure_future(self._flush_loop())
+
+    def _write_marker(self, name: str, value: int):
+        path = os.path.join(self._directory, f'{name}.txt')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(value))
+        os.replace(tmp_path, path)
+
+    def _write_markers(self, markers: Dict[str, int]):
+        for name, value in markers.items():
+            self._write_marker(name, value)
+
+    async def flush(self):
+        """
+        Write all changed markers to disk now.
+        """
+        if not self._dirty:
+            return
+        markers = {name: self._markers[name] for name in self._dirty}
+        self._dirty = set()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_markers, markers)
+        except Exception as e:
+            liveness_logger.error('Unable to write liveness markers {}: {}', list(markers), e)
+            self._dirty.update(markers)
+
+    async def _flush_loop(self):
+        while True:
+            await self._dirty_event.wait()
+            self._dirty_event.clear()
+            await self.flush()
+            # coalesce everything marked during the interval into the next flush
+            await asyncio.sleep(self._flush_interval)
+
+
+liveness_state = LivenessState()
+
+
+async def _liveness_endpoint(query: Dict[str, str]):
+    now = int(time.time())
+    return json_response(
+        {
+            'timestamp': now,
+            'markers': {
+                name: {'timestamp': value, 'age_seconds': now - value}
+                for name, value in liveness_state.snapshot().items()
+            },
+        },
+    )
+
+
+local_http_server.add_route('/liveness', _liveness_endpoint)
@@ -0,0 +1,121 @@
+"""
+Minimal HTTP/1.1 server for local introspection endpoints (liveness, metrics, diagnostics).
+
+Built directly on asyncio streams so that serving a handful of GET requests from health checks
+and scrapers does not pull a web framework into the node process. Handlers are registered per
+path and receive the parsed query string.
+"""
+
+import asyncio
+import json
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+from snapshotter.utils.default_logger import logger
+
+http_logger = logger.bind(module='LocalHTTPServer')
+
+# handler(query) -> (status code, content type, body)
+RouteHandler = Callable[[Dict[str, str]], Awaitable[Tuple[int, str, bytes]]]
+
+_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+def json_response(data, status: int = 200) -> Tuple[int, str, bytes]:
+    """
+    Build a handler return value carrying a JSON body.
+    """
+    return status, 'application/json', json.dumps(data).encode('utf-8')
+
+
+class LocalHTTPServer:
+    """
+    Path-routed HTTP server bound to a local interface.
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, RouteHandler] = dict()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def add_route(self, path: str, handler: RouteHandler):
+        """
+        Register a handler for GET requests on the given path.
+        """
+        self._routes[path] = handler
+
+    async def start(self, host: str, port: int):
+        """
+        Start listening. Calling it again once started is a no-op.
+        """
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        http_logger.info('Local HTTP endpoints listening on {}:{}: {}', host, port, sorted(self._routes))
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # drain headers, bodies are not supported
+            while True:
+                header = await asyncio.wait_for(reader.readline(), timeout=5)
+                if header in (b'\r\n', b'\n', b''):
+                    break
+            status, content_type, body = await self._dispatch(request_line)
+        except Exception as e:
+            http_logger.debug('Dropping malformed local HTTP request: {}', e)
+            writer.close()
+            return
+
+        try:
+            writer.write(
+                (
+                    f'HTTP/1.1 {status} {_REASONS.get(status, "")}\r\n'
+                    f'Content-Type: {content_type}\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    'Connection: close\r\n\r\n'
+                ).encode('latin-1') + body,
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request_line: bytes) -> Tuple[int, str, bytes]:
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            return json_response({'error': 'bad request'}, 400)
+        if method != 'GET':
+            return json_response({'error': 'method not allowed'}, 405)
+
+        url = urlsplit(target)
+        handler = self._routes.get(url.path)
+        if handler is None:
+            return json_response({'error': 'not found', 'routes': sorted(self._routes)}, 404)
+        try:
+            return await handler(dict(parse_qsl(url.query)))
+        except Exception as e:
+            http_logger.opt(exception=True).error('Error serving local endpoint {}: {}', url.path, e)
+            return json_response({'error': str(e)}, 500)
+
+
+# shared by every component that exposes a local endpoint
+local_http_server = LocalHTTPServer()
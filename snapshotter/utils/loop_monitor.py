@@ -0,0 +1,114 @@
+"""
+Event loop lag sampling and stall detection.
+
+The event detector, distributors and snapshot workers of a process share one asyncio loop, so any
+blocking call on it (synchronous HTTP, file I/O, CPU heavy parsing) delays everything else. A
+sampler task measures how late the loop wakes it up, which is exported as the
+``snapshotter_event_loop_lag_seconds`` histogram. A watchdog thread notices when the sampler has not
+run for longer than the stall threshold and logs the task being run along with the stack of the loop
+thread, which points at the blocking call while it is still blocking. Every stall is counted in
+``snapshotter_event_loop_stalls_total`` once the loop recovers.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.metrics import EVENT_LOOP_LAG
+from snapshotter.utils.metrics import EVENT_LOOP_STALLS
+
+monitor_logger = logger.bind(module='LoopMonitor')
+
+
+class LoopMonitor:
+    """
+    Samples the lag of the running event loop and reports callbacks blocking it.
+    """
+
+    def __init__(self, sample_interval: Optional[float] = None, stall_threshold: Optional[float] = None):
+        """
+        Initialize the monitor.
+
+        Args:
+            sample_interval (float, optional): Seconds between samples. Defaults to settings.loop_monitor.sample_interval
+            stall_threshold (float, optional): Seconds of blocking reported as a stall.
+                Defaults to settings.loop_monitor.stall_threshold
+        """
+        self._sample_interval = sample_interval or settings.loop_monitor.sample_interval
+        self._stall_threshold = stall_threshold or settings.loop_monitor.stall_threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        # monotonic time the sampler last ran, and the one the watchdog last reported a stall for
+        self._heartbeat = 0.0
+        self._reported_heartbeat = 0.0
+
+    def start(self):
+        """
+        Start monitoring the running event loop.
+        """
+        if not settings.loop_monitor.enabled or self._sampler_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._sampler_task = asyncio.ensure_future(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-monitor', daemon=True)
+        self._watchdog.start()
+
+    async def _sample(self):
+        while True:
+            scheduled = time.monotonic() + self._sample_interval
+            await asyncio.sleep(self._sample_interval)
+            self._heartbeat = time.monotonic()
+            lag = max(self._heartbeat - scheduled, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self._stall_threshold:
+                EVENT_LOOP_STALLS.inc()
+                monitor_logger.warning('Event loop was blocked for {:.3f}s', lag)
+
+    def _watch(self):
+        while not self._stopped.wait(self._stall_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self._sample_interval
+            if blocked < self._stall_threshold or heartbeat == self._reported_heartbeat:
+                continue
+            self._reported_heartbeat = heartbeat
+            self._report_stall(blocked)
+
+    def _report_stall(self, blocked: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        monitor_logger.warning(
+            'Event loop blocked for {:.3f}s so far while running {}, stack of the loop thread:\n{}',
+            blocked,
+            task if task is not None else 'a callback outside of any task',
+            ''.join(traceback.format_stack(frame)) if frame is not None else '<unavailable>',
+        )
+
+    def stop(self):
+        """
+        Stop the sampler and the watchdog thread.
+        """
+        self._stopped.set()
+        if self._sampler_task is not None:
+            self._sampler_task.cancel()
+            self._sampler_task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+
+# monitors the loop of the process it is started in
+loop_monitor = LoopMonitor()
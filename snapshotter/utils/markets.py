@@ -0,0 +1,42 @@
+"""
+Data markets served by the node.
+
+A node serves ``settings.data_market`` with the configured projects and preloaders unless
+``settings.markets`` lists several markets of the protocol state contract. In multi-market mode the
+event detector polls the contract logs once and routes released epochs to one distributor per market,
+each with its own projects and preloaders config and protocol metadata (epoch size, source chain,
+current day), while the RPC helpers, and the caches and request batching built on them, are shared.
+"""
+
+import os
+from typing import List
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.models.settings_model import MarketConfig
+
+
+def configured_markets() -> List[MarketConfig]:
+    """
+    Markets served by the node with their config paths resolved, the single configured market unless settings.markets is set.
+    """
+    markets = settings.markets or [MarketConfig(data_market=settings.data_market)]
+    return [
+        market.copy(
+            update={
+                'projects_config_path': market.projects_config_path or settings.projects_config_path,
+                'preloaders_config_path': market.preloaders_config_path or settings.preloaders_config_path,
+            },
+        )
+        for market in markets
+    ]
+
+
+def market_file_path(path: str, data_market: str) -> str:
+    """
+    Per market variant of a state file path in multi-market mode, e.g.
+    submission_outbox.jsonl -> submission_outbox.0xabc...jsonl; the path itself when serving a single market.
+    """
+    if not settings.markets:
+        return path
+    root, ext = os.path.splitext(path)
+    return f'{root}.{data_market.lower()}{ext}'
@@ -0,0 +1,301 @@
+"""
+In-process counters and latency histograms of the snapshot pipeline.
+
+Every stage an epoch goes through, from detecting its release to the collector acknowledging its
+submissions, is timed into a histogram labelled with the project type and the outcome of the
+stage. Metrics are kept in memory and served on the local HTTP endpoint ``/metrics`` in the
+Prometheus text exposition format, so a scraper can show which stage eats the submission window.
+
+Stages recorded in ``snapshotter_stage_duration_seconds``:
+
+- ``release_wait``: wait before an epoch is processed, giving the BDS time to finish processing it
+- ``compute``: a project's processor computing its snapshots
+- ``serialize``: canonical JSON serialization of a snapshot
+- ``ipfs_add``: uploading a snapshot to IPFS
+- ``sign``: fetching the anchor chain head and signing the submission
+- ``submit``: sending the submission to the local collector over gRPC, retries included
+"""
+
+import abc
+import asyncio
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from snapshotter.utils.exceptions import CircuitOpenError
+from snapshotter.utils.exceptions import SubmissionDeadlineExceeded
+from snapshotter.utils.local_http_server import local_http_server
+
+# seconds, covering sub-millisecond serialization up to a submission window of several minutes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def outcome_of(error: Optional[BaseException]) -> str:
+    """
+    Outcome label of a stage that finished with the given exception, or succeeded if None.
+    """
+    if error is None:
+        return 'success'
+    if isinstance(error, SubmissionDeadlineExceeded):
+        return 'deadline_exceeded'
+    if isinstance(error, CircuitOpenError):
+        return 'circuit_open'
+    if isinstance(error, asyncio.CancelledError):
+        return 'cancelled'
+    if isinstance(error, asyncio.TimeoutError):
+        return 'timeout'
+    return 'error'
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    type_ = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {sorted(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """
+        Exposition lines of the metric's values, after its HELP and TYPE lines.
+        """
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_}']
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count per label set.
+    """
+    type_ = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = dict()
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self._labels(key))} {_format_value(value)}'
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values per label set, in cumulative buckets.
+
+    If the histogram has an ``outcome`` label, :meth:`time` fills it in from how the timed block exited.
+    """
+    type_ = 'histogram'
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: counts per bucket (the last one being +Inf), sum and count
+        self._values: Dict[Tuple[str, ...], List] = dict()
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the enclosed block, which may contain awaits.
+        """
+        start = time.monotonic()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if 'outcome' in self.labelnames and 'outcome' not in labels:
+                labels['outcome'] = outcome_of(error)
+            self.observe(time.monotonic() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        samples = []
+        for key, (bucket_counts, total, count) in sorted(self._values.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                samples.append(
+                    f'{self.name}_bucket{_format_labels({**labels, "le": _format_value(bound)})} {cumulative}',
+                )
+            samples.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+            samples.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Metrics exposed on the local HTTP endpoint.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = dict()
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+metrics_registry = MetricsRegistry()
+
+EVENTS_DETECTED = metrics_registry.register(Counter(
+    'snapshotter_events_detected_total', 'Protocol state events detected for this node.', ['event'],
+))
+EVENT_DETECTION_LAG = metrics_registry.register(Histogram(
+    'snapshotter_event_detection_lag_seconds',
+    'Time from the block timestamp of an event to its detection.',
+    ['event'],
+))
+ANCHOR_REORGS = metrics_registry.register(Counter(
+    'snapshotter_anchor_reorgs_total', 'Anchor chain reorganizations detected between event polls.',
+))
+DUPLICATE_EVENTS = metrics_registry.register(Counter(
+    'snapshotter_duplicate_events_total', 'Events detected again, e.g. after a reorg, and not dispatched twice.', ['event'],
+))
+PRELOADER_DURATION = metrics_registry.register(Histogram(
+    'snapshotter_preloader_duration_seconds', 'Duration of a preloader run for an epoch.', ['preloader', 'outcome'],
+))
+STAGE_DURATION = metrics_registry.register(Histogram(
+    'snapshotter_stage_duration_seconds',
+    'Duration of a stage of snapshot processing and submission.',
+    ['stage', 'project_type', 'outcome'],
+))
+SUBMISSIONS = metrics_registry.register(Counter(
+    'snapshotter_submissions_total', 'Snapshots committed, by outcome.', ['project_type', 'outcome'],
+))
+EPOCH_RELEASE_TO_ACK = metrics_registry.register(Histogram(
+    'snapshotter_epoch_release_to_ack_seconds',
+    'Time from the release of an epoch to the collector acknowledging a submission for it.',
+    ['project_type'],
+))
+
+EVENT_LOOP_LAG = metrics_registry.register(Histogram(
+    'snapshotter_event_loop_lag_seconds',
+    'Delay of the event loop in running a scheduled callback, sampled periodically.',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+))
+EVENT_LOOP_STALLS = metrics_registry.register(Counter(
+    'snapshotter_event_loop_stalls_total', 'Times a single callback blocked the event loop beyond the stall threshold.',
+))
+
+
+# called with (stage, seconds) for every stage timed with stage_timer or observe_stage
+_stage_observers: List[Callable[[str, float], None]] = []
+
+
+def add_stage_observer(observer: Callable[[str, float], None]):
+    """
+    Get notified of every stage duration recorded in snapshotter_stage_duration_seconds.
+    """
+    _stage_observers.append(observer)
+
+
+def observe_stage(stage: str, project_type: str, seconds: float, error: Optional[BaseException] = None):
+    """
+    Record the duration of a pipeline stage that finished with the given error, or succeeded if None.
+    """
+    STAGE_DURATION.observe(seconds, stage=stage, project_type=project_type, outcome=outcome_of(error))
+    for observer in _stage_observers:
+        observer(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str, project_type: str):
+    """
+    Time the enclosed block, which may contain awaits, as a pipeline stage.
+    """
+    start = time.monotonic()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        observe_stage(stage, project_type, time.monotonic() - start, error)
+
+
+def project_type_of(project_id: str) -> str:
+    """
+    Project type a project ID was generated for, its first component.
+    """
+    return project_id.split(':', 1)[0]
+
+
+async def timed(coro, histogram: Histogram, **labels):
+    """
+    Await a coroutine, observing its duration, e.g. to time the tasks of an asyncio.gather.
+    """
+    with histogram.time(**labels):
+        return await coro
+
+
+async def _metrics_endpoint(query: Dict[str, str]):
+    return 200, 'text/plain; version=0.0.4; charset=utf-8', metrics_registry.render().encode('utf-8')
+
+
+local_http_server.add_route('/metrics', _metrics_endpoint)
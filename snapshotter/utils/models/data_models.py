@@ -24,6 +24,7 @@ class SnapshotterReportState(Enum):
 
 
 class SnapshotterStates(Enum):
+    EPOCH_RELEASED = 'EPOCH_RELEASED'
     PRELOAD = 'PRELOAD'
     SNAPSHOT_BUILD = 'SNAPSHOT_BUILD'
     SNAPSHOT_FINALIZE = 'SNAPSHOT_FINALIZE'
@@ -79,6 +80,8 @@ class EpochReleasedEvent(EventBase):
     epochId: int
     begin: int
     end: int
+    # market that released the epoch, None for simulation epochs which every market processes
+    dataMarket: Optional[str] = None
 
 
 class SnapshotFinalizedEvent(EventBase):
@@ -95,6 +98,7 @@ class SnapshottersUpdatedEvent(EventBase):
 
 class DayStartedEvent(EventBase):
     dayId: int
+    dataMarket: Optional[str] = None
 
 
 class DailyTaskCompletedEvent(EventBase):
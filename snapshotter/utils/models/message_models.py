@@ -47,6 +47,8 @@ class EpochBase(BaseModel):
 
 class SnapshotProcessMessage(EpochBase):
     genesis: Optional[bool] = False
+    # slot the snapshot is computed for
+    slotId: Optional[int] = None
 
 
 class SnapshotFinalizedMessage(BaseModel):
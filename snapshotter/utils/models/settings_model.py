@@ -1,3 +1,4 @@
+from typing import Dict
 from typing import List
 from typing import Optional
 
@@ -38,11 +39,21 @@ class ReportingConfig(BaseModel):
     failure_report_frequency: int
     notification_cooldown: int
     telegram_message_thread_id: Optional[str] = ""
+    # issues reported within the cooldown are aggregated into one message listing up to this many of them
+    max_aggregated_issues: int = 20
+    # seconds a notification may take to be delivered before it is given up on
+    notification_timeout: float = 10
 
 
 class Logs(BaseModel):
     trace_enabled: bool
     write_to_files: bool
+    # fraction of DEBUG and INFO records kept, per bound logger module, e.g. {"EventDetector": 0.1}
+    sampling: Dict[str, float] = {}
+    # DEBUG and INFO records written per second, per bound logger module
+    rate_limits: Dict[str, int] = {}
+    # records waiting to be written, beyond which records below ERROR are dropped
+    queue_size: int = 100000
 
 
 class EventContract(BaseModel):
@@ -62,6 +73,167 @@ class ExternalAPIAuth(BaseModel):
     apiSecret: str = ''
 
 
+class MulticallConfig(BaseModel):
+    enabled: bool = True
+    # canonical Multicall3 deployment address, identical across most EVM chains
+    address: str = '0xcA11bde05977b3631167028862bE2a173976CA11'
+    # window in milliseconds for pending calls to accumulate before a batch is flushed
+    batch_window_ms: int = 10
+    max_calls_per_batch: int = 100
+    # consecutive batches failing as aggregate3 but succeeding as individual calls before aggregation is disabled
+    disable_after_failures: int = 3
+    # seconds after which aggregation is tried again once disabled
+    reprobe_interval: int = 300
+
+
+class OutboxConfig(BaseModel):
+    enabled: bool = True
+    journal_path: str = 'submission_outbox.jsonl'
+    # group commit window: records appended within it share a single fsync
+    fsync_interval_ms: int = 20
+    # the journal is compacted down to its unacknowledged entries once this many acknowledgements were appended
+    compact_after_acks: int = 1000
+    # ... or once this many bytes were appended, which also bounds the journal while no acknowledgements arrive
+    compact_after_bytes: int = 8 * 1024 * 1024
+
+
+class ShutdownConfig(BaseModel):
+    # seconds in-flight epochs are allowed to finish after SIGTERM before remaining work is cancelled
+    drain_timeout: int = 8
+
+
+class SlotSelectionConfig(BaseModel):
+    # number of most recent epochs whose selection decision is kept in memory
+    history_size: int = 256
+    mirror_to_file: bool = True
+    status_file: str = 'slot_selection_status.txt'
+
+
+class LivenessConfig(BaseModel):
+    # minimum seconds between flushes of liveness marker files to disk
+    flush_interval: int = 5
+
+
+class LocalAPIConfig(BaseModel):
+    # local HTTP endpoints for liveness, metrics and diagnostics
+    enabled: bool = True
+    host: str = '127.0.0.1'
+    port: int = 8090
+
+
+class SubmissionRetryConfig(BaseModel):
+    # attempt caps; attempts also stop once the epoch's remaining deadline budget is spent
+    ipfs_attempts: int = 5
+    collector_attempts: int = 3
+    max_backoff: int = 10
+    # initial estimate of anchor chain seconds per block, refined from observed heads
+    anchor_block_time: float = 2.0
+
+
+class CircuitBreakerConfig(BaseModel):
+    enabled: bool = True
+    # consecutive dependency failures after which calls are short-circuited
+    failure_threshold: int = 5
+    # seconds a tripped circuit waits before letting a probe call through
+    reset_timeout: int = 5
+
+
+class ReadinessConfig(BaseModel):
+    # seconds startup waits for the collector, IPFS and RPC nodes before running the initial check anyway
+    timeout: int = 60
+    # exponential polling bounds in seconds between probes of a dependency that is not ready
+    initial_interval: float = 0.25
+    max_interval: float = 5
+    probe_timeout: float = 3
+
+
+class StartupProfileConfig(BaseModel):
+    # JSON startup timeline written after every start, empty to only log it
+    report_path: str = 'startup_profile.json'
+
+
+class ConfigReloadConfig(BaseModel):
+    # reload the projects and preloaders configs and changed compute modules at epoch boundaries
+    enabled: bool = False
+
+
+class ComputeProcessPoolConfig(BaseModel):
+    # processes running compute of processors marked cpu_bound, started on first use
+    workers: int = 2
+
+
+class SlotConfig(BaseModel):
+    slot_id: int
+    signer_private_key: str
+    # snapshotter address the slot is registered to
+    instance_id: str
+
+
+class MarketConfig(BaseModel):
+    data_market: str
+    # projects and preloaders of the market; default to projects_config_path and preloaders_config_path
+    projects_config_path: Optional[str] = None
+    preloaders_config_path: Optional[str] = None
+
+
+class EpochTimelineConfig(BaseModel):
+    enabled: bool = True
+    # number of most recent epochs whose state transitions are kept in memory
+    max_epochs: int = 256
+    # JSON lines file updated epochs are appended to; empty to keep the timeline in memory only
+    export_path: str = 'epoch_timeline.jsonl'
+    export_interval: int = 30
+    # the export file is rotated to <export_path>.1 once it grows beyond this size
+    max_export_bytes: int = 50 * 1024 * 1024
+
+
+class SubmissionHistoryConfig(BaseModel):
+    enabled: bool = True
+    # SQLite database of every epoch's selection, submissions and stage timings, shared by every market and worker
+    db_path: str = 'submission_history.db'
+    # window in milliseconds rows accumulate in memory before they are written in one transaction
+    flush_interval_ms: int = 500
+    # rows older than this are pruned, every prune_interval seconds
+    retention_days: int = 14
+    prune_interval: int = 3600
+
+
+class LoopMonitorConfig(BaseModel):
+    enabled: bool = True
+    # seconds between event loop lag samples
+    sample_interval: float = 0.25
+    # seconds the event loop may be blocked by a single callback before the blocking stack is logged
+    stall_threshold: float = 0.5
+
+
+class ProfilingConfig(BaseModel):
+    # on-demand profiling started by SIGUSR1 or the local /profile endpoint
+    enabled: bool = True
+    # directory the task snapshot and the profile are written to
+    output_dir: str = 'logs'
+    # 'sampling' writes collapsed stacks of the event loop thread, 'deterministic' a cProfile pstats file
+    default_mode: str = 'sampling'
+    default_duration: int = 30
+    max_duration: int = 600
+    sampling_interval_ms: int = 5
+
+
+class ReorgConfig(BaseModel):
+    # hashes of the most recently processed anchor chain blocks, the deepest reorg that is re-scanned
+    tracked_blocks: int = 64
+    # released epochs and started days remembered to never dispatch the same one twice
+    dispatched_events: int = 4096
+
+
+class WorkerProcessesConfig(BaseModel):
+    # run the distributor and snapshot worker in separate processes fed by the event detector
+    enabled: bool = False
+    count: int = 2
+    socket_path: str = 'snapshotter_events.sock'
+    # seconds a worker has to acknowledge an event before it is sent to another worker
+    ack_timeout: float = 5
+
+
 class Settings(BaseModel):
     namespace: str
     core_api: CoreAPI
@@ -81,12 +253,36 @@ class Settings(BaseModel):
     powerloom_chain_rpc: RPCConfigBase
     node_version: str
     only_simulate_submissions: bool = False
+    multicall: MulticallConfig = MulticallConfig()
+    outbox: OutboxConfig = OutboxConfig()
+    shutdown: ShutdownConfig = ShutdownConfig()
+    slot_selection: SlotSelectionConfig = SlotSelectionConfig()
+    liveness: LivenessConfig = LivenessConfig()
+    local_api: LocalAPIConfig = LocalAPIConfig()
+    submission_retry: SubmissionRetryConfig = SubmissionRetryConfig()
+    circuit_breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    readiness: ReadinessConfig = ReadinessConfig()
+    startup_profile: StartupProfileConfig = StartupProfileConfig()
+    config_reload: ConfigReloadConfig = ConfigReloadConfig()
+    compute_process_pool: ComputeProcessPoolConfig = ComputeProcessPoolConfig()
+    worker_processes: WorkerProcessesConfig = WorkerProcessesConfig()
+    # slots served by this node; empty to serve only slot_id with signer_private_key
+    slots: List[SlotConfig] = []
+    # data markets served by this node; empty to serve only data_market
+    markets: List[MarketConfig] = []
+    epoch_timeline: EpochTimelineConfig = EpochTimelineConfig()
+    submission_history: SubmissionHistoryConfig = SubmissionHistoryConfig()
+    loop_monitor: LoopMonitorConfig = LoopMonitorConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    reorg: ReorgConfig = ReorgConfig()
 
 
 # Projects related models
 class ProcessorConfig(BaseModel):
     module: str
     class_name: str
+    # run compute in the compute process pool instead of on the event loop
+    cpu_bound: bool = False
 
 
 class ProjectConfig(BaseModel):
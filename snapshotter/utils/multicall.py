@@ -0,0 +1,312 @@
+"""
+Aggregation layer for read-only calls against anchor chain contracts.
+
+Calls submitted through :func:`aggregated_web3_call` from any coroutine are queued for a short
+window and then packed into Multicall3 ``aggregate3`` calls, so that a burst of protocol state
+reads costs a handful of RPC round trips instead of one per read. On chains where Multicall3 is
+not deployed the layer transparently falls back to individual ``web3_call`` requests, and tries
+aggregating again every ``settings.multicall.reprobe_interval`` seconds.
+"""
+
+import asyncio
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+from rpc_helper.rpc import RpcHelper
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.exceptions import RPCException
+
+multicall_logger = logger.bind(module='MulticallAggregator')
+
+MULTICALL3_ABI = [
+    {
+        'inputs': [
+            {
+                'components': [
+                    {'internalType': 'address', 'name': 'target', 'type': 'address'},
+                    {'internalType': 'bool', 'name': 'allowFailure', 'type': 'bool'},
+                    {'internalType': 'bytes', 'name': 'callData', 'type': 'bytes'},
+                ],
+                'internalType': 'struct Multicall3.Call3[]',
+                'name': 'calls',
+                'type': 'tuple[]',
+            },
+        ],
+        'name': 'aggregate3',
+        'outputs': [
+            {
+                'components': [
+                    {'internalType': 'bool', 'name': 'success', 'type': 'bool'},
+                    {'internalType': 'bytes', 'name': 'returnData', 'type': 'bytes'},
+                ],
+                'internalType': 'struct Multicall3.Result[]',
+                'name': 'returnData',
+                'type': 'tuple[]',
+            },
+        ],
+        'stateMutability': 'payable',
+        'type': 'function',
+    },
+]
+
+
+class _PendingCall:
+    __slots__ = ('contract_addr', 'abi', 'fn_name', 'args', 'call_data', 'output_types', 'future')
+
+    def __init__(self, contract_addr, abi, fn_name, args, call_data, output_types, future):
+        self.contract_addr = contract_addr
+        self.abi = abi
+        self.fn_name = fn_name
+        self.args = args
+        self.call_data = call_data
+        self.output_types = output_types
+        self.future = future
+
+
+class MulticallAggregator:
+    """
+    Coalesces contract reads issued against a single RpcHelper into Multicall3 batches.
+
+    The interface mirrors ``RpcHelper.web3_call`` so call sites only need to swap the callee.
+    Support for Multicall3 on the target chain is detected lazily: after ``disable_after_failures``
+    consecutive batches fail as a multicall but succeed as individual calls, aggregation is disabled
+    for ``reprobe_interval`` seconds, after which the next batch probes it again.
+    """
+
+    def __init__(
+        self,
+        rpc_helper: RpcHelper,
+        multicall_address: Optional[str] = None,
+        batch_window_ms: Optional[int] = None,
+        max_calls_per_batch: Optional[int] = None,
+        disable_after_failures: Optional[int] = None,
+        reprobe_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the aggregator.
+
+        Args:
+            rpc_helper (RpcHelper): RPC helper used to send the aggregated and fallback calls
+            multicall_address (str, optional): Multicall3 address. Defaults to settings.multicall.address
+            batch_window_ms (int, optional): Window for pending calls to accumulate before a flush
+            max_calls_per_batch (int, optional): Maximum number of calls packed into one aggregate3 call
+            disable_after_failures (int, optional): Consecutive unsupported batches before aggregation is disabled.
+                Defaults to settings.multicall.disable_after_failures
+            reprobe_interval (float, optional): Seconds aggregation stays disabled for.
+                Defaults to settings.multicall.reprobe_interval
+        """
+        self._rpc_helper = rpc_helper
+        self._multicall_address = Web3.to_checksum_address(
+            multicall_address or settings.multicall.address,
+        )
+        self._batch_window = (
+            batch_window_ms if batch_window_ms is not None else settings.multicall.batch_window_ms
+        ) / 1000
+        self._max_calls_per_batch = max_calls_per_batch or settings.multicall.max_calls_per_batch
+        self._disable_after_failures = disable_after_failures or settings.multicall.disable_after_failures
+        self._reprobe_interval = (
+            reprobe_interval if reprobe_interval is not None else settings.multicall.reprobe_interval
+        )
+        # consecutive batches that failed as aggregate3 while the same calls succeeded individually
+        self._unsupported_batches = 0
+        # monotonic time until which calls are sent individually
+        self._disabled_until = 0.0
+        self._pending: List[_PendingCall] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._w3 = Web3()
+        self._contracts = dict()
+        self._output_types: Dict[Tuple[str, str], List[str]] = dict()
+
+    @property
+    def aggregating(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _get_contract(self, contract_addr: str, abi):
+        contract = self._contracts.get(contract_addr)
+        if contract is None:
+            contract = self._w3.eth.contract(address=Web3.to_checksum_address(contract_addr), abi=abi)
+            self._contracts[contract_addr] = contract
+        return contract
+
+    def _get_output_types(self, contract, contract_addr: str, fn_name: str) -> List[str]:
+        key = (contract_addr, fn_name)
+        output_types = self._output_types.get(key)
+        if output_types is None:
+            output_types = get_abi_output_types(contract.get_function_by_name(fn_name).abi)
+            self._output_types[key] = output_types
+        return output_types
+
+    async def web3_call(self, tasks: List[Tuple[str, List[Any]]], contract_addr: str, abi) -> List[Any]:
+        """
+        Queue contract function calls for aggregation and wait for their results.
+
+        Args:
+            tasks (List[Tuple[str, List[Any]]]): (function name, arguments) pairs
+            contract_addr (str): Address of the contract to call
+            abi: ABI of the contract
+
+        Returns:
+            List[Any]: Decoded results in the same order as ``tasks``
+        """
+        if not settings.multicall.enabled or not self.aggregating:
+            return await self._rpc_helper.web3_call(tasks, contract_addr=contract_addr, abi=abi)
+
+        loop = asyncio.get_running_loop()
+        contract = self._get_contract(contract_addr, abi)
+        # encode everything up front so that a bad argument fails the caller before anything is queued
+        calls = [
+            _PendingCall(
+                contract_addr=contract.address,
+                abi=abi,
+                fn_name=fn_name,
+                args=args,
+                call_data=contract.encodeABI(fn_name=fn_name, args=args),
+                output_types=self._get_output_types(contract, contract_addr, fn_name),
+                future=loop.create_future(),
+            )
+            for fn_name, args in tasks
+        ]
+        self._pending.extend(calls)
+        futures = [call.future for call in calls]
+
+        if len(self._pending) >= self._max_calls_per_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._flush)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self):
+        """
+        Hand every pending call to batch executors, chunked by the maximum batch size.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for i in range(0, len(pending), self._max_calls_per_batch):
+            task = asyncio.ensure_future(self._execute_batch(pending[i:i + self._max_calls_per_batch]))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task):
+        self._batch_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            multicall_logger.opt(exception=task.exception()).error(
+                'Unexpected error executing a batch of calls: {}', task.exception(),
+            )
+
+    def _decode(self, call: _PendingCall, return_data: bytes):
+        decoded = self._w3.codec.decode(call.output_types, return_data)
+        normalized = map_abi_data(BASE_RETURN_NORMALIZERS, call.output_types, decoded)
+        # same shape as a regular contract call: single outputs are unwrapped
+        if len(normalized) == 1:
+            return normalized[0]
+        return list(normalized)
+
+    async def _execute_batch(self, batch: List[_PendingCall]):
+        if len(batch) == 1 or not self.aggregating:
+            await self._execute_individually(batch)
+            return
+
+        try:
+            [results] = await self._rpc_helper.web3_call(
+                [('aggregate3', [[(call.contract_addr, True, call.call_data) for call in batch]])],
+                contract_addr=self._multicall_address,
+                abi=MULTICALL3_ABI,
+            )
+        except Exception as e:
+            multicall_logger.warning(
+                'Multicall3 aggregate3 call with {} sub-calls failed, retrying them individually. Error: {}',
+                len(batch), e,
+            )
+            await self._execute_individually(batch, detect_support=True)
+            return
+
+        self._unsupported_batches = 0
+        for call, (success, return_data) in zip(batch, results):
+            if call.future.done():
+                continue
+            if not success:
+                call.future.set_exception(
+                    RPCException(
+                        request={'function': call.fn_name, 'args': call.args, 'contract': call.contract_addr},
+                        response=return_data.hex(),
+                        underlying_exception=None,
+                        extra_info='Multicall3 sub-call reverted',
+                    ),
+                )
+                continue
+            try:
+                call.future.set_result(self._decode(call, return_data))
+            except Exception as e:
+                call.future.set_exception(e)
+
+    async def _execute_individually(self, batch: List[_PendingCall], detect_support: bool = False):
+        results = await asyncio.gather(
+            *[
+                self._rpc_helper.web3_call(
+                    [(call.fn_name, call.args)],
+                    contract_addr=call.contract_addr,
+                    abi=call.abi,
+                )
+                for call in batch
+            ],
+            return_exceptions=True,
+        )
+        any_succeeded = False
+        for call, result in zip(batch, results):
+            if call.future.done():
+                continue
+            if isinstance(result, BaseException):
+                call.future.set_exception(result)
+            else:
+                any_succeeded = True
+                call.future.set_result(result[0])
+
+        # the node is healthy but aggregate3 is not: Multicall3 is likely not deployed on this chain
+        if detect_support and any_succeeded:
+            self._unsupported_batches += 1
+            if self._unsupported_batches >= self._disable_after_failures and self.aggregating:
+                multicall_logger.info(
+                    'Multicall3 unavailable at {} for {} consecutive batches, falling back to individual '
+                    'contract calls for {}s',
+                    self._multicall_address, self._unsupported_batches, self._reprobe_interval,
+                )
+                self._disabled_until = time.monotonic() + self._reprobe_interval
+
+
+_aggregators: Dict[RpcHelper, MulticallAggregator] = dict()
+
+
+def get_multicall_aggregator(rpc_helper: RpcHelper) -> MulticallAggregator:
+    """
+    Return the aggregator bound to the given RpcHelper, creating it on first use.
+
+    Sharing one aggregator per RpcHelper lets reads issued from unrelated coroutines
+    land in the same batch.
+    """
+    aggregator = _aggregators.get(rpc_helper)
+    if aggregator is None:
+        aggregator = MulticallAggregator(rpc_helper)
+        _aggregators[rpc_helper] = aggregator
+    return aggregator
+
+
+async def aggregated_web3_call(rpc_helper: RpcHelper, tasks, contract_addr, abi):
+    """
+    Drop-in replacement for ``rpc_helper.web3_call`` that routes calls through the shared aggregator.
+    """
+    return await get_multicall_aggregator(rpc_helper).web3_call(tasks, contract_addr=contract_addr, abi=abi)
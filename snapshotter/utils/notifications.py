@@ -0,0 +1,229 @@
+"""
+Non-blocking delivery of Telegram issue reports.
+
+Components hand reports to :meth:`TelegramNotifier.notify`, which only updates an in-memory buffer
+and never waits on the network. A background task owns the HTTP client and posts reports one at a
+time, each bounded by ``settings.reporting.notification_timeout``, so a slow reporting service can
+neither stall the event loop nor pile up requests.
+
+Reports are grouped by endpoint, slot and issue type. The first report of a group is sent right
+away; reports arriving within ``settings.reporting.notification_cooldown`` seconds of the last one
+sent are deduplicated and aggregated into one message listing them (up to
+``settings.reporting.max_aggregated_issues``), sent once the cooldown has passed.
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urljoin
+
+from httpx import AsyncClient
+from httpx import Timeout
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.callback_helpers import telegram_endpoint
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.models.data_models import SnapshotterIssue
+from snapshotter.utils.models.message_models import TelegramMessage
+
+notifier_logger = logger.bind(module='TelegramNotifier')
+
+
+def _issue_details(issue: SnapshotterIssue) -> str:
+    try:
+        extra = json.loads(issue.extra or '{}')
+    except json.JSONDecodeError:
+        return issue.extra
+    return extra.get('issueDetails', issue.extra) if isinstance(extra, dict) else issue.extra
+
+
+class _PendingReport:
+    """
+    Reports of one group waiting for the cooldown to pass.
+    """
+
+    def __init__(self):
+        # the most recent message, whose status and metadata the aggregate is sent with
+        self.message: Optional[TelegramMessage] = None
+        self.issues: List[SnapshotterIssue] = []
+        self.seen = set()
+        self.omitted = 0
+
+    def add(self, message: TelegramMessage, max_issues: int):
+        self.message = message
+        issue = message.issue
+        identity = (issue.projectID, issue.epochId, issue.extra)
+        if identity in self.seen:
+            return
+        self.seen.add(identity)
+        if len(self.issues) < max_issues:
+            self.issues.append(issue)
+        else:
+            self.omitted += 1
+
+    def aggregate(self) -> TelegramMessage:
+        """
+        The single pending message, or the most recent one listing every pending issue.
+        """
+        if len(self.issues) == 1 and not self.omitted:
+            return self.message.copy(update={'issue': self.issues[0]})
+        latest = self.message.issue
+        count = len(self.issues) + self.omitted
+        issue = latest.copy(
+            update={
+                'projectID': latest.projectID if all(i.projectID == latest.projectID for i in self.issues) else '',
+                'epochId': ', '.join(dict.fromkeys(i.epochId for i in self.issues if i.epochId)),
+                'extra': json.dumps({
+                    'issueDetails': f'{count} {latest.issueType} issues since the last report',
+                    'issues': [
+                        {'epochId': i.epochId, 'projectID': i.projectID, 'issueDetails': _issue_details(i)}
+                        for i in self.issues
+                    ],
+                    'omitted': self.omitted,
+                }),
+            },
+        )
+        return self.message.copy(update={'issue': issue})
+
+
+class TelegramNotifier:
+    """
+    Buffers issue reports and delivers them in the background, aggregated per cooldown window.
+    """
+
+    def __init__(
+        self,
+        cooldown: Optional[float] = None,
+        max_issues: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the notifier. The HTTP client and the sender task are started with the first report.
+
+        Args:
+            cooldown (float, optional): Minimum seconds between messages of a group.
+                Defaults to settings.reporting.notification_cooldown
+            max_issues (int, optional): Issues listed in an aggregated message. Defaults to settings.reporting.max_aggregated_issues
+            timeout (float, optional): Seconds a message may take to be delivered. Defaults to settings.reporting.notification_timeout
+        """
+        self._cooldown = cooldown if cooldown is not None else settings.reporting.notification_cooldown
+        self._max_issues = max_issues or settings.reporting.max_aggregated_issues
+        self._timeout = timeout or settings.reporting.notification_timeout
+        # keyed by (endpoint, slot ID, issue type)
+        self._pending: Dict[Tuple[str, int, str], _PendingReport] = dict()
+        self._last_sent: Dict[Tuple[str, int, str], float] = dict()
+        self._client: Optional[AsyncClient] = None
+        self._sender_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.reporting.telegram_url and settings.reporting.telegram_chat_id)
+
+    def notify(self, message: TelegramMessage):
+        """
+        Queue a report for delivery. Returns immediately.
+        """
+        if not self.enabled:
+            return
+        endpoint = telegram_endpoint(message)
+        if endpoint is None:
+            return
+        key = (endpoint, message.slotId, message.issue.issueType)
+        self._pending.setdefault(key, _PendingReport()).add(message, self._max_issues)
+        self._ensure_sender()
+
+    def _ensure_sender(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # no running event loop, the report is sent once the sender starts or on flush
+            return
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._sender_task is None or self._sender_task.done():
+            self._sender_task = asyncio.ensure_future(self._send_loop())
+
+    def _get_client(self) -> AsyncClient:
+        if self._client is None:
+            self._client = AsyncClient(
+                base_url=settings.reporting.telegram_url,
+                timeout=Timeout(timeout=self._timeout),
+                follow_redirects=False,
+            )
+        return self._client
+
+    async def _post(self, endpoint: str, message: TelegramMessage):
+        try:
+            response = await asyncio.wait_for(
+                self._get_client().post(
+                    url=urljoin(settings.reporting.telegram_url, endpoint),
+                    json=message.dict(),
+                ),
+                timeout=self._timeout,
+            )
+        except Exception as e:
+            notifier_logger.opt(exception=settings.logs.trace_enabled).error(
+                'Unable to send {} notification for slot {}: {}', message.issue.issueType, message.slotId, e,
+            )
+        else:
+            notifier_logger.debug('Notification result: {}', response)
+
+    async def _send_due(self, force: bool = False) -> Optional[float]:
+        """
+        Send the groups whose cooldown has passed, or every group if forced.
+
+        Returns:
+            float: Seconds until the next pending group is due, None if nothing is pending
+        """
+        now = time.monotonic()
+        for key in list(self._pending):
+            if force or now >= self._last_sent.get(key, float('-inf')) + self._cooldown:
+                # a concurrent flush may have sent the group already
+                pending = self._pending.pop(key, None)
+                if pending is None:
+                    continue
+                self._last_sent[key] = now
+                await self._post(key[0], pending.aggregate())
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        return max(min(self._last_sent.get(key, float('-inf')) + self._cooldown for key in self._pending) - now, 0)
+
+    async def _send_loop(self):
+        while True:
+            self._wakeup.clear()
+            next_due = await self._send_due()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_due)
+            except asyncio.TimeoutError:
+                pass
+
+    async def flush(self):
+        """
+        Send every pending report now, regardless of the cooldown, e.g. before the process exits.
+        """
+        if self.enabled:
+            await self._send_due(force=True)
+
+    async def close(self):
+        """
+        Send pending reports and stop the sender.
+        """
+        if self._sender_task is not None:
+            self._sender_task.cancel()
+            self._sender_task = None
+        if self.enabled:
+            await self._send_due(force=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# delivers the reports of every component of the process it is used in
+telegram_notifier = TelegramNotifier()
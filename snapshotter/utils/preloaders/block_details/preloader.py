@@ -1,10 +1,14 @@
+from typing import TYPE_CHECKING
+
 from snapshotter.utils.callback_helpers import GenericPreloader
 from snapshotter.utils.default_logger import logger
 from snapshotter.utils.models.data_models import PreloaderResult
 from snapshotter.utils.models.message_models import EpochBase
-from rpc_helper.rpc import RpcHelper
 from snapshotter.utils.snapshot_utils import get_block_details_in_block_range
 
+if TYPE_CHECKING:
+    from rpc_helper.rpc import RpcHelper
+
 
 class BlockDetailsPreloader(GenericPreloader):
     """
@@ -23,7 +27,7 @@ class BlockDetailsPreloader(GenericPreloader):
     async def compute(
             self,
             epoch: EpochBase,
-            rpc_helper: RpcHelper,
+            rpc_helper: 'RpcHelper',
     ) -> PreloaderResult:
         """
         Compute and store block details for the given epoch range.
@@ -0,0 +1,229 @@
+"""
+On-demand profiling of a running node.
+
+A profiling session is started by sending ``SIGUSR1`` to a snapshotter process, or with
+``GET /profile?action=start&seconds=<n>&mode=<mode>`` on its local HTTP endpoint, and stops after the
+requested duration, on a second ``SIGUSR1`` or with ``action=stop``. When a session starts, the stacks
+of every asyncio task are written to ``tasks_<process>_<pid>_<time>.txt``. When it stops, the profile
+of the event loop thread is written next to it, in ``settings.profiling.output_dir``:
+
+- ``sampling`` mode: a thread samples the stack of the event loop thread every
+  ``settings.profiling.sampling_interval_ms`` and writes ``.collapsed`` stacks, one ``frame;frame count``
+  line per distinct stack, ready for flame graph tools. Overhead is low enough for production.
+- ``deterministic`` mode: cProfile traces every call on the event loop thread and writes a ``.pstats``
+  file, to be read with :mod:`pstats` or snakeviz. Expect the node to slow down while it runs.
+"""
+
+import asyncio
+import cProfile
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from signal import SIGUSR1
+from typing import Dict
+from typing import Optional
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.local_http_server import json_response
+from snapshotter.utils.local_http_server import local_http_server
+
+profiling_logger = logger.bind(module='OnDemandProfiler')
+
+SAMPLING = 'sampling'
+DETERMINISTIC = 'deterministic'
+MODES = (SAMPLING, DETERMINISTIC)
+
+
+def _task_snapshot() -> str:
+    """
+    Stacks of every asyncio task of the running loop.
+    """
+    tasks = sorted(asyncio.all_tasks(), key=lambda task: task.get_name())
+    buffer = io.StringIO()
+    buffer.write(f'{len(tasks)} tasks at {time.strftime("%Y-%m-%d %H:%M:%S")}\n\n')
+    for task in tasks:
+        task.print_stack(file=buffer)
+        buffer.write('\n')
+    return buffer.getvalue()
+
+
+def _write(path: str, content: str):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+class OnDemandProfiler:
+    """
+    Profiles the event loop thread of the process for a limited time.
+    """
+
+    def __init__(self):
+        # mode, duration, start time and output paths of the running session
+        self._session: Optional[Dict] = None
+        self._stop_handle: Optional[asyncio.TimerHandle] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._sampling_stopped = threading.Event()
+        self._samples: Counter = Counter()
+
+    @property
+    def running(self) -> bool:
+        return self._session is not None
+
+    def status(self) -> Dict:
+        if self._session is None:
+            return {'running': False}
+        return {'running': True, **self._session}
+
+    def start(self, duration: Optional[float] = None, mode: Optional[str] = None) -> Dict:
+        """
+        Start a profiling session on the running event loop, unless one is running already.
+
+        Args:
+            duration (float, optional): Seconds to profile for, capped at settings.profiling.max_duration.
+                Defaults to settings.profiling.default_duration
+            mode (str, optional): 'sampling' or 'deterministic'. Defaults to settings.profiling.default_mode
+
+        Returns:
+            dict: Status of the session
+
+        Raises:
+            ValueError: If the mode is not supported
+        """
+        mode = mode or settings.profiling.default_mode
+        if mode not in MODES:
+            raise ValueError(f'Unknown profiling mode {mode}, expected one of {MODES}')
+        if self.running:
+            return self.status()
+        duration = min(max(duration or settings.profiling.default_duration, 1), settings.profiling.max_duration)
+
+        os.makedirs(settings.profiling.output_dir, exist_ok=True)
+        label = f'{multiprocessing.current_process().name}_{os.getpid()}_{time.strftime("%Y%m%d-%H%M%S")}'
+        tasks_path = os.path.join(settings.profiling.output_dir, f'tasks_{label}.txt')
+        _write(tasks_path, _task_snapshot())
+        profile_path = os.path.join(
+            settings.profiling.output_dir, f'profile_{label}.{"collapsed" if mode == SAMPLING else "pstats"}',
+        )
+
+        if mode == SAMPLING:
+            self._samples = Counter()
+            self._sampling_stopped.clear()
+            self._sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(), settings.profiling.sampling_interval_ms / 1000),
+                name='profiler-sampler',
+                daemon=True,
+            )
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+        self._session = {
+            'mode': mode,
+            'duration': duration,
+            'started_at': time.time(),
+            'tasks_path': tasks_path,
+            'profile_path': profile_path,
+        }
+        self._stop_handle = asyncio.get_running_loop().call_later(duration, lambda: asyncio.ensure_future(self.stop()))
+        profiling_logger.info(
+            'Profiling the event loop in {} mode for {}s, task snapshot written to {}', mode, duration, tasks_path,
+        )
+        return self.status()
+
+    def _sample(self, thread_id: int, interval: float):
+        while not self._sampling_stopped.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self._samples[';'.join(reversed(stack))] += 1
+
+    async def stop(self) -> Optional[Dict]:
+        """
+        Stop the running session and write its profile.
+
+        Returns:
+            dict: The session that was stopped, None if none was running
+        """
+        if self._session is None:
+            return None
+        session, self._session = self._session, None
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+
+        loop = asyncio.get_running_loop()
+        try:
+            if session['mode'] == SAMPLING:
+                self._sampling_stopped.set()
+                await loop.run_in_executor(None, self._sampler.join)
+                self._sampler = None
+                collapsed = ''.join(f'{stack} {count}\n' for stack, count in self._samples.most_common())
+                await loop.run_in_executor(None, _write, session['profile_path'], collapsed)
+            else:
+                self._profile.disable()
+                await loop.run_in_executor(None, self._profile.dump_stats, session['profile_path'])
+                self._profile = None
+        except Exception as e:
+            profiling_logger.error('Unable to write profile to {}: {}', session['profile_path'], e)
+        else:
+            profiling_logger.info('Profile of the event loop written to {}', session['profile_path'])
+        return session
+
+    def toggle(self):
+        """
+        Start a session with the default settings, or stop the running one. Installed as the SIGUSR1 handler.
+        """
+        if self.running:
+            asyncio.ensure_future(self.stop())
+        else:
+            try:
+                self.start()
+            except Exception as e:
+                profiling_logger.error('Unable to start profiling: {}', e)
+
+
+# profiles the process it is used in
+on_demand_profiler = OnDemandProfiler()
+
+
+def install_profiling_signal_handler(loop: asyncio.AbstractEventLoop):
+    """
+    Toggle profiling of the process on SIGUSR1.
+    """
+    if settings.profiling.enabled:
+        loop.add_signal_handler(SIGUSR1, on_demand_profiler.toggle)
+
+
+async def _profile_endpoint(query: Dict[str, str]):
+    """
+    ``action=start`` a session for ``seconds`` in ``mode``, ``action=stop`` the running one, or get its status.
+    """
+    if not settings.profiling.enabled:
+        return json_response({'error': 'profiling is disabled'}, 403)
+    action = query.get('action', 'status')
+    if action == 'start':
+        try:
+            duration = float(query['seconds']) if 'seconds' in query else None
+            return json_response(on_demand_profiler.start(duration, query.get('mode')))
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+    if action == 'stop':
+        session = await on_demand_profiler.stop()
+        return json_response({'running': False, 'stopped': session})
+    if action == 'status':
+        return json_response(on_demand_profiler.status())
+    return json_response({'error': 'action must be one of start, stop and status'}, 400)
+
+
+local_http_server.add_route('/profile', _profile_endpoint)
@@ -0,0 +1,199 @@
+"""
+Startup readiness probes for the snapshotter's dependencies.
+
+Instead of sleeping for a fixed period while the local collector, IPFS and the RPC nodes come up,
+each dependency is probed with a lightweight request and polled with exponential backoff until it
+answers. Startup proceeds as soon as every dependency is ready, a dependency that is down is
+reported on its first failed probe, and the current status is served on the local HTTP endpoint.
+"""
+
+import asyncio
+import time
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+import grpclib
+from grpclib.client import Channel
+from grpclib.const import Status
+from grpclib.health.v1.health_grpc import HealthStub
+from grpclib.health.v1.health_pb2 import HealthCheckRequest
+from grpclib.health.v1.health_pb2 import HealthCheckResponse
+from httpx import AsyncClient
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.local_http_server import json_response
+from snapshotter.utils.local_http_server import local_http_server
+
+readiness_logger = logger.bind(module='Readiness')
+
+COLLECTOR = 'collector'
+IPFS = 'ipfs'
+SOURCE_RPC = 'source_rpc'
+ANCHOR_RPC = 'anchor_rpc'
+
+
+class DependencyNotReady(Exception):
+    pass
+
+
+async def probe_grpc_channel(channel: Channel, timeout: float):
+    """
+    Check that a gRPC server accepts HTTP/2 connections and answers calls.
+
+    Uses the standard grpc.health.v1 Check call. Servers that do not implement the health service
+    answer with an error status (UNIMPLEMENTED, or UNKNOWN from some servers), which equally proves
+    the server is up; only UNAVAILABLE means it cannot take calls.
+
+    Raises:
+        DependencyNotReady: If the server reports NOT_SERVING
+        Exception: If the server cannot be reached
+    """
+    try:
+        response = await HealthStub(channel).Check(HealthCheckRequest(), timeout=timeout)
+    except grpclib.GRPCError as e:
+        if e.status != Status.UNAVAILABLE:
+            return
+        raise
+    if response.status == HealthCheckResponse.NOT_SERVING:
+        raise DependencyNotReady('gRPC health check reports NOT_SERVING')
+
+
+def ipfs_api_url(url: str) -> str:
+    """
+    Convert an IPFS API address given as an HTTP URL or a multiaddr (e.g. /dns/ipfs/tcp/5001) to an HTTP URL.
+    """
+    if not url.startswith('/'):
+        return url.rstrip('/')
+    parts = url.strip('/').split('/')
+    host, port, scheme = None, None, 'http'
+    for protocol, value in zip(parts, parts[1:] + ['']):
+        if protocol in ('ip4', 'dns', 'dns4', 'dns6'):
+            host = value
+        elif protocol == 'ip6':
+            host = f'[{value}]'
+        elif protocol == 'tcp':
+            port = value
+        elif protocol in ('http', 'https'):
+            scheme = protocol
+    if not host or not port:
+        raise ValueError(f'Unsupported IPFS multiaddr {url}')
+    return f'{scheme}://{host}:{port}'
+
+
+async def probe_ipfs_api(url: str, timeout: float, auth: Optional[tuple] = None):
+    """
+    Check that the IPFS HTTP API answers a version request.
+    """
+    async with AsyncClient(base_url=ipfs_api_url(url), timeout=timeout, auth=auth) as client:
+        response = await client.post('/api/v0/version')
+        response.raise_for_status()
+
+
+async def probe_rpc_helper(rpc_helper):
+    """
+    Check that an RPC node answers a block number request.
+    """
+    await rpc_helper.get_current_block_number()
+
+
+class ReadinessState:
+    """
+    Latest probe result of each dependency.
+    """
+
+    def __init__(self):
+        self._status: Dict[str, Dict] = dict()
+        self._ready_events: Dict[str, asyncio.Event] = dict()
+
+    def _event(self, name: str) -> asyncio.Event:
+        if name not in self._ready_events:
+            self._ready_events[name] = asyncio.Event()
+        return self._ready_events[name]
+
+    def set_ready(self, name: str, elapsed: float):
+        self._status[name] = {'ready': True, 'error': None, 'elapsed_seconds': round(elapsed, 3)}
+        self._event(name).set()
+
+    def set_not_ready(self, name: str, error: Exception, elapsed: float):
+        self._status[name] = {'ready': False, 'error': str(error) or type(error).__name__, 'elapsed_seconds': round(elapsed, 3)}
+        self._event(name).clear()
+
+    def is_ready(self, name: str) -> bool:
+        return self._status.get(name, {}).get('ready', False)
+
+    async def wait_ready(self, name: str):
+        await self._event(name).wait()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+readiness_state = ReadinessState()
+
+
+async def _poll_until_ready(name: str, probe: Callable[[], Awaitable], started_at: float):
+    interval = settings.readiness.initial_interval
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            await asyncio.wait_for(probe(), settings.readiness.probe_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            readiness_state.set_not_ready(name, e, time.monotonic() - started_at)
+            if attempt == 1:
+                readiness_logger.warning('{} is not ready yet: {}', name, e or type(e).__name__)
+            else:
+                readiness_logger.debug('{} still not ready after {} probes: {}', name, attempt, e or type(e).__name__)
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, settings.readiness.max_interval)
+        else:
+            elapsed = time.monotonic() - started_at
+            readiness_state.set_ready(name, elapsed)
+            readiness_logger.info('{} is ready after {:.2f}s ({} probes)', name, elapsed, attempt)
+            return
+
+
+async def wait_until_ready(probes: Dict[str, Callable[[], Awaitable]], timeout: Optional[float] = None) -> bool:
+    """
+    Probe all dependencies concurrently until each one is ready or the timeout elapses.
+
+    Args:
+        probes (Dict[str, Callable[[], Awaitable]]): Probe coroutine function of each dependency, raising while it is not ready
+        timeout (float, optional): Seconds to wait overall. Defaults to settings.readiness.timeout
+
+    Returns:
+        bool: Whether every dependency became ready in time
+    """
+    timeout = timeout if timeout is not None else settings.readiness.timeout
+    started_at = time.monotonic()
+    tasks = {
+        name: asyncio.ensure_future(_poll_until_ready(name, probe, started_at))
+        for name, probe in probes.items()
+    }
+    if not tasks:
+        return True
+    _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    not_ready = [name for name, task in tasks.items() if task in pending]
+    if not_ready:
+        readiness_logger.error(
+            'Dependencies not ready after {}s: {}', timeout,
+            {name: readiness_state.snapshot().get(name, {}).get('error') for name in not_ready},
+        )
+        return False
+    return True
+
+
+async def _readiness_endpoint(query: Dict[str, str]):
+    status = readiness_state.snapshot()
+    ready = bool(status) and all(dependency['ready'] for dependency in status.values())
+    return json_response({'ready': ready, 'dependencies': status}, status=200 if ready else 503)
+
+
+local_http_server.add_route('/readiness', _readiness_endpoint)
@@ -0,0 +1,136 @@
+"""
+Reorg handling for the event detector.
+
+The detector polls the anchor chain for protocol state events block range by block range. To notice
+reorganizations between polls, it keeps the hashes of the most recently processed blocks in a
+:class:`BlockHashTracker`. When the first new block does not extend the tracked chain, the detector
+looks up the canonical hashes of the tracked blocks, finds the last one still on the chain, and
+re-scans from the block after it.
+
+Re-scanning makes events be detected again. A reorg can also move an event into another block. A
+:class:`DispatchedEvents` window therefore remembers which released epochs and started days have been
+dispatched already, so each is processed once, whichever block it was detected in.
+"""
+
+from collections import OrderedDict
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+
+from snapshotter.settings.config import settings
+
+
+def block_header(block: Dict) -> Dict:
+    """
+    Number, hash and parent hash of a block returned by eth_getBlockByNumber.
+    """
+    return {
+        'number': int(block['number'], 16),
+        'hash': block['hash'].lower(),
+        'parentHash': block['parentHash'].lower(),
+    }
+
+
+class BlockHashTracker:
+    """
+    Hashes of the most recently processed blocks.
+    """
+
+    def __init__(self, depth: Optional[int] = None):
+        """
+        Initialize the tracker.
+
+        Args:
+            depth (int, optional): Number of blocks tracked, the deepest reorg that can be recovered from.
+                Defaults to settings.reorg.tracked_blocks
+        """
+        self._depth = depth or settings.reorg.tracked_blocks
+        self._hashes: OrderedDict = OrderedDict()
+
+    @property
+    def oldest(self) -> Optional[int]:
+        return next(iter(self._hashes), None)
+
+    def extends(self, header: Dict) -> bool:
+        """
+        Whether a block is the child of the tracked block before it, or that block is not tracked.
+        """
+        parent_hash = self._hashes.get(header['number'] - 1)
+        return parent_hash is None or parent_hash == header['parentHash']
+
+    def record(self, headers: List[Dict]):
+        """
+        Track processed blocks, forgetting the oldest ones beyond the tracker's depth.
+        """
+        for header in headers:
+            self._hashes.pop(header['number'], None)
+            self._hashes[header['number']] = header['hash']
+        while len(self._hashes) > self._depth:
+            self._hashes.popitem(last=False)
+
+    def common_ancestor(self, canonical_hashes: Dict[int, str]) -> Optional[int]:
+        """
+        The most recent tracked block still on the canonical chain.
+
+        Args:
+            canonical_hashes (dict): Canonical hash of each tracked block number
+
+        Returns:
+            int: Its block number, None if the reorg is deeper than the tracked blocks
+        """
+        for number in reversed(self._hashes):
+            if canonical_hashes.get(number) == self._hashes[number]:
+                return number
+        return None
+
+    def rewind(self, number: int):
+        """
+        Forget the blocks after a block, which are no longer on the canonical chain.
+        """
+        while self._hashes and next(reversed(self._hashes)) > number:
+            self._hashes.popitem()
+
+
+class DispatchedEvents:
+    """
+    Window of the most recently dispatched events, keyed by event type, data market and epoch or day ID.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Initialize the window.
+
+        Args:
+            capacity (int, optional): Number of events remembered. Defaults to settings.reorg.dispatched_events
+        """
+        self._capacity = capacity or settings.reorg.dispatched_events
+        self._keys: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def key(event_type: str, event) -> Optional[Hashable]:
+        """
+        Identity of an event, None for events that are not deduplicated.
+        """
+        if event_type == 'EpochReleased':
+            return event_type, event.dataMarket.lower(), event.epochId
+        if event_type == 'DayStartedEvent':
+            return event_type, event.dataMarket.lower(), event.dayId
+        return None
+
+    def first_dispatch(self, event_type: str, event) -> bool:
+        """
+        Record that an event is dispatched.
+
+        Returns:
+            bool: False if the same event has been dispatched before
+        """
+        key = self.key(event_type, event)
+        if key is None:
+            return True
+        if key in self._keys:
+            return False
+        self._keys[key] = None
+        if len(self._keys) > self._capacity:
+            self._keys.popitem(last=False)
+        return True
@@ -0,0 +1,174 @@
+"""
+EIP-712 signing of snapshot submission requests.
+
+The generic ``eip712_structs`` path rebuilds a struct object for every submission and re-hashes the
+domain and type strings inside ``signable_bytes``. :class:`SubmissionSigner` computes the domain
+separator and the request type hash once and only encodes and hashes the dynamic request fields
+per signature, producing signatures byte-identical to the generic path.
+
+The domain separator and type hash are computed directly from their EIP-712 encodings, so
+``eip712_structs`` is only imported when the ``EIPRequest`` struct or the ``domain`` object is used,
+e.g. by tests and tooling comparing against the generic path.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import sha3
+from coincurve import PrivateKey
+
+DOMAIN_NAME = 'PowerloomProtocolContract'
+DOMAIN_VERSION = '0.1'
+DOMAIN_TYPE = 'EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)'
+REQUEST_TYPE = 'EIPRequest(uint256 slotId,uint256 deadline,string snapshotCid,uint256 epochId,string projectId)'
+
+
+def keccak(data: bytes) -> bytes:
+    return sha3.keccak_256(data).digest()
+
+
+def _define_eip_request():
+    from eip712_structs import EIP712Struct
+    from eip712_structs import String
+    from eip712_structs import Uint
+
+    class EIPRequest(EIP712Struct):
+        slotId = Uint()
+        deadline = Uint()
+        snapshotCid = String()
+        epochId = Uint()
+        projectId = String()
+    return EIPRequest
+
+
+def __getattr__(name):
+    # the eip712_structs definition of the request is only needed by tests and tooling
+    if name == 'EIPRequest':
+        globals()['EIPRequest'] = _define_eip_request()
+        return globals()['EIPRequest']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def domain_separator(chain_id: int, verifying_contract: str) -> bytes:
+    """
+    hashStruct of the protocol's EIP712Domain for the given chain and contract.
+    """
+    return keccak(
+        keccak(DOMAIN_TYPE.encode('utf-8')) +
+        keccak(DOMAIN_NAME.encode('utf-8')) +
+        keccak(DOMAIN_VERSION.encode('utf-8')) +
+        chain_id.to_bytes(32, 'big') +
+        bytes.fromhex(verifying_contract.removeprefix('0x').rjust(64, '0')),
+    )
+
+
+def _load_private_key(private_key: str) -> PrivateKey:
+    if private_key.startswith('0x'):
+        private_key = private_key[2:]
+    return PrivateKey.from_hex(private_key)
+
+
+class SubmissionSigner:
+    """
+    Signs EIPRequest structs for a fixed EIP-712 domain.
+
+    Attributes:
+        domain_separator (bytes): hashStruct of the EIP-712 domain, computed once
+        type_hash (bytes): keccak of the EIPRequest type string, computed once
+    """
+
+    def __init__(self, chain_id: int, verifying_contract: str, private_key: str):
+        """
+        Args:
+            chain_id (int): Anchor chain ID of the EIP-712 domain
+            verifying_contract (str): Protocol state contract address of the EIP-712 domain
+            private_key (str): Hex encoded default signing key, with or without 0x prefix
+        """
+        self._chain_id = chain_id
+        self._verifying_contract = verifying_contract
+        self.domain_separator = domain_separator(chain_id, verifying_contract)
+        self.type_hash = keccak(REQUEST_TYPE.encode('utf-8'))
+        self._digest_prefix = b'\x19\x01' + self.domain_separator
+        self._default_key = _load_private_key(private_key)
+        self._keys: Dict[str, PrivateKey] = dict()
+
+    @property
+    def domain(self):
+        """
+        The eip712_structs domain object, for use with ``EIPRequest.signable_bytes``.
+        """
+        from eip712_structs import make_domain
+        return make_domain(
+            name=DOMAIN_NAME, version=DOMAIN_VERSION, chainId=self._chain_id,
+            verifyingContract=self._verifying_contract,
+        )
+
+    def _get_key(self, private_key: Optional[str]) -> PrivateKey:
+        if not private_key:
+            return self._default_key
+        key = self._keys.get(private_key)
+        if key is None:
+            key = _load_private_key(private_key)
+            self._keys[private_key] = key
+        return key
+
+    def digest(self, slot_id: int, deadline: int, snapshot_cid: str, epoch_id: int, project_id: str) -> bytes:
+        """
+        EIP-712 digest of a request, equal to keccak(EIPRequest(...).signable_bytes(domain)).
+        """
+        struct_hash = keccak(
+            self.type_hash +
+            slot_id.to_bytes(32, 'big') +
+            deadline.to_bytes(32, 'big') +
+            keccak(snapshot_cid.encode('utf-8')) +
+            epoch_id.to_bytes(32, 'big') +
+            keccak(project_id.encode('utf-8')),
+        )
+        return keccak(self._digest_prefix + struct_hash)
+
+    def sign(
+        self,
+        slot_id: int,
+        deadline: int,
+        snapshot_cid: str,
+        epoch_id: int,
+        project_id: str,
+        private_key: Optional[str] = None,
+    ) -> bytes:
+        """
+        Sign a request and return the 65 byte r || s || v signature with v in {27, 28}.
+
+        Args:
+            private_key (str, optional): Signing key overriding the default key
+        """
+        signature = self._get_key(private_key).sign_recoverable(
+            self.digest(slot_id, deadline, snapshot_cid, epoch_id, project_id),
+            hasher=None,
+        )
+        # coincurve returns r || s || recovery id
+        return signature[:64] + bytes((signature[64] + 27,))
+
+    def sign_batch(self, requests: List[Tuple[int, int, str, int, str]], private_key: Optional[str] = None) -> List[bytes]:
+        """
+        Sign several (slot_id, deadline, snapshot_cid, epoch_id, project_id) requests.
+        """
+        return [self.sign(*request, private_key=private_key) for request in requests]
+
+    async def sign_batch_async(
+        self,
+        requests: List[Tuple[int, int, str, int, str]],
+        private_key: Optional[str] = None,
+        executor: Optional[Executor] = None,
+    ) -> List[bytes]:
+        """
+        Sign a batch of requests in a worker thread so the event loop stays responsive.
+
+        coincurve releases the GIL while signing, so large batches overlap with event loop work.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, self.sign_batch, requests, private_key,
+        )
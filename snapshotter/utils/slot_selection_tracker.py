@@ -1,42 +1,90 @@
 """
 Simple tracker for slot selection status.
 
-This module provides a minimal file-based mechanism for compute packages to report
+This module provides a minimal in-process mechanism for compute packages to report
 slot selection decisions to the lite node, enabling selection-aware health monitoring.
+Decisions are kept in an epoch-indexed ring buffer so that concurrent epochs don't
+overwrite each other, and the latest decision is optionally mirrored to a memory-mapped
+status file for external health checks.
 """
 
 import json
+import mmap
+import os
 import time
 from pathlib import Path
+from typing import List
 from typing import Optional
 
+from snapshotter.utils.default_logger import logger
+
+tracker_logger = logger.bind(module='SlotSelectionTracker')
+
+# fixed size of the memory-mapped status file; the JSON status is padded with whitespace to fill it
+MIRROR_FILE_SIZE = 256
+
 
 class SlotSelectionTracker:
     """
-    Tracks slot selection status using file-based persistence.
-    
+    Tracks slot selection status per epoch in memory.
+
     This tracker allows compute packages to report whether a slot was selected
     for processing in a given epoch, enabling the health monitoring system to
     distinguish between legitimate non-selection and actual failures.
     """
-    
-    def __init__(self, status_file: str = 'slot_selection_status.txt'):
+
+    def __init__(
+        self,
+        status_file: str = 'slot_selection_status.txt',
+        history_size: int = 256,
+        mirror_to_file: bool = True,
+    ):
         """
         Initialize the tracker.
-        
+
         Args:
-            status_file: Path to the status file (default: slot_selection_status.txt)
+            status_file: Path to the mirrored status file (default: slot_selection_status.txt)
+            history_size: Number of most recent epochs kept in the ring buffer
+            mirror_to_file: Whether to mirror the latest selection to the status file
         """
         self._status_file = Path(status_file)
-    
+        self._history_size = history_size
+        self._history: List[Optional[dict]] = [None] * history_size
+        self._last_selection: Optional[dict] = None
+        self._mirror: Optional[mmap.mmap] = None
+        if mirror_to_file:
+            self._open_mirror()
+
+    def _open_mirror(self):
+        try:
+            fd = os.open(self._status_file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                os.ftruncate(fd, MIRROR_FILE_SIZE)
+                self._mirror = mmap.mmap(fd, MIRROR_FILE_SIZE)
+                # growing the file pads it with NUL bytes, which JSON readers reject
+                self._mirror[:] = bytes(self._mirror).replace(b'\x00', b' ')
+            finally:
+                os.close(fd)
+        except Exception as e:
+            tracker_logger.error('Error mapping slot selection status file, mirroring disabled: {}', e)
+            self._mirror = None
+
+    def _write_mirror(self, status: dict):
+        data = json.dumps(status).encode('utf-8')
+        if len(data) > MIRROR_FILE_SIZE:
+            return
+        # trailing whitespace keeps the file valid JSON for readers that parse the whole file
+        self._mirror[:] = data.ljust(MIRROR_FILE_SIZE, b' ')
+
     def report_selection(self, epoch_id: int, was_selected: bool, slot_id: int) -> None:
         """
         Report slot selection status for an epoch.
-        
+
         This method is called by compute packages to report whether their slot
-        was selected for processing in a given epoch. The status is written
-        synchronously to ensure availability for health checks.
-        
+        was selected for processing in a given epoch. The status is recorded
+        in memory and, if enabled, copied into the memory-mapped status file,
+        which involves no file system calls.
+
         Args:
             epoch_id: The epoch ID
             was_selected: True if slot was selected, False otherwise
@@ -48,28 +96,50 @@ class SlotSelectionTracker:
             'slot_id': slot_id,
             'timestamp': int(time.time())
         }
-        
-        try:
-            with open(self._status_file, 'w') as f:
-                json.dump(status, f)
-        except Exception as e:
-            # Log error but don't raise - don't want to break compute flow
-            print(f"Error writing slot selection status: {e}")
-    
-    def get_last_selection(self) -> Optional[dict]:
+        self._history[epoch_id % self._history_size] = status
+        self._last_selection = status
+
+        if self._mirror is not None:
+            try:
+                self._write_mirror(status)
+            except Exception as e:
+                # Log error but don't raise - don't want to break compute flow
+                tracker_logger.error('Error writing slot selection status: {}', e)
+
+    def get_selection(self, epoch_id: int) -> Optional[dict]:
         """
-        Read the last reported selection status.
-        
+        Look up the selection status reported for a specific epoch.
+
         Returns:
             Dict with keys: epoch_id, was_selected, slot_id, timestamp
-            None if file doesn't exist or can't be read
+            None if nothing was reported for the epoch or it has been evicted from the history
         """
-        if not self._status_file.exists():
-            return None
-        
-        try:
-            with open(self._status_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error reading slot selection status: {e}")
+        status = self._history[epoch_id % self._history_size]
+        if status is None or status['epoch_id'] != epoch_id:
             return None
+        return status
+
+    def was_selected(self, epoch_id: int) -> bool:
+        """
+        Whether the slot was reported as selected for the given epoch.
+        """
+        status = self.get_selection(epoch_id)
+        return bool(status and status['was_selected'])
+
+    def get_last_selection(self) -> Optional[dict]:
+        """
+        Return the most recently reported selection status.
+
+        Returns:
+            Dict with keys: epoch_id, was_selected, slot_id, timestamp
+            None if nothing has been reported yet
+        """
+        return self._last_selection
+
+    def close(self) -> None:
+        """
+        Unmap the mirrored status file.
+        """
+        if self._mirror is not None:
+            self._mirror.close()
+            self._mirror = None
@@ -0,0 +1,77 @@
+"""
+Slots served by the node.
+
+A node serves ``settings.slot_id`` with ``settings.signer_private_key`` unless ``settings.slots``
+lists several slots. In multi-slot mode the event detector, the preloader pass, RPC and IPFS pools
+are shared, while every slot computes its own snapshots, signs with its own key and keeps its own
+selection history and status accounting.
+"""
+
+import os
+from typing import List
+from typing import Optional
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.markets import market_file_path
+from snapshotter.utils.models.data_models import SnapshotterStatus
+from snapshotter.utils.models.settings_model import SlotConfig
+from snapshotter.utils.slot_selection_tracker import SlotSelectionTracker
+
+
+def configured_slots() -> List[SlotConfig]:
+    """
+    Slots served by the node, the single configured slot unless settings.slots is set.
+    """
+    if settings.slots:
+        return settings.slots
+    return [
+        SlotConfig(
+            slot_id=settings.slot_id,
+            signer_private_key=settings.signer_private_key,
+            instance_id=settings.instance_id,
+        ),
+    ]
+
+
+def slot_status_file(slot_id: int, data_market: Optional[str] = None) -> str:
+    """
+    Status file mirroring the latest selection of a slot in a market; the configured file when serving a single slot and market.
+    """
+    status_file = settings.slot_selection.status_file
+    if settings.slots:
+        root, ext = os.path.splitext(status_file)
+        status_file = f'{root}.slot{slot_id}{ext}'
+    if data_market:
+        status_file = market_file_path(status_file, data_market)
+    return status_file
+
+
+class SlotState:
+    """
+    Signing identity, selection history and status accounting of one slot, within one data market.
+    """
+
+    def __init__(self, config: SlotConfig, data_market: Optional[str] = None):
+        self.slot_id = config.slot_id
+        self.signer_private_key = config.signer_private_key
+        self.instance_id = config.instance_id
+        self.tracker = SlotSelectionTracker(
+            status_file=slot_status_file(config.slot_id, data_market),
+            history_size=settings.slot_selection.history_size,
+            mirror_to_file=settings.slot_selection.mirror_to_file,
+        )
+        self.status = SnapshotterStatus(projects=[])
+        # epoch_ids where the slot was selected but processing failed
+        self.consecutive_selection_failures: List[int] = []
+        self.alert_sent = False
+
+    def close(self):
+        self.tracker.close()
+
+
+def latest_selection(slots: List[SlotState]) -> Optional[dict]:
+    """
+    Most recent selection reported across slots.
+    """
+    selections = [slot.tracker.get_last_selection() for slot in slots]
+    return max(filter(None, selections), key=lambda s: s.get('timestamp', 0), default=None)
@@ -1,6 +1,10 @@
+from typing import TYPE_CHECKING
+
 from snapshotter.settings.config import settings
 from snapshotter.utils.default_logger import logger
-from rpc_helper.rpc import RpcHelper
+
+if TYPE_CHECKING:
+    from rpc_helper.rpc import RpcHelper
 
 snapshot_util_logger = logger.bind(module='Powerloom|Snapshotter|SnapshotUtilLogger')
 
@@ -8,7 +12,7 @@ snapshot_util_logger = logger.bind(module='Powerloom|Snapshotter|SnapshotUtilLog
 async def get_block_details_in_block_range(
     from_block,
     to_block,
-    rpc_helper: RpcHelper,
+    rpc_helper: 'RpcHelper',
 ):
     """
     Fetches block details for a given range of block numbers.
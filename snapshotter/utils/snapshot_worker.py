@@ -6,108 +6,135 @@ from typing import Optional
 
 from ipfs_client.main import AsyncIPFSClient
 from ipfs_client.main import AsyncIPFSClientSingleton
-from httpx import AsyncClient
-from httpx import AsyncHTTPTransport
-from httpx import Limits
-from httpx import Timeout
 
-from snapshotter.settings.config import projects_config
+from snapshotter.settings.config import get_projects_config
 from snapshotter.settings.config import settings
-from snapshotter.utils.callback_helpers import send_telegram_notification_async
+from snapshotter.utils.compute_process_pool import ComputeProcessPool
+from snapshotter.utils.compute_process_pool import OffloadedProcessor
+from snapshotter.utils.epoch_timeline import EpochTimeline
+from snapshotter.utils.exceptions import CircuitOpenError
 from snapshotter.utils.generic_worker import GenericAsyncWorker
+from snapshotter.utils.metrics import outcome_of
+from snapshotter.utils.metrics import stage_timer
+from snapshotter.utils.metrics import SUBMISSIONS
 from snapshotter.utils.models.data_models import SnapshotterIssue
 from snapshotter.utils.models.data_models import SnapshotterReportState
-from snapshotter.utils.models.data_models import SnapshotterStatus
+from snapshotter.utils.models.data_models import SnapshotterStates
 from snapshotter.utils.models.message_models import SnapshotProcessMessage
 from snapshotter.utils.models.message_models import TelegramSnapshotterReportMessage
-from snapshotter.utils.slot_selection_tracker import SlotSelectionTracker
+from snapshotter.utils.models.settings_model import MarketConfig
+from snapshotter.utils.notifications import telegram_notifier
+from snapshotter.utils import readiness
+from snapshotter.utils.readiness import probe_ipfs_api
+from snapshotter.utils.slots import configured_slots
+from snapshotter.utils.slots import latest_selection
+from snapshotter.utils.slots import SlotState
+from snapshotter.utils.startup_profiler import profiled
+from snapshotter.utils.startup_profiler import startup_profiler
+from snapshotter.utils.submission_history import note
+from snapshotter.utils.submission_history import recording
+from snapshotter.utils.submission_history import SubmissionHistory
+from snapshotter.utils.utility_functions import close_quietly
 
 
 class SnapshotAsyncWorker(GenericAsyncWorker):
     _ipfs_singleton: AsyncIPFSClientSingleton
     _ipfs_writer_client: AsyncIPFSClient
     _ipfs_reader_client: AsyncIPFSClient
-    _telegram_httpx_client: AsyncClient
 
-    def __init__(self):
+    def __init__(self, market: Optional[MarketConfig] = None):
         """
         Initializes a SnapshotAsyncWorker object.
 
         Args:
-            name (str): The name of the worker.
-            **kwargs: Additional keyword arguments to be passed to the AsyncWorker constructor.
+            market (MarketConfig, optional): Data market whose projects the worker snapshots. Defaults to settings.data_market
         """
         self._project_calculation_mapping = {}
-        super().__init__()
-        self._task_types = []
-        for project_config in projects_config:
-            task_type = project_config.project_type
-            self._task_types.append(task_type)
-        self.status = SnapshotterStatus(projects=[])
-        self.last_notification_time = 0
-        self.notification_cooldown = settings.reporting.notification_cooldown
-        self._slot_tracker = SlotSelectionTracker()
-        self._consecutive_selection_failures = []  # List of epoch_ids where selected but failed
-        self._alert_sent = False
+        self._compute_pool: Optional[ComputeProcessPool] = None
+        super().__init__(market)
+        self._task_types = [
+            project_config.project_type for project_config in get_projects_config(self.market.projects_config_path)
+        ]
+        self._slots = [SlotState(slot_config, self.market.data_market) for slot_config in configured_slots()]
+        self.timeline = EpochTimeline(self.market.data_market)
+        self.history = SubmissionHistory(self.market.data_market)
+
+    @property
+    def slots(self):
+        """
+        Slots served by the worker, each with its own selection tracker and status.
+        """
+        return self._slots
+
+    def _timeline_key(self, key: str, slot: SlotState) -> str:
+        """
+        Timeline key of a project type or project ID, qualified with the slot when serving several slots.
+        """
+        return key if len(self._slots) == 1 else f'{key}@slot{slot.slot_id}'
 
-    async def _handle_selection_failure(self, epoch_id: int):
+    def last_selection(self):
+        """
+        Most recent slot selection decision reported by compute packages for any slot.
+        """
+        return latest_selection(self._slots)
+
+    async def _handle_selection_failure(self, slot: SlotState, epoch_id: int):
         """
         Handle a failure when slot was selected but processing failed.
         
         Tracks consecutive failures and sends alert after 3 consecutive selected-but-failed epochs.
         """
-        self._consecutive_selection_failures.append(epoch_id)
+        slot.consecutive_selection_failures.append(epoch_id)
         
         # Keep only recent failures for tracking
-        if len(self._consecutive_selection_failures) > 10:
-            self._consecutive_selection_failures = self._consecutive_selection_failures[-10:]
+        if len(slot.consecutive_selection_failures) > 10:
+            slot.consecutive_selection_failures = slot.consecutive_selection_failures[-10:]
         
         self.logger.warning(
-            f"Slot selected for epoch {epoch_id} but processing failed. "
-            f"Consecutive selection failures: {len(self._consecutive_selection_failures)}"
+            f"Slot {slot.slot_id} selected for epoch {epoch_id} but processing failed. "
+            f"Consecutive selection failures: {len(slot.consecutive_selection_failures)}"
         )
         
         # Alert if 3 consecutive selected epochs failed
-        if len(self._consecutive_selection_failures) >= 3 and not self._alert_sent:
+        if len(slot.consecutive_selection_failures) >= 3 and not slot.alert_sent:
             error_message = (
-                f"3 consecutive epochs where slot was selected but processing failed: "
-                f"{self._consecutive_selection_failures[-3:]}"
+                f"3 consecutive epochs where slot {slot.slot_id} was selected but processing failed: "
+                f"{slot.consecutive_selection_failures[-3:]}"
             )
             self.logger.error(error_message)
             
             # Send telegram notification
-            if settings.reporting.telegram_url and settings.reporting.telegram_chat_id:
-                await send_telegram_notification_async(
-                    client=self._telegram_httpx_client,
-                    message=TelegramSnapshotterReportMessage(
-                        chatId=settings.reporting.telegram_chat_id,
-                        message_thread_id=settings.reporting.telegram_message_thread_id,
-                        slotId=settings.slot_id,
-                        issue=SnapshotterIssue(
-                            instanceID=settings.instance_id,
-                            issueType=SnapshotterReportState.UNHEALTHY_EPOCH_PROCESSING.value,
-                            projectID='',
-                            epochId=str(epoch_id),
-                            timeOfReporting=str(time.time()),
-                            extra=json.dumps({'issueDetails': error_message}),
-                        ),
+            telegram_notifier.notify(
+                TelegramSnapshotterReportMessage(
+                    chatId=settings.reporting.telegram_chat_id,
+                    message_thread_id=settings.reporting.telegram_message_thread_id,
+                    slotId=slot.slot_id,
+                    issue=SnapshotterIssue(
+                        instanceID=slot.instance_id,
+                        issueType=SnapshotterReportState.UNHEALTHY_EPOCH_PROCESSING.value,
+                        projectID='',
+                        epochId=str(epoch_id),
+                        timeOfReporting=str(time.time()),
+                        extra=json.dumps({'issueDetails': error_message}),
                     ),
-                )
+                    status=slot.status,
+                ),
+            )
             
-            self._alert_sent = True
+            slot.alert_sent = True
     
-    async def _handle_selection_success(self, epoch_id: int):
+    async def _handle_selection_success(self, slot: SlotState, epoch_id: int):
         """
         Handle successful processing when slot was selected.
         
         Resets consecutive failure tracking.
         """
         self.logger.info(
-            f"Slot selected for epoch {epoch_id} and processing succeeded. "
-            f"Resetting consecutive failure count (was: {len(self._consecutive_selection_failures)})"
+            f"Slot {slot.slot_id} selected for epoch {epoch_id} and processing succeeded. "
+            f"Resetting consecutive failure count (was: {len(slot.consecutive_selection_failures)})"
         )
-        self._consecutive_selection_failures = []
-        self._alert_sent = False
+        slot.consecutive_selection_failures = []
+        slot.alert_sent = False
 
     def _gen_project_id(self, task_type: str, data_source: Optional[str] = None, primary_data_source: Optional[str] = None):
         """
@@ -131,13 +158,14 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
                 project_id = f'{task_type}:{data_source.lower()}:{settings.namespace}'
         return project_id
 
-    async def _process(self, msg_obj: SnapshotProcessMessage, task_type: str, preloader_results: dict):
+    async def _process(self, msg_obj: SnapshotProcessMessage, task_type: str, preloader_results: dict, slot: SlotState):
         """
         Processes the given SnapshotProcessMessage object in bulk mode.
 
         Args:
             msg_obj (SnapshotProcessMessage): The message object to process.
             task_type (str): The type of task to perform.
+            slot (SlotState): The slot computing and signing the snapshot.
 
         Raises:
             Exception: If an error occurs while processing the message.
@@ -148,21 +176,29 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
         try:
             task_processor = self._project_calculation_mapping[task_type]
             
-            snapshots = await task_processor.compute(
-                msg_obj=msg_obj,
-                rpc_helper=self._rpc_helper,
-                anchor_rpc_helper=self._anchor_rpc_helper,
-                ipfs_reader=self._ipfs_reader_client,
-                protocol_state_contract=self.protocol_state_contract,
-                preloader_results=preloader_results,
-                slot_tracker=self._slot_tracker,
-            )
+            with stage_timer('compute', task_type):
+                snapshots = await self.timeline.track(
+                    msg_obj.epochId,
+                    SnapshotterStates.SNAPSHOT_BUILD,
+                    self._timeline_key(task_type, slot),
+                    task_processor.compute(
+                        msg_obj=msg_obj,
+                        rpc_helper=self._rpc_helper,
+                        anchor_rpc_helper=self._anchor_rpc_helper,
+                        ipfs_reader=self._ipfs_reader_client,
+                        protocol_state_contract=self.protocol_state_contract,
+                        preloader_results=preloader_results,
+                        slot_tracker=slot.tracker,
+                    ),
+                    describe_result=lambda snapshots: {'snapshots': len(snapshots or [])},
+                )
+            note(snapshots=len(snapshots or []))
 
             if not snapshots:
                 # Check if we were selected - empty return after selection is a failure
-                selection_status = self._slot_tracker.get_last_selection()
-                if selection_status and selection_status.get('was_selected') and selection_status.get('epoch_id') == msg_obj.epochId:
+                if slot.tracker.was_selected(msg_obj.epochId):
                     # Selected but compute returned empty - this is a failure
+                    selection_status = slot.tracker.get_selection(msg_obj.epochId)
                     error_msg = f"Slot {selection_status['slot_id']} selected for epoch {msg_obj.epochId} but compute returned no data"
                     self.logger.error(error_msg)
                     raise Exception(error_msg)
@@ -172,6 +208,8 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
                         'No snapshot data for: {}, skipping...', msg_obj,
                     )
 
+        except CircuitOpenError:
+            raise
         except Exception as e:
             self.logger.opt(exception=True).error(
                 'Exception processing callback for epoch: {}, Error: {},'
@@ -180,8 +218,11 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
             raise
 
         else:
+            if snapshots:
+                # checked once compute reported the slot's selection, so that outages only count against selected slots
+                self._check_submission_path()
 
-            for project_data_source, snapshot in snapshots:
+            for project_data_source, snapshot in snapshots or []:
                 data_sources = project_data_source.split('_')
                 if len(data_sources) == 1:
                     data_source = data_sources[0]
@@ -193,24 +234,41 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
                     task_type=task_type, data_source=data_source, primary_data_source=primary_data_source,
                 )
                 
-                try:
-                    await self._commit_payload(
-                        task_type=task_type,
-                        _ipfs_writer_client=self._ipfs_writer_client,
-                        project_id=project_id,
-                        epoch=msg_obj,
-                        snapshot=snapshot
-                    )
-                except Exception as e:
-                    self.logger.opt(exception=True).error(
-                        'Exception committing snapshot payload for epoch: {}, Error: {},'
-                        'sending failure notifications', msg_obj, e,
-                    )
-                    raise
+                with recording() as submission:
+                    try:
+                        await self.timeline.track(
+                            msg_obj.epochId,
+                            SnapshotterStates.SNAPSHOT_FINALIZE,
+                            self._timeline_key(project_id, slot),
+                            self._commit_payload(
+                                task_type=task_type,
+                                _ipfs_writer_client=self._ipfs_writer_client,
+                                project_id=project_id,
+                                epoch=msg_obj,
+                                snapshot=snapshot,
+                                slot_id=slot.slot_id,
+                                private_key=slot.signer_private_key,
+                            ),
+                            describe_result=lambda snapshot_cid: {'cid': snapshot_cid},
+                        )
+                    except Exception as e:
+                        SUBMISSIONS.inc(project_type=task_type, outcome=outcome_of(e))
+                        self.history.record_submission(msg_obj.epochId, slot.slot_id, project_id, submission, error=e)
+                        self.logger.opt(exception=True).error(
+                            'Exception committing snapshot payload for epoch: {}, Error: {},'
+                            'sending failure notifications', msg_obj, e,
+                        )
+                        raise
+                    else:
+                        SUBMISSIONS.inc(project_type=task_type, outcome='success')
+                        self.history.record_submission(msg_obj.epochId, slot.slot_id, project_id, submission)
 
     async def process_task(self, msg_obj: SnapshotProcessMessage, task_type: str, preloader_results: dict):
         """
-        Process a SnapshotProcessMessage object for a given task type.
+        Process a SnapshotProcessMessage object for a given task type, for every slot served.
+
+        Slots share the preloader results and connections; each computes its own snapshot, which
+        compute packages tell apart by ``msg_obj.slotId``.
 
         Args:
             msg_obj (SnapshotProcessMessage): The message object to process.
@@ -231,44 +289,95 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
             )
             return
 
+        await asyncio.gather(*[
+            self._process_task_for_slot(msg_obj.copy(update={'slotId': slot.slot_id}), task_type, preloader_results, slot)
+            for slot in self._slots
+        ])
+
+    async def _process_task_for_slot(
+        self, msg_obj: SnapshotProcessMessage, task_type: str, preloader_results: dict, slot: SlotState,
+    ):
         epoch_id = msg_obj.epochId
 
-        try:
+        with recording() as attempt:
+            try:
 
-            self.logger.debug(
-                'Got epoch to process for {}: {}',
-                task_type, msg_obj,
-            )
+                self.logger.debug(
+                    'Got epoch to process for {}: {}',
+                    task_type, msg_obj,
+                )
 
-            await self._process(
-                msg_obj=msg_obj,
-                task_type=task_type,
-                preloader_results=preloader_results,
-            )
-        except Exception as e:
-            self.logger.error(f"Error processing SnapshotProcessMessage: {msg_obj} for task type: {task_type} - Error: {e}")
-            await self.handle_missed_snapshot(
-                error=e,
-                epoch_id=str(msg_obj.epochId),
-                project_id=self._gen_project_id(
+                await self._process(
+                    msg_obj=msg_obj,
                     task_type=task_type,
-                ),
-            )
-            # Check if this was a selected slot that failed
-            selection_status = self._slot_tracker.get_last_selection()
-            if selection_status and selection_status.get('was_selected') and selection_status.get('epoch_id') == epoch_id:
-                await self._handle_selection_failure(epoch_id)
-        else:
-            # Check if slot was actually selected before resetting counter
-            selection_status = self._slot_tracker.get_last_selection()
-            if selection_status and selection_status.get('was_selected') and selection_status.get('epoch_id') == epoch_id:
-                # Slot was selected and processing succeeded
-                self.status.consecutiveMissedSubmissions = 0
-                self.status.totalSuccessfulSubmissions += 1
-                await self._handle_selection_success(epoch_id)
+                    preloader_results=preloader_results,
+                    slot=slot,
+                )
+            except CircuitOpenError as e:
+                # the outage itself is logged once when the circuit opens
+                self.logger.debug('Skipped {} for epoch {} of slot {}: {}', task_type, epoch_id, slot.slot_id, e)
+                if not slot.tracker.was_selected(epoch_id):
+                    # a slot that was not selected had nothing to submit, so nothing was missed
+                    return
+                self.record_attempt(slot, epoch_id, task_type, attempt, error=e)
+                self.timeline.record(epoch_id, SnapshotterStates.SNAPSHOT_FINALIZE, self._timeline_key(task_type, slot), error=e)
+                await self.handle_missed_snapshot(
+                    error=e,
+                    epoch_id=str(epoch_id),
+                    project_id=self._gen_project_id(task_type=task_type),
+                    slot=slot,
+                )
+                await self._handle_selection_failure(slot, epoch_id)
+            except Exception as e:
+                self.logger.error(f"Error processing SnapshotProcessMessage: {msg_obj} for task type: {task_type} - Error: {e}")
+                self.record_attempt(slot, epoch_id, task_type, attempt, error=e)
+                await self.handle_missed_snapshot(
+                    error=e,
+                    epoch_id=str(msg_obj.epochId),
+                    project_id=self._gen_project_id(
+                        task_type=task_type,
+                    ),
+                    slot=slot,
+                )
+                # Check if this was a selected slot that failed
+                if slot.tracker.was_selected(epoch_id):
+                    await self._handle_selection_failure(slot, epoch_id)
             else:
-                # Slot was not selected - don't modify counters
-                self.logger.debug(f'Epoch {epoch_id}: Slot not selected, skipping counter reset')
+                self.record_attempt(slot, epoch_id, task_type, attempt)
+                # Check if slot was actually selected before resetting counter
+                if slot.tracker.was_selected(epoch_id):
+                    # Slot was selected and processing succeeded
+                    slot.status.consecutiveMissedSubmissions = 0
+                    slot.status.totalSuccessfulSubmissions += 1
+                    await self._handle_selection_success(slot, epoch_id)
+                else:
+                    # Slot was not selected - don't modify counters
+                    self.logger.debug(f'Epoch {epoch_id}: Slot {slot.slot_id} not selected, skipping counter reset')
+
+    def record_attempt(
+        self, slot: SlotState, epoch_id: int, task_type: str, details: dict, error: Optional[Exception] = None,
+    ):
+        """
+        Record a slot processing a project type for an epoch in the submission history, with its selection decision.
+        """
+        selection = slot.tracker.get_selection(epoch_id)
+        self.history.record_attempt(
+            epoch_id, slot.slot_id, task_type, selection['was_selected'] if selection else None, details, error=error,
+        )
+
+    def _check_submission_path(self):
+        """
+        Skip submitting snapshots that could not be delivered because IPFS or the collector is known to be down.
+
+        Raises:
+            CircuitOpenError: If the circuit of a dependency needed for submission is open
+        """
+        breakers = [self._collector_breaker]
+        if settings.ipfs.url:
+            breakers.append(self._ipfs_breaker)
+        for breaker in breakers:
+            if breaker.rejecting:
+                raise CircuitOpenError(breaker.name, breaker.retry_after)
 
     async def _init_project_calculation_mapping(self):
         """
@@ -280,15 +389,51 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
         """
         if self._project_calculation_mapping != {}:
             return
+        self._project_calculation_mapping = self.build_project_calculation_mapping(
+            get_projects_config(self.market.projects_config_path),
+        )
+
+    def _get_compute_pool(self) -> ComputeProcessPool:
+        """
+        Returns the process pool running CPU-bound processors, starting it on first use.
+        """
+        if self._compute_pool is None:
+            self._compute_pool = ComputeProcessPool(settings.compute_process_pool.workers)
+        return self._compute_pool
+
+    def build_project_calculation_mapping(self, projects_config):
+        """
+        Imports the processor class of every project type and instantiates it. Processors marked
+        cpu_bound are instantiated in the compute process pool and represented by an OffloadedProcessor.
+
+        Raises:
+            Exception: If a duplicate project type is found in the projects configuration.
+        """
         # Generate project function mapping
-        self._project_calculation_mapping = dict()
+        project_calculation_mapping = dict()
         for project_config in projects_config:
             key = project_config.project_type
-            if key in self._project_calculation_mapping:
+            if key in project_calculation_mapping:
                 raise Exception('Duplicate project type found')
             module = importlib.import_module(project_config.processor.module)
             class_ = getattr(module, project_config.processor.class_name)
-            self._project_calculation_mapping[key] = class_()
+            if project_config.processor.cpu_bound:
+                project_calculation_mapping[key] = OffloadedProcessor(
+                    project_config.processor.module, project_config.processor.class_name, self._get_compute_pool,
+                )
+            else:
+                project_calculation_mapping[key] = class_()
+        return project_calculation_mapping
+
+    def swap_project_calculation_mapping(self, projects_config, project_calculation_mapping):
+        """
+        Replaces the processors used for newly started tasks. Tasks already computing keep their processor.
+        """
+        self._project_calculation_mapping = project_calculation_mapping
+        self._task_types = [project_config.project_type for project_config in projects_config]
+        if self._compute_pool is not None:
+            # compute processes still hold the previous processor modules
+            self._compute_pool.recycle()
 
     async def _init_ipfs_client(self):
         """
@@ -304,83 +449,110 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
         self._ipfs_writer_client = self._ipfs_singleton._ipfs_write_client
         self._ipfs_reader_client = self._ipfs_singleton._ipfs_read_client
 
-    async def _init_telegram_client(self):
+    def readiness_probes(self):
         """
-        Initializes the Telegram client.
+        Adds the IPFS API to the dependencies probed by the generic worker when uploads are enabled.
         """
-        self._telegram_httpx_client = AsyncClient(
-            base_url=settings.reporting.telegram_url,
-            timeout=Timeout(timeout=5.0),
-            follow_redirects=False,
-            transport=AsyncHTTPTransport(limits=Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=None)),
-        )
-
-    async def init_worker(self):
+        probes = super().readiness_probes()
+        if settings.ipfs.url:
+            url_auth = getattr(settings.ipfs, 'url_auth', None)
+            auth = (url_auth.apiKey, url_auth.apiSecret) if url_auth else None
+            probes[readiness.IPFS] = lambda: probe_ipfs_api(settings.ipfs.url, settings.readiness.probe_timeout, auth)
+        return probes
+
+    async def init_worker(self, rpc_helper=None, anchor_rpc_helper=None):
         """
         Initializes the worker by initializing project calculation mapping, IPFS client, and other necessary components.
+
+        The independent clients are initialized concurrently.
+
+        Args:
+            rpc_helper (optional): Initialized source chain RpcHelper to share instead of creating one
+            anchor_rpc_helper (optional): Initialized anchor chain RpcHelper to share instead of creating one
         """
         if not self.initialized:
-            await self._init_project_calculation_mapping()
-            await self._init_ipfs_client()
-            await self._init_telegram_client()
-            await self.init()
+            with startup_profiler.step('worker.project_mapping'):
+                await self._init_project_calculation_mapping()
+            await asyncio.gather(
+                profiled('worker.ipfs', self._init_ipfs_client()),
+                self.init(rpc_helper=rpc_helper, anchor_rpc_helper=anchor_rpc_helper),
+            )
+            for slot in self._slots:
+                await self.history.restore_slot_status(slot)
 
-    async def handle_missed_snapshot(self, error: Exception, epoch_id: str, project_id: str):
+    async def close(self):
         """
-        Handles missed snapshots by sending failure notifications and updating the status.
+        Closes the IPFS and Telegram clients and the compute process pool in addition to the connections closed by the generic worker.
+        """
+        await super().close()
+        if self._compute_pool is not None:
+            await self._compute_pool.close()
+        if self.initialized:
+            await close_quietly(self._ipfs_writer_client)
+            await close_quietly(self._ipfs_reader_client)
+        for slot in self._slots:
+            slot.close()
+        await self.timeline.close()
+        await self.history.close()
+
+    async def handle_missed_snapshot(self, error: Exception, epoch_id: str, project_id: str, slot: Optional[SlotState] = None):
         """
-        self.logger.error(f"Missed snapshot for epoch: {epoch_id}, project_id: {project_id} - Error: {error}")
-        self.status.totalMissedSubmissions += 1
-        self.status.consecutiveMissedSubmissions += 1
-        await self._send_failure_notifications(error=error, epoch_id=epoch_id, project_id=project_id)
+        Handles missed snapshots by sending failure notifications and updating the status.
 
-    async def _send_failure_notifications(
+        Args:
+            slot (SlotState, optional): The slot that missed the snapshot. Defaults to every slot served,
+                e.g. when a shared preloader failed
+        """
+        if isinstance(error, CircuitOpenError):
+            self.logger.debug(f"Missed snapshot for epoch: {epoch_id}, project_id: {project_id} - Error: {error}")
+        else:
+            self.logger.error(f"Missed snapshot for epoch: {epoch_id}, project_id: {project_id} - Error: {error}")
+        for missed_slot in ([slot] if slot else self._slots):
+            missed_slot.status.totalMissedSubmissions += 1
+            missed_slot.status.consecutiveMissedSubmissions += 1
+            if isinstance(error, CircuitOpenError):
+                # the outage itself is logged once when the circuit opens, not for every skipped snapshot
+                continue
+            self._send_failure_notifications(error=error, epoch_id=epoch_id, project_id=project_id, slot=missed_slot)
+
+    def _send_failure_notifications(
         self,
         error: Exception,
         epoch_id: str,
         project_id: str,
+        slot: SlotState,
     ):
         """
-        Sends failure notifications for missed snapshots.
+        Queues failure notifications for missed snapshots. Notifications reported within the cooldown
+        are aggregated into one by the notifier.
 
         Args:
             error (Exception): The error that occurred.
             epoch_id (str): The ID of the epoch that missed the snapshot.
             project_id (str): The ID of the project that missed the snapshot.
+            slot (SlotState): The slot that missed the snapshot.
         """
-        if (int(time.time()) - self.last_notification_time) >= self.notification_cooldown and \
-            (settings.reporting.telegram_url and settings.reporting.telegram_chat_id):
-
-            if not self._telegram_httpx_client:
-                self.logger.error('Telegram client not initialized')
-                return
-
-            try:
-                notification_message = SnapshotterIssue(
-                    instanceID=settings.instance_id,
-                    issueType=SnapshotterReportState.MISSED_SNAPSHOT.value,
-                    projectID=project_id,
-                    epochId=str(epoch_id),
-                    timeOfReporting=str(time.time()),
-                    extra=json.dumps({'issueDetails': f'Error : {error}'}),
-                )
+        try:
+            notification_message = SnapshotterIssue(
+                instanceID=slot.instance_id,
+                issueType=SnapshotterReportState.MISSED_SNAPSHOT.value,
+                projectID=project_id,
+                epochId=str(epoch_id),
+                timeOfReporting=str(time.time()),
+                extra=json.dumps({'issueDetails': f'Error : {error}'}),
+            )
 
-                message_thread_id = settings.reporting.telegram_message_thread_id
+            message_thread_id = settings.reporting.telegram_message_thread_id
 
-                telegram_message = TelegramSnapshotterReportMessage(
-                    chatId=settings.reporting.telegram_chat_id,
-                    slotId=settings.slot_id,
-                    message_thread_id=message_thread_id,
-                    issue=notification_message,
-                    status=self.status,
-                )
-
-                await send_telegram_notification_async(
-                    client=self._telegram_httpx_client,
-                    message=telegram_message,
-                )
+            telegram_message = TelegramSnapshotterReportMessage(
+                chatId=settings.reporting.telegram_chat_id,
+                slotId=slot.slot_id,
+                message_thread_id=message_thread_id,
+                issue=notification_message,
+                status=slot.status,
+            )
 
-                self.last_notification_time = int(time.time())
+            telegram_notifier.notify(telegram_message)
 
-            except Exception as e:
-                self.logger.error(f"Error sending failure notifications: {e}")
+        except Exception as e:
+            self.logger.error(f"Error sending failure notifications: {e}")
@@ -0,0 +1,113 @@
+"""
+Startup timeline recorder.
+
+Initialization steps are wrapped in :meth:`StartupProfiler.step`, which records when each step
+started relative to the beginning of startup and how long it took. Steps running concurrently show
+overlapping offsets. Once startup completes, the timeline is logged and written as JSON so cold
+start time can be compared across restarts, and it is served on the local HTTP endpoint.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.local_http_server import json_response
+from snapshotter.utils.local_http_server import local_http_server
+
+profiler_logger = logger.bind(module='StartupProfiler')
+
+
+class StartupProfiler:
+    """
+    Records named startup steps with their start offset and duration.
+    """
+
+    def __init__(self):
+        self._origin = time.monotonic()
+        self._started_at = time.time()
+        self._steps: List[Dict] = []
+        self._total: Optional[float] = None
+
+    def start(self):
+        """
+        Mark the beginning of startup. Offsets of all steps are relative to this point.
+        """
+        self._origin = time.monotonic()
+        self._started_at = time.time()
+        self._steps = []
+        self._total = None
+
+    @contextmanager
+    def step(self, name: str):
+        """
+        Time the enclosed block, which may contain awaits, as a startup step.
+
+        Args:
+            name (str): Step name, conventionally prefixed with the component, e.g. 'worker.ipfs'
+        """
+        start = time.monotonic()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._steps.append({
+                'name': name,
+                'start_offset': round(start - self._origin, 4),
+                'duration': round(time.monotonic() - start, 4),
+                'error': error,
+            })
+
+    def timeline(self) -> Dict:
+        steps = sorted(self._steps, key=lambda s: s['start_offset'])
+        total = self._total if self._total is not None else round(time.monotonic() - self._origin, 4)
+        return {'started_at': self._started_at, 'total_seconds': total, 'completed': self._total is not None, 'steps': steps}
+
+    def finish(self):
+        """
+        Mark startup as complete, log the timeline and write it to settings.startup_profile.report_path.
+        """
+        self._total = round(time.monotonic() - self._origin, 4)
+        timeline = self.timeline()
+        lines = [
+            f"  +{s['start_offset']:8.3f}s {s['duration']:8.3f}s  {s['name']}{' (' + s['error'] + ')' if s['error'] else ''}"
+            for s in timeline['steps']
+        ]
+        profiler_logger.info('Startup completed in {:.3f}s, offset / duration per step:\n{}', self._total, '\n'.join(lines))
+
+        report_path = settings.startup_profile.report_path
+        if not report_path:
+            return
+        try:
+            tmp_path = f'{report_path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(timeline, f, indent=2)
+            os.replace(tmp_path, report_path)
+        except Exception as e:
+            profiler_logger.error('Unable to write startup profile to {}: {}', report_path, e)
+
+
+startup_profiler = StartupProfiler()
+
+
+async def profiled(name: str, coro):
+    """
+    Await a coroutine as a startup step, e.g. to time the branches of an asyncio.gather.
+    """
+    with startup_profiler.step(name):
+        return await coro
+
+
+async def _startup_endpoint(query: Dict[str, str]):
+    return json_response(startup_profiler.timeline())
+
+
+local_http_server.add_route('/startup', _startup_endpoint)
@@ -0,0 +1,509 @@
+"""
+Persistent history of snapshot processing and submissions.
+
+Every project type a slot processes for an epoch is stored as an *attempt*, with the slot's selection
+decision, its outcome and compute time, and every snapshot it commits as a *submission*, with its
+CID, deadline block, per-stage timings and the collector's response. Rows are kept in a local SQLite
+database: they are buffered in memory and written in one transaction per flush interval by a
+dedicated thread, so the event loop never waits on disk, and rows older than the retention period are
+pruned as part of the writes.
+
+The history outlives restarts: slot status counters and the consecutive selection failures alerting
+is based on are restored from it on startup, and success rates, latency percentiles and missed epoch
+streaks over any window of time or epochs are answered by indexed queries, also served on the local
+HTTP endpoint ``/history``.
+
+Stage timings reach the row being recorded through a context variable: code running inside
+:func:`recording` adds details to its row with :func:`note`, and every stage timed with
+:func:`~snapshotter.utils.metrics.stage_timer` is noted as ``<stage>_ms``.
+"""
+
+import asyncio
+import math
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.local_http_server import json_response
+from snapshotter.utils.local_http_server import local_http_server
+from snapshotter.utils.metrics import add_stage_observer
+from snapshotter.utils.metrics import outcome_of
+from snapshotter.utils.metrics import project_type_of
+
+history_logger = logger.bind(module='SubmissionHistory')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    data_market TEXT NOT NULL,
+    epoch_id INTEGER NOT NULL,
+    slot_id INTEGER NOT NULL,
+    project_type TEXT NOT NULL,
+    selected INTEGER,
+    outcome TEXT NOT NULL,
+    error TEXT,
+    snapshots INTEGER,
+    compute_ms REAL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (data_market, slot_id, epoch_id, project_type)
+);
+CREATE INDEX IF NOT EXISTS attempts_epoch ON attempts (data_market, epoch_id);
+CREATE INDEX IF NOT EXISTS attempts_recorded_at ON attempts (recorded_at);
+CREATE TABLE IF NOT EXISTS submissions (
+    data_market TEXT NOT NULL,
+    epoch_id INTEGER NOT NULL,
+    slot_id INTEGER NOT NULL,
+    project_type TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    cid TEXT,
+    deadline INTEGER,
+    outcome TEXT NOT NULL,
+    error TEXT,
+    collector_response TEXT,
+    serialize_ms REAL,
+    ipfs_add_ms REAL,
+    sign_ms REAL,
+    submit_ms REAL,
+    release_to_ack_ms REAL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (data_market, slot_id, epoch_id, project_id)
+);
+CREATE INDEX IF NOT EXISTS submissions_epoch ON submissions (data_market, epoch_id);
+CREATE INDEX IF NOT EXISTS submissions_recorded_at ON submissions (recorded_at);
+"""
+
+_ATTEMPT_COLUMNS = (
+    'data_market', 'epoch_id', 'slot_id', 'project_type', 'selected', 'outcome', 'error', 'snapshots',
+    'compute_ms', 'recorded_at',
+)
+_SUBMISSION_COLUMNS = (
+    'data_market', 'epoch_id', 'slot_id', 'project_type', 'project_id', 'cid', 'deadline', 'outcome', 'error',
+    'collector_response', 'serialize_ms', 'ipfs_add_ms', 'sign_ms', 'submit_ms', 'release_to_ack_ms', 'recorded_at',
+)
+
+# stages whose latency can be queried, and the table and column they are stored in
+LATENCY_STAGES = {
+    'compute': ('attempts', 'compute_ms'),
+    'serialize': ('submissions', 'serialize_ms'),
+    'ipfs_add': ('submissions', 'ipfs_add_ms'),
+    'sign': ('submissions', 'sign_ms'),
+    'submit': ('submissions', 'submit_ms'),
+    'release_to_ack': ('submissions', 'release_to_ack_ms'),
+}
+
+# attempts that count towards success rates and streaks: those of selected slots, and failures
+# of slots whose selection was never reported, e.g. when compute was skipped
+_COUNTED_ATTEMPT = "(selected = 1 OR outcome != 'success')"
+
+# details of the attempt or submission being recorded by the current task
+_current_record: ContextVar[Optional[Dict]] = ContextVar('submission_history_record', default=None)
+
+# histories of the markets served by this process, keyed by lowercased data market address
+_histories: Dict[str, 'SubmissionHistory'] = dict()
+
+
+@contextmanager
+def recording():
+    """
+    Collect the details noted by the enclosed block, which may contain awaits, into a new dict.
+
+    Nested blocks collect into their own dict, e.g. a submission within the attempt that computed it.
+    """
+    record = dict()
+    token = _current_record.set(record)
+    try:
+        yield record
+    finally:
+        _current_record.reset(token)
+
+
+def note(**fields):
+    """
+    Add details to the attempt or submission being recorded, if any.
+    """
+    record = _current_record.get()
+    if record is not None:
+        record.update(fields)
+
+
+def _note_stage(stage: str, seconds: float):
+    note(**{f'{stage}_ms': round(seconds * 1000, 3)})
+
+
+add_stage_observer(_note_stage)
+
+
+def _window(
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    from_epoch: Optional[int] = None,
+    to_epoch: Optional[int] = None,
+    slot_id: Optional[int] = None,
+    project_type: Optional[str] = None,
+) -> Tuple[str, List]:
+    """
+    SQL conditions and parameters selecting the rows of a window, every bound being inclusive.
+    """
+    conditions, params = [], []
+    for condition, value in (
+        ('recorded_at >= ?', since),
+        ('recorded_at <= ?', until),
+        ('epoch_id >= ?', from_epoch),
+        ('epoch_id <= ?', to_epoch),
+        ('slot_id = ?', slot_id),
+        ('project_type = ?', project_type),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    return ''.join(f' AND {condition}' for condition in conditions), params
+
+
+class SubmissionHistory:
+    """
+    Attempts and submissions of one data market, stored in a SQLite database shared with other markets and processes.
+    """
+
+    def __init__(self, data_market: str, db_path: Optional[str] = None, flush_interval_ms: Optional[int] = None):
+        """
+        Initialize the history and make it queryable on the local HTTP endpoint. The database is opened on first use.
+
+        Args:
+            data_market (str): Data market the epochs belong to
+            db_path (str, optional): Path of the database. Defaults to settings.submission_history.db_path
+            flush_interval_ms (int, optional): Write batching window. Defaults to settings.submission_history.flush_interval_ms
+        """
+        self.data_market = data_market
+        self._db_path = Path(db_path or settings.submission_history.db_path)
+        self._flush_interval = (
+            flush_interval_ms if flush_interval_ms is not None else settings.submission_history.flush_interval_ms
+        ) / 1000
+        self._buffer: List[Tuple[str, Tuple]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+        # one thread owns the connection, which also serializes writes and queries
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='submission-history')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_prune = 0.0
+        _histories[data_market.lower()] = self
+
+    @property
+    def enabled(self) -> bool:
+        return settings.submission_history.enabled
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self._db_path.parent != Path(''):
+                self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._db_path), timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def record_attempt(
+        self,
+        epoch_id: int,
+        slot_id: int,
+        project_type: str,
+        selected: Optional[bool],
+        details: Optional[Dict] = None,
+        error: Optional[BaseException] = None,
+    ):
+        """
+        Record the outcome of a slot processing a project type for an epoch. Simulated epochs are not recorded.
+
+        Args:
+            selected (bool, optional): Selection decision reported for the slot, None if none was reported
+            details (dict, optional): Details noted while processing, e.g. compute_ms and snapshots
+            error (BaseException, optional): Error processing failed with, None if it succeeded
+        """
+        if not self.enabled or epoch_id == 0:
+            return
+        details = details or dict()
+        self._enqueue('attempts', _ATTEMPT_COLUMNS, {
+            **details,
+            'data_market': self.data_market,
+            'epoch_id': epoch_id,
+            'slot_id': slot_id,
+            'project_type': project_type,
+            'selected': None if selected is None else int(selected),
+            'outcome': outcome_of(error),
+            'error': (str(error) or type(error).__name__) if error is not None else None,
+        })
+
+    def record_submission(
+        self,
+        epoch_id: int,
+        slot_id: int,
+        project_id: str,
+        details: Optional[Dict] = None,
+        error: Optional[BaseException] = None,
+    ):
+        """
+        Record the outcome of committing a snapshot. Simulated epochs are not recorded.
+
+        Args:
+            details (dict, optional): Details noted while committing, e.g. cid, deadline, collector_response and stage timings
+            error (BaseException, optional): Error committing failed with, None if it succeeded
+        """
+        if not self.enabled or epoch_id == 0:
+            return
+        details = details or dict()
+        self._enqueue('submissions', _SUBMISSION_COLUMNS, {
+            **details,
+            'data_market': self.data_market,
+            'epoch_id': epoch_id,
+            'slot_id': slot_id,
+            'project_type': project_type_of(project_id),
+            'project_id': project_id,
+            'outcome': outcome_of(error),
+            'error': (str(error) or type(error).__name__) if error is not None else None,
+        })
+
+    def _enqueue(self, table: str, columns: Tuple[str, ...], row: Dict):
+        row['recorded_at'] = time.time()
+        sql = f'INSERT OR REPLACE INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+        self._buffer.append((sql, tuple(row.get(column) for column in columns)))
+        if self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # no running event loop, the next flush writes the row
+                return
+            self._flush_handle = loop.call_later(self._flush_interval, lambda: asyncio.ensure_future(self.flush()))
+
+    def _write(self, rows: List[Tuple[str, Tuple]]):
+        conn = self._connection()
+        with conn:
+            for sql, params in rows:
+                conn.execute(sql, params)
+        if time.time() - self._last_prune >= settings.submission_history.prune_interval:
+            self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection):
+        self._last_prune = time.time()
+        cutoff = self._last_prune - settings.submission_history.retention_days * 86400
+        with conn:
+            pruned = sum(
+                conn.execute(f'DELETE FROM {table} WHERE recorded_at < ?', (cutoff,)).rowcount
+                for table in ('attempts', 'submissions')
+            )
+        if pruned:
+            history_logger.info('Pruned {} submission history rows older than {} days', pruned, settings.submission_history.retention_days)
+
+    async def flush(self):
+        """
+        Write all buffered rows in one transaction.
+        """
+        async with self._flush_lock:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            try:
+                await self._run(self._write, rows)
+            except Exception as e:
+                # the history is diagnostic, dropping a batch beats buffering without bound
+                history_logger.opt(exception=settings.logs.trace_enabled).error(
+                    'Unable to write {} rows to submission history {}: {}', len(rows), self._db_path, e,
+                )
+
+    def _query(self, sql: str, params: List) -> List[Tuple]:
+        return self._connection().execute(sql, params).fetchall()
+
+    async def query(self, sql: str, params: List) -> List[Tuple]:
+        """
+        Run a query against the history once buffered rows are written.
+        """
+        await self.flush()
+        return await self._run(self._query, sql, params)
+
+    async def success_rate(self, **window) -> Dict:
+        """
+        Share of counted attempts that succeeded within a window.
+
+        Args:
+            **window: Inclusive bounds ``since`` and ``until`` (unix timestamps), ``from_epoch`` and ``to_epoch``,
+                and filters ``slot_id`` and ``project_type``
+
+        Returns:
+            dict: ``attempts``, ``succeeded`` and ``rate``, None when there were no attempts
+        """
+        conditions, params = _window(**window)
+        [(attempts, succeeded)] = await self.query(
+            f"SELECT COUNT(*), COALESCE(SUM(outcome = 'success'), 0) FROM attempts "
+            f'WHERE data_market = ? AND {_COUNTED_ATTEMPT}{conditions}',
+            [self.data_market, *params],
+        )
+        return {'attempts': attempts, 'succeeded': succeeded, 'rate': succeeded / attempts if attempts else None}
+
+    async def latency_percentile(self, q: float = 0.95, stage: str = 'release_to_ack', **window) -> Optional[float]:
+        """
+        Nearest-rank percentile of the duration of a stage, in milliseconds, over successful rows within a window.
+
+        Args:
+            q (float): Quantile between 0 and 1
+            stage (str): One of LATENCY_STAGES
+            **window: See :meth:`success_rate`
+
+        Returns:
+            float: The percentile, None when no duration was recorded
+        """
+        if stage not in LATENCY_STAGES:
+            raise ValueError(f'Unknown stage {stage}, expected one of {sorted(LATENCY_STAGES)}')
+        if not 0 < q <= 1:
+            raise ValueError(f'Quantile must be within (0, 1], got {q}')
+        table, column = LATENCY_STAGES[stage]
+        conditions, params = _window(**window)
+        where = f"WHERE data_market = ? AND outcome = 'success' AND {column} IS NOT NULL{conditions}"
+        [(count,)] = await self.query(f'SELECT COUNT(*) FROM {table} {where}', [self.data_market, *params])
+        if not count:
+            return None
+        [(value,)] = await self.query(
+            f'SELECT {column} FROM {table} {where} ORDER BY {column} LIMIT 1 OFFSET ?',
+            [self.data_market, *params, math.ceil(q * count) - 1],
+        )
+        return value
+
+    async def missed_epoch_streak(self, **window) -> Dict:
+        """
+        Runs of consecutive epochs missed within a window, an epoch being missed if any counted attempt for it failed.
+
+        Epochs without counted attempts, e.g. ones the slot was not selected for, neither extend nor break a run.
+
+        Args:
+            **window: See :meth:`success_rate`
+
+        Returns:
+            dict: ``current`` run ending at the latest counted epoch, ``longest`` run and ``missed_epochs`` in total
+        """
+        conditions, params = _window(**window)
+        rows = await self.query(
+            f"SELECT epoch_id, MIN(outcome = 'success') FROM attempts "
+            f'WHERE data_market = ? AND {_COUNTED_ATTEMPT}{conditions} GROUP BY epoch_id ORDER BY epoch_id',
+            [self.data_market, *params],
+        )
+        current = longest = missed = 0
+        for _, succeeded in rows:
+            if succeeded:
+                current = 0
+            else:
+                current += 1
+                missed += 1
+                longest = max(longest, current)
+        return {'current': current, 'longest': longest, 'missed_epochs': missed}
+
+    def _slot_status(self, slot_id: int) -> Tuple[int, int, int, List[int]]:
+        conn = self._connection()
+        params = (self.data_market, slot_id)
+        [(succeeded, missed, last_success)] = conn.execute(
+            "SELECT COALESCE(SUM(selected = 1 AND outcome = 'success'), 0), COALESCE(SUM(outcome != 'success'), 0), "
+            "MAX(CASE WHEN selected = 1 AND outcome = 'success' THEN epoch_id END) "
+            'FROM attempts WHERE data_market = ? AND slot_id = ?',
+            params,
+        ).fetchall()
+        since_success = (last_success if last_success is not None else -1,)
+        [(consecutive_missed,)] = conn.execute(
+            "SELECT COUNT(*) FROM attempts WHERE data_market = ? AND slot_id = ? AND outcome != 'success' AND epoch_id > ?",
+            params + since_success,
+        ).fetchall()
+        selection_failures = [
+            epoch_id for (epoch_id,) in conn.execute(
+                'SELECT DISTINCT epoch_id FROM attempts '
+                "WHERE data_market = ? AND slot_id = ? AND selected = 1 AND outcome != 'success' AND epoch_id > ? "
+                'ORDER BY epoch_id DESC LIMIT 10',
+                params + since_success,
+            )
+        ]
+        return succeeded, missed, consecutive_missed, selection_failures[::-1]
+
+    async def restore_slot_status(self, slot):
+        """
+        Restore the status counters and selection failure streak of a slot from the retained history.
+
+        An alert already due for the restored streak is not sent again.
+
+        Args:
+            slot (SlotState): The slot to restore
+        """
+        if not self.enabled:
+            return
+        try:
+            succeeded, missed, consecutive_missed, selection_failures = await self._run(self._slot_status, slot.slot_id)
+        except Exception as e:
+            history_logger.error('Unable to restore status of slot {} from submission history: {}', slot.slot_id, e)
+            return
+        slot.status.totalSuccessfulSubmissions = succeeded
+        slot.status.totalMissedSubmissions = missed
+        slot.status.consecutiveMissedSubmissions = consecutive_missed
+        slot.consecutive_selection_failures = selection_failures
+        slot.alert_sent = len(selection_failures) >= 3
+        history_logger.info(
+            'Restored status of slot {} in market {}: {} successful, {} missed, {} consecutive selection failures',
+            slot.slot_id, self.data_market, succeeded, missed, len(selection_failures),
+        )
+
+    def _close_connection(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def close(self):
+        """
+        Write buffered rows and close the database.
+        """
+        await self.flush()
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=False)
+
+
+async def _history_endpoint(query: Dict[str, str]):
+    """
+    Success rate, ``q`` latency percentile of ``stage`` and missed epoch streaks of every market, or of ``market``,
+    within the window given by ``since``, ``until``, ``from_epoch``, ``to_epoch``, ``slot_id`` and ``project_type``.
+    """
+    histories = _histories
+    if query.get('market'):
+        histories = {key: history for key, history in _histories.items() if key == query['market'].lower()}
+    try:
+        window = {
+            name: cast(query[name]) for name, cast in (
+                ('since', float), ('until', float), ('from_epoch', int), ('to_epoch', int), ('slot_id', int),
+            ) if name in query
+        }
+        q = float(query.get('q', 0.95))
+    except ValueError:
+        return json_response({'error': 'since, until and q must be numbers, from_epoch, to_epoch and slot_id integers'}, 400)
+    if 'project_type' in query:
+        window['project_type'] = query['project_type']
+    stage = query.get('stage', 'release_to_ack')
+    if stage not in LATENCY_STAGES or not 0 < q <= 1:
+        return json_response({'error': f'stage must be one of {sorted(LATENCY_STAGES)} and q within (0, 1]'}, 400)
+    report = dict()
+    for history in histories.values():
+        if not history.enabled:
+            continue
+        report[history.data_market] = {
+            'success_rate': await history.success_rate(**window),
+            'latency_ms': {'stage': stage, 'q': q, 'value': await history.latency_percentile(q, stage, **window)},
+            'missed_epoch_streak': await history.missed_epoch_streak(**window),
+        }
+    return json_response(report)
+
+
+local_http_server.add_route('/history', _history_endpoint)
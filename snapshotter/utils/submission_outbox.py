@@ -0,0 +1,284 @@
+"""
+Crash-safe outbox for signed snapshot submissions.
+
+Every signed ``SnapshotSubmission`` is appended to a local write-ahead journal before it is sent
+to the local collector and marked acknowledged once the collector responds. Journal writes are
+group committed: records appended within the same flush interval share a single ``fsync``,
+which happens in a worker thread so the event loop is never blocked on disk.
+
+On restart, entries that were never acknowledged and whose deadline block has not passed are
+handed back for replay exactly as they were signed, so no snapshot is recomputed or re-signed.
+Recovery and compaction rewrite the journal under the same lock as group commits, so no record
+appended meanwhile is lost. The journal is compacted down to its unacknowledged entries at startup,
+every ``settings.outbox.compact_after_acks`` acknowledgements and whenever it grew by
+``settings.outbox.compact_after_bytes`` since it was last rewritten, e.g. during a collector outage
+when no acknowledgements arrive. Compaction also forgets entries whose deadline block is behind the
+anchor chain head, which would otherwise stay pending for the life of the process.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from snapshotter.settings.config import settings
+from snapshotter.utils.deadline import anchor_head
+from snapshotter.utils.default_logger import logger
+from snapshotter.utils.models.proto.snapshot_submission.submission_pb2 import SnapshotSubmission
+
+outbox_logger = logger.bind(module='SubmissionOutbox')
+
+
+def submission_key(msg: SnapshotSubmission) -> str:
+    """
+    Unique key of a submission within the outbox: one slot submits one CID per project per epoch.
+    """
+    return f'{msg.request.slotId}:{msg.request.epochId}:{msg.request.projectId}'
+
+
+class SubmissionOutbox:
+    """
+    Append-only journal of submissions that have been signed but not yet acknowledged.
+
+    Journal records are JSON lines of two kinds::
+
+        {"op": "pending", "key": ..., "deadline": ..., "ts": ..., "submission": <base64 protobuf>}
+        {"op": "ack", "key": ..., "ts": ...}
+    """
+
+    def __init__(
+        self,
+        journal_path: Optional[str] = None,
+        fsync_interval_ms: Optional[int] = None,
+        compact_after_acks: Optional[int] = None,
+        compact_after_bytes: Optional[int] = None,
+    ):
+        """
+        Initialize the outbox.
+
+        Args:
+            journal_path (str, optional): Path of the journal file. Defaults to settings.outbox.journal_path
+            fsync_interval_ms (int, optional): Group commit window. Defaults to settings.outbox.fsync_interval_ms
+            compact_after_acks (int, optional): Acknowledgements appended before the journal is compacted.
+                Defaults to settings.outbox.compact_after_acks
+            compact_after_bytes (int, optional): Bytes appended to the journal before it is compacted.
+                Defaults to settings.outbox.compact_after_bytes
+        """
+        self._journal_path = Path(journal_path or settings.outbox.journal_path)
+        self._fsync_interval = (
+            fsync_interval_ms if fsync_interval_ms is not None else settings.outbox.fsync_interval_ms
+        ) / 1000
+        self._buffer: List[str] = []
+        self._waiters: List[asyncio.Future] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+        self._pending: Dict[str, SnapshotSubmission] = dict()
+        self._compact_after_acks = compact_after_acks or settings.outbox.compact_after_acks
+        self._compact_after_bytes = compact_after_bytes or settings.outbox.compact_after_bytes
+        # acknowledgements and bytes appended to the journal since it was last rewritten
+        self._acks_since_compaction = 0
+        self._bytes_since_compaction = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _read_journal(self) -> Dict[str, Tuple[int, SnapshotSubmission]]:
+        """
+        Replay the journal file and return unacknowledged entries keyed by submission key.
+
+        A torn last line left behind by a crash mid-write is ignored.
+        """
+        unacked = dict()
+        if not self._journal_path.exists():
+            return unacked
+        with open(self._journal_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    outbox_logger.warning('Skipping corrupt outbox journal record: {}', line[:100])
+                    continue
+                if record.get('op') == 'pending':
+                    unacked[record['key']] = (
+                        record['deadline'],
+                        SnapshotSubmission.FromString(base64.b64decode(record['submission'])),
+                    )
+                elif record.get('op') == 'ack':
+                    unacked.pop(record['key'], None)
+        return unacked
+
+    def _compaction_due(self) -> bool:
+        return (
+            self._acks_since_compaction >= self._compact_after_acks
+            or self._bytes_since_compaction >= self._compact_after_bytes
+        )
+
+    def _rewrite_journal(self, entries: List[str]):
+        """
+        Atomically replace the journal with the given records.
+        """
+        tmp_path = self._journal_path.with_suffix(self._journal_path.suffix + '.tmp')
+        if self._journal_path.parent != Path(''):
+            self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            f.writelines(entries)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._journal_path)
+
+    def _append_and_sync(self, entries: List[str]):
+        if self._journal_path.parent != Path(''):
+            self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._journal_path, 'a') as f:
+            f.writelines(entries)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _pending_record(key: str, deadline: int, msg: SnapshotSubmission) -> str:
+        return json.dumps(
+            {
+                'op': 'pending',
+                'key': key,
+                'deadline': deadline,
+                'ts': int(time.time()),
+                'submission': base64.b64encode(msg.SerializeToString()).decode('ascii'),
+            },
+        ) + '\n'
+
+    async def recover(self, current_block: int) -> List[SnapshotSubmission]:
+        """
+        Load unacknowledged submissions left behind by a previous run and compact the journal.
+
+        Entries whose deadline block is already behind ``current_block`` can no longer be accepted
+        by the protocol and are dropped.
+
+        Args:
+            current_block (int): Current anchor chain block number
+
+        Returns:
+            List[SnapshotSubmission]: Submissions still worth replaying, oldest epoch first
+        """
+        loop = asyncio.get_running_loop()
+        # submissions recorded meanwhile are either read back or appended once the journal is replaced
+        async with self._flush_lock:
+            unacked = await loop.run_in_executor(None, self._read_journal)
+            replayable = {
+                key: (deadline, msg) for key, (deadline, msg) in unacked.items()
+                if deadline >= current_block
+            }
+            expired = len(unacked) - len(replayable)
+            if expired:
+                outbox_logger.info('Dropping {} expired unacknowledged submissions from outbox', expired)
+
+            await loop.run_in_executor(
+                None,
+                self._rewrite_journal,
+                [self._pending_record(key, deadline, msg) for key, (deadline, msg) in replayable.items()],
+            )
+            self._acks_since_compaction = 0
+            self._bytes_since_compaction = 0
+        for key, (_, msg) in replayable.items():
+            self._pending.setdefault(key, msg)
+        return sorted((msg for _, msg in replayable.values()), key=lambda m: m.request.epochId)
+
+    async def record(self, msg: SnapshotSubmission):
+        """
+        Durably record a signed submission before it is sent.
+
+        Returns once the record has been fsynced as part of the current group commit.
+        """
+        key = submission_key(msg)
+        self._pending[key] = msg
+        await self._enqueue(self._pending_record(key, msg.request.deadline, msg), wait=True)
+
+    async def acknowledge(self, msg: SnapshotSubmission):
+        """
+        Mark a submission as acknowledged by the collector.
+
+        The acknowledgement rides along with the next group commit; losing it in a crash only
+        means the submission is replayed once more, which the collector deduplicates.
+        """
+        key = submission_key(msg)
+        if self._pending.pop(key, None) is None:
+            return
+        self._acks_since_compaction += 1
+        await self._enqueue(json.dumps({'op': 'ack', 'key': key, 'ts': int(time.time())}) + '\n', wait=False)
+
+    async def _enqueue(self, entry: str, wait: bool):
+        loop = asyncio.get_running_loop()
+        self._buffer.append(entry)
+        waiter = None
+        if wait:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self._fsync_interval, lambda: asyncio.ensure_future(self.flush()),
+            )
+        if waiter is not None:
+            await waiter
+
+    async def flush(self):
+        """
+        Write and fsync all buffered records, then wake up writers waiting on them.
+        """
+        async with self._flush_lock:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            entries, self._buffer = self._buffer, []
+            waiters, self._waiters = self._waiters, []
+            if not entries:
+                return
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._append_and_sync, entries)
+            except Exception as e:
+                outbox_logger.opt(exception=settings.logs.trace_enabled).error(
+                    'Unable to write {} records to submission outbox: {}', len(entries), e,
+                )
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                self._bytes_since_compaction += sum(len(entry) for entry in entries)
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+                if self._compaction_due():
+                    await self._compact()
+
+    async def _compact(self):
+        """
+        Rewrite the journal with the unacknowledged entries only, dropping those whose deadline block is
+        behind the anchor chain head. Called with the flush lock held.
+
+        Entries still buffered for the next group commit are appended after the rewrite, so one recorded
+        meanwhile may appear twice, which replay collapses by key.
+        """
+        head = anchor_head.block_number
+        if head is not None:
+            expired = [key for key, msg in self._pending.items() if msg.request.deadline < head]
+            for key in expired:
+                del self._pending[key]
+            if expired:
+                outbox_logger.info('Dropping {} expired unacknowledged submissions from outbox', len(expired))
+        entries = [self._pending_record(key, msg.request.deadline, msg) for key, msg in self._pending.items()]
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._rewrite_journal, entries)
+        except Exception as e:
+            outbox_logger.opt(exception=settings.logs.trace_enabled).error('Unable to compact submission outbox: {}', e)
+        else:
+            outbox_logger.debug(
+                'Compacted submission outbox after {} acknowledgements and {} bytes, {} entries pending',
+                self._acks_since_compaction, self._bytes_since_compaction, len(entries),
+            )
+            self._acks_since_compaction = 0
+            self._bytes_since_compaction = 0
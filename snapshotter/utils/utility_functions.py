@@ -28,3 +28,27 @@ def acquire_bounded_semaphore(fn):
             sem.release()
             return result
     return wrapped
+
+
+async def close_quietly(resource, method_name: str = 'close'):
+    """
+    Closes a connection pool or client during shutdown without letting failures propagate.
+
+    The close method is looked up by name so clients with different APIs (httpx ``aclose``,
+    grpclib ``close``) can be handled uniformly; it is awaited if it returns an awaitable.
+
+    Args:
+        resource: The object to close. ``None`` is ignored.
+        method_name (str): Name of the close method. Defaults to 'close'.
+    """
+    if resource is None:
+        return
+    close_fn = getattr(resource, method_name, None)
+    if close_fn is None:
+        return
+    try:
+        result = close_fn()
+        if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+            await result
+    except Exception as e:
+        logger.warning('Error while closing {}: {}', type(resource).__name__, e)